@@ -0,0 +1,252 @@
+"""
+Headless batch mode: runs many Heimdall tasks without a user at the keyboard.
+
+Tasks are read from a file, one per line, either as plain text or as JSON objects
+({"id": "scan-web01", "task": "...", "targets": ["web01.example.com"]}); blank lines and lines
+starting with '#' are skipped. Console commands and file writes are decided by an approval policy
+(see utils/approval_policy.py) instead of prompts: only allowlisted commands on in-scope targets
+and workspace files run, and the agent is told about rejections.
+Tasks run in parallel across worker processes, each in its own workspace subdirectory, and one
+JSON result per task is appended to the output file as soon as it finishes. Nothing is rendered
+with Rich; progress goes to stderr.
+
+Usage (from the atomic_heimdall directory):
+    python batch.py tasks.txt [--output batch_results.jsonl] [--workers 2] [--policy policy.json]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set
+
+from pydantic import BaseModel, Field
+
+from heimdall_agent import HeimdallAgent
+from main import (
+    PROVIDER, MAX_AUTO_STEPS, TOOL_RESULT_PREVIEW_CHARS,
+    create_memory, create_tools, execute_tool_calls, format_tool_results, get_tool_calls, remember_pending_tool_result,
+)
+from schemas.agent_schemas import HeimdallInputSchema, TextMessageSchema
+from utils.approval_policy import ApprovalPolicy
+from utils.client_factory import create_client
+from utils.result_store import ToolResultStore
+
+
+# Per-process state, set up once by init_worker and shared by the tasks the process runs
+_worker_state: Dict[str, Any] = {}
+
+
+class BatchTask(BaseModel):
+    """One task of a batch, as read from the tasks file."""
+    id: str = Field(..., description="Unique task id, also the name of the task's workspace subdirectory.")
+    task: Optional[str] = Field(None, description="The task given to Heimdall. None if its line could not be read.")
+    targets: List[str] = Field(default_factory=list, description="Hosts in scope for this task, added to the policy's allowed targets.")
+    error: Optional[str] = Field(None, description="Why the task's line could not be read; the task is then reported as an error.")
+
+
+def load_tasks(path: str) -> List[BatchTask]:
+    """
+    Reads the batch's tasks.
+
+    A JSON line that cannot be parsed or has no "task" becomes a task carrying an error, so it is
+    reported in the results without stopping the batch.
+
+    Args:
+        path: Tasks file, with one plain-text task or JSON object ({"id", "task", "targets"}) per line.
+
+    Returns:
+        The tasks in file order. Ids are made safe to use as directory names and unique, with a
+        numeric suffix on repeats.
+    """
+    tasks: List[BatchTask] = []
+    used_ids: Set[str] = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            default_id = f"task-{len(tasks) + 1}"
+            fields: Dict[str, Any] = {"id": default_id, "task": line}
+            if line.startswith("{"):
+                try:
+                    entry = json.loads(line)
+                    fields = {"id": str(entry.get("id") or default_id), "task": entry.get("task"), "targets": entry.get("targets", [])}
+                    if not isinstance(fields["task"], str) or not fields["task"].strip():
+                        fields["error"] = f"Line {line_number}: missing 'task'."
+                    if isinstance(fields["targets"], list):
+                        fields["targets"] = [str(target) for target in fields["targets"]]
+                    else:
+                        fields.update(targets=[], error=f"Line {line_number}: 'targets' must be a list.")
+                except (ValueError, AttributeError) as e:
+                    fields = {"id": default_id, "task": None, "error": f"Line {line_number}: invalid JSON task: {e}"}
+
+            base_id = re.sub(r"[^A-Za-z0-9_.-]", "_", fields["id"]).lstrip(".") or default_id
+            task_id, suffix = base_id, 2
+            while task_id in used_ids:
+                task_id, suffix = f"{base_id}-{suffix}", suffix + 1
+            used_ids.add(task_id)
+            fields["id"] = task_id
+            tasks.append(BatchTask(**fields))
+    return tasks
+
+
+def init_worker(provider: str, policy_data: Dict[str, Any], workspace_dir: str):
+    """Creates the process's LLM client and approval policy; a failure is reported by each task."""
+    _worker_state.update(provider=provider, workspace_dir=workspace_dir, error=None)
+    try:
+        _worker_state["client"], _worker_state["model"] = create_client(provider)
+        _worker_state["policy"] = ApprovalPolicy(**policy_data)
+    except Exception as e:
+        _worker_state["error"] = f"Worker setup failed: {e}"
+
+
+def run_task(batch_task: BatchTask, max_steps: int) -> Dict[str, Any]:
+    """
+    Runs one task to completion in a worker process, with a fresh agent memory. Commands run in the
+    task's workspace, and the approval policy only allows files there and the task's targets.
+
+    Args:
+        batch_task: The task, with its id and targets.
+        max_steps: Maximum number of agent steps.
+
+    Returns:
+        The task's result record: status ("answered", "no_action", "tool_error", "error" or
+        "max_steps"), final response, steps taken, tool calls made and duration. A task stopped by
+        the step limit right after a tool call also carries the results the agent never reviewed.
+    """
+    start = time.perf_counter()
+    task = batch_task.task
+    workspace = os.path.join(_worker_state["workspace_dir"], batch_task.id)
+    record: Dict[str, Any] = {
+        "id": batch_task.id, "task": task, "status": "max_steps", "response": None, "error": None,
+        "steps": 0, "tool_calls": [], "workspace": workspace,
+    }
+    if batch_task.error is not None or _worker_state["error"] is not None:
+        record.update(status="error", error=batch_task.error or _worker_state["error"])
+        return record
+
+    os.makedirs(workspace, exist_ok=True)
+    result_store = ToolResultStore(preview_chars=TOOL_RESULT_PREVIEW_CHARS)
+    tools = create_tools(
+        workspace, result_store, policy=_worker_state["policy"].for_task(workspace, batch_task.targets),
+        headless=True, provider=_worker_state["provider"],
+    )
+    agent = HeimdallAgent(client=_worker_state["client"], model=_worker_state["model"], memory=create_memory())
+    agent.memory.add_message(role="user", content=TextMessageSchema(text=task))
+
+    last_tool_result_str: Optional[str] = None
+    for step in range(1, max_steps + 1):
+        record["steps"] = step
+        agent_input = HeimdallInputSchema(
+            task=task if step == 1 else "Continue with the plan based on the last tool result.",
+            previous_tool_result=last_tool_result_str
+        )
+        last_tool_result_str = None
+        try:
+            agent_output = agent.run(agent_input)
+        except Exception as e:
+            record.update(status="error", error=f"Error running Heimdall agent: {e}")
+            break
+
+        tool_calls = get_tool_calls(agent_output)
+        if tool_calls:
+            results = execute_tool_calls(None, tools, tool_calls)
+            record["tool_calls"].extend(
+                {
+                    "step": step,
+                    "tool_name": tool_call.tool_name,
+                    "tool_parameters": tool_call.tool_parameters,
+                    "output": tool_output.model_dump() if tool_output is not None else None,
+                    "error": error,
+                }
+                for tool_call, tool_output, error in results
+            )
+            errors = [error for _, _, error in results if error is not None]
+            if len(errors) == len(results):
+                record.update(status="tool_error", error="\n".join(errors))
+                break
+            last_tool_result_str = format_tool_results(results, result_store)
+            continue
+
+        if agent_output.response_to_user:
+            record.update(status="answered", response=agent_output.response_to_user)
+        else:
+            record.update(status="no_action", error="Agent did not specify a tool or a response.")
+        break
+
+    if last_tool_result_str is not None:
+        # The step limit came right after a tool call: the agent never saw these results
+        remember_pending_tool_result(agent.memory, last_tool_result_str)
+        record["unreviewed_tool_result"] = last_tool_result_str
+    record["duration_s"] = round(time.perf_counter() - start, 2)
+    return record
+
+
+def run_batch(
+    tasks: List[BatchTask],
+    output_path: str,
+    policy: ApprovalPolicy,
+    workers: int,
+    max_steps: int,
+    workspace_dir: str,
+    provider: str = PROVIDER,
+) -> Dict[str, int]:
+    """
+    Runs the tasks across worker processes, appending each result to the output file as it completes.
+
+    Returns:
+        Number of tasks per final status.
+    """
+    status_counts: Dict[str, int] = {}
+    with open(output_path, "a", encoding="utf-8") as output, ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker,
+        initargs=(provider, policy.model_dump(), os.path.abspath(workspace_dir))
+    ) as pool:
+        futures = {pool.submit(run_task, batch_task, max_steps): batch_task for batch_task in tasks}
+        for done, future in enumerate(as_completed(futures), 1):
+            batch_task = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                record = {"id": batch_task.id, "task": batch_task.task, "status": "error", "error": f"Worker failed: {e}"}
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+            status_counts[record["status"]] = status_counts.get(record["status"], 0) + 1
+            print(
+                f"[{done}/{len(tasks)}] {batch_task.id}: {record['status']} "
+                f"({record.get('steps', 0)} steps, {record.get('duration_s', 0)} s)",
+                file=sys.stderr
+            )
+    return status_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tasks_file", help="File with one task per line (plain text or JSON with 'id', 'task' and 'targets').")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file the task results are appended to.")
+    parser.add_argument("--workers", type=int, default=2, help="Number of worker processes.")
+    parser.add_argument("--policy", help="JSON approval policy file. Defaults to pre-approved read-only commands, no targets beyond each task's and no file writes.")
+    parser.add_argument("--max-steps", type=int, default=MAX_AUTO_STEPS, help="Maximum agent steps per task.")
+    parser.add_argument("--workspace", default=os.path.join("heimdall_workspace", "batch"), help="Directory holding one workspace per task.")
+    parser.add_argument("--provider", default=PROVIDER, help="LLM provider (gemini, openai, ollama, mistral).")
+    args = parser.parse_args()
+
+    tasks = load_tasks(args.tasks_file)
+    if not tasks:
+        print(f"No tasks found in {args.tasks_file}.", file=sys.stderr)
+        sys.exit(1)
+    policy = ApprovalPolicy.from_file(args.policy) if args.policy else ApprovalPolicy()
+
+    print(f"Running {len(tasks)} task(s) with {args.workers} worker(s); results go to {args.output}", file=sys.stderr)
+    start = time.perf_counter()
+    status_counts = run_batch(tasks, args.output, policy, args.workers, args.max_steps, args.workspace, args.provider)
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(status_counts.items()))
+    print(f"Done in {time.perf_counter() - start:.1f} s ({summary})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
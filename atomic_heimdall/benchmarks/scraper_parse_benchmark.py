@@ -0,0 +1,90 @@
+"""
+Measures CPU time per page of the WebpageScraperTool HTML pipeline on a local corpus of saved pages.
+
+The current single-parse pipeline is compared with the previous one, kept below as a reference:
+html.parser for content, a second lxml parse by readability for the title, and a third parse
+inside markdownify.
+
+Usage (from the atomic_heimdall directory):
+    python -m benchmarks.scraper_parse_benchmark path/to/saved_pages [--rounds 3]
+"""
+
+import re
+import sys
+import glob
+import time
+import argparse
+from statistics import mean
+from bs4 import BeautifulSoup
+from markdownify import markdownify
+from readability import Document
+
+from tools.webpage_scraper_tool import WebpageScraperTool, WebpageScraperToolConfig
+
+
+def legacy_convert(scraper: WebpageScraperTool, html_content: str, url: str) -> str:
+    """The pre-single-parse pipeline, reproduced for comparison."""
+    soup = BeautifulSoup(html_content, "html.parser")
+    for element in soup.find_all(["script", "style", "nav", "header", "footer"]):
+        element.decompose()
+    content_candidates = [
+        soup.find("main"),
+        soup.find(id=re.compile(r"content|main", re.I)),
+        soup.find(class_=re.compile(r"content|main", re.I)),
+        soup.find("article"),
+    ]
+    main_content = next((candidate for candidate in content_candidates if candidate), None) or soup.find("body")
+    markdown_content = markdownify(
+        str(main_content) if main_content else str(soup),
+        strip=["script", "style"], heading_style="ATX", bullets="-", wrap=True,
+    )
+    Document(html_content).title()
+    for name in ("author", "description"):
+        soup.find("meta", attrs={"name": name})
+    soup.find("meta", attrs={"property": "og:site_name"})
+    return scraper._clean_markdown(markdown_content)
+
+
+def current_convert(scraper: WebpageScraperTool, html_content: str, url: str) -> str:
+    return scraper._convert_html(html_content, url, include_links=True).content
+
+
+def time_pipeline(convert, scraper: WebpageScraperTool, pages: list, rounds: int) -> float:
+    """Returns the mean CPU seconds per page over `rounds` passes of the corpus."""
+    samples = []
+    for _ in range(rounds):
+        start = time.process_time()
+        for html_content in pages:
+            convert(scraper, html_content, "https://example.org/page")
+        samples.append((time.process_time() - start) / len(pages))
+    return mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus_dir", help="Directory containing saved .html pages.")
+    parser.add_argument("--rounds", type=int, default=3, help="Number of passes over the corpus per pipeline.")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(f"{args.corpus_dir}/**/*.htm*", recursive=True))
+    if not paths:
+        print(f"No .html files found under {args.corpus_dir}", file=sys.stderr)
+        sys.exit(1)
+    pages = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+
+    scraper = WebpageScraperTool(WebpageScraperToolConfig(cache_enabled=False, conversion_cache_size=0))
+    legacy = time_pipeline(legacy_convert, scraper, pages, args.rounds)
+    current = time_pipeline(current_convert, scraper, pages, args.rounds)
+
+    total_kb = sum(len(page) for page in pages) / 1024
+    print(f"Corpus: {len(pages)} pages, {total_kb:.0f} KiB, {args.rounds} round(s)")
+    print(f"Legacy pipeline (3 parses):   {legacy * 1000:8.1f} ms CPU/page")
+    print(f"Current pipeline (1 parse):   {current * 1000:8.1f} ms CPU/page")
+    print(f"Reduction:                    {(1 - current / legacy) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measures Heimdall's time-to-prompt: wall-clock time from launching `main.py` until the first
+"You:" prompt is printed, so startup regressions from new imports or eager setup show up.
+
+The provider's API key must be set (e.g. GEMINI_API_KEY); no request is made to the provider.
+Each run starts from a temporary working directory so the workspace folder is not touched.
+
+Usage (from the atomic_heimdall directory):
+    python -m benchmarks.startup_benchmark [--runs 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from statistics import median
+
+PROMPT_MARKER = b"You:"
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_to_prompt(timeout: float) -> float:
+    """Launches main.py once and returns the seconds until its first prompt, then quits it."""
+    env = dict(os.environ, PYTHONPATH=APP_DIR, PYTHONUNBUFFERED="1")
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(APP_DIR, "main.py")],
+            cwd=workdir, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        output = b""
+        try:
+            while PROMPT_MARKER not in output:
+                chunk = process.stdout.read1(4096)
+                if not chunk:
+                    raise RuntimeError(f"main.py exited before prompting:\n{output.decode(errors='replace')}")
+                output += chunk
+                if time.perf_counter() - start > timeout:
+                    raise TimeoutError(f"No prompt after {timeout}s")
+            elapsed = time.perf_counter() - start
+            process.communicate(b"exit\n", timeout=timeout)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of launches to measure.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the prompt per launch.")
+    args = parser.parse_args()
+
+    samples = [time_to_prompt(args.timeout) for _ in range(args.runs)]
+    print(f"Time to prompt over {args.runs} run(s): median {median(samples) * 1000:.0f} ms, "
+          f"min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ heimdall_system_prompt = SystemPromptGenerator(
         "2. **Assess State:** Recall relevant information from the conversation history (memory).",
         "3. **Plan Next Step:** Based on the goal and current state, decide the most logical next action according to pentesting methodology (Reconnaissance, Scanning, Enumeration, Exploitation, etc.).",
         "4. **Select Action:** Determine if the next step requires using a tool or responding directly to the user.",
-        "   - If a tool is needed: Specify the exact tool name ('HumanInTheLoopConsole', 'FileManager', 'WebSearchTool') and the required parameters based on the tool's input schema.",
+        "   - If a tool is needed: Specify the exact tool name ('HumanInTheLoopConsole', 'FileManager', 'WebSearchTool', 'ToolResultReader') and the required parameters based on the tool's input schema.",
         "   - If responding to user: Formulate a clear question, summary, or final answer.",
         "   - You have the right to be unsure about the course of action. If you are unsure, either perform a call to `WebSearchTool` for more information from the web, or ask the user for clarification.",
         "5. **Format Output:** Structure your response strictly according to the HeimdallOutputSchema.",
@@ -26,13 +26,15 @@ heimdall_system_prompt = SystemPromptGenerator(
         "   - **Explain Your Actions:** Clearly state the *reason* for proposing a tool action in your 'thought' process.",
         "   - **Ethical Use Only:** Operate strictly within the bounds of ethical hacking.",
         "**Tool Usage:**",
-        "   - `HumanInTheLoopConsole`: Use for proposing shell commands (nmap, curl, searchsploit, etc.). Requires 'command' and 'reason' parameters.",
-        "   - `FileManager`: Use for reading, writing, appending, or listing files in the designated workspace. Requires 'action', 'path', 'reason', and sometimes 'content'. Write/Append actions will require external human approval.",
+        "   - `HumanInTheLoopConsole`: Use for proposing shell commands (nmap, curl, searchsploit, etc.). Requires 'command' and 'reason' parameters. Very large outputs are spooled to the workspace: you get a head/tail preview and the spool file path.",
+        "   - `FileManager`: Use for reading, writing, appending, or listing files in the designated workspace. Requires 'action', 'path', 'reason', and sometimes 'content'. Write/Append actions will require external human approval. For large files and spooled outputs, 'read' returns a head/tail preview; pass 'offset' and 'length' (in bytes) to read a specific range.",
         "   - `WebSearchTool`: Use when you need external information (CVE details, tool usage, general knowledge). Requires 'query'. This tool internally handles search, scraping, and synthesis for you.",
+        "   - `ToolResultReader`: Use to read more of a tool result that was truncated in 'previous_tool_result'. Requires the 'handle' from the truncation notice; optionally 'offset' and 'length'.",
         "**Output Format:**",
         "   - Provide detailed reasoning in the 'thought' field.",
         "   - If using a tool, set 'tool_to_use' to the exact tool name and provide *all* required parameters in 'tool_parameters'. Set 'response_to_user' to null.",
         "   - If responding directly to the user (e.g., asking for clarification, summarizing findings), set 'response_to_user' with your message. Set 'tool_to_use' and 'tool_parameters' to null.",
+        "   - If several tool actions are needed and none depends on another's result (e.g., a web search for a CVE and reading a notes file), list them all in 'tool_calls' (each with 'tool_name' and 'tool_parameters') instead of setting 'tool_to_use'. They run in the same step and their combined results come back in 'previous_tool_result'. Never batch actions that depend on each other.",
         "   - Only use one mode of output (tool OR response_to_user) per turn.",
     ],
 )
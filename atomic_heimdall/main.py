@@ -1,8 +1,8 @@
 import os
 import sys
 import json
-import instructor
-import openai
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv, find_dotenv
 from rich.console import Console
 from rich.panel import Panel
@@ -10,56 +10,38 @@ from rich.syntax import Syntax
 from rich.markdown import Markdown
 from rich.table import Table
 
+from atomic_agents.lib.base.base_io_schema import BaseIOSchema
 from atomic_agents.lib.components.agent_memory import AgentMemory
-from atomic_agents.lib.base.base_tool import BaseTool, BaseIOSchema
 
 from heimdall_agent import HeimdallAgent
-from schemas.agent_schemas import HeimdallInputSchema, HeimdallOutputSchema, TextMessageSchema
-from tools.human_in_the_loop_console_tool import HumanInTheLoopConsoleTool, ConsoleToolConfig
-from tools.file_manager_tool import FileManagerTool, FileManagerConfig
-from tools.web_search_tool_wrapper import WebSearchToolWrapper, WebSearchToolConfig
+from schemas.agent_schemas import HeimdallInputSchema, HeimdallOutputSchema, TextMessageSchema, ToolCallSchema
+from schemas.tool_schemas import (
+    ToolResultReaderInputSchema, ToolResultReaderConfig,
+    ConsoleToolInputSchema, ConsoleToolConfig,
+    FileManagerInputSchema, FileManagerConfig,
+    WebSearchToolInputSchema, WebSearchToolConfig,
+)
+from tools.tool_registry import ToolRegistry
+from utils.client_factory import create_client
+from utils.approval_policy import ApprovalPolicy
+from utils.compacting_memory import CompactingAgentMemory
+from utils.result_store import ToolResultStore
 
 
 load_dotenv(find_dotenv())
 PROVIDER = "gemini" # "gemini", "openai", "ollama", "mistral"
 MAX_AUTO_STEPS = 10
+MEMORY_MAX_TOKENS = 24000 # Estimated history size above which old tool outputs are compacted
+TOOL_RESULT_PREVIEW_CHARS = 6000 # Longer tool outputs reach the agent truncated, with a handle to read the rest
+MAX_PARALLEL_TOOL_CALLS = 4 # Parallel-safe calls of one batch run concurrently, up to this many at a time
+
+# (requested call, tool output or None, error message or None)
+ToolCallResult = Tuple[ToolCallSchema, Optional[BaseIOSchema], Optional[str]]
 
 def setup_client(provider):
     """Sets up the Instructor client based on the chosen provider."""
-    client = None
-    model = None
     try:
-        if provider == "openai":
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key: raise ValueError("OPENAI_API_KEY not found.")
-            client = instructor.from_openai(openai.OpenAI(api_key=api_key))
-            model = "gpt-4o-mini"
-        elif provider == "ollama":
-            client = instructor.from_openai(
-                openai.OpenAI(base_url="http://localhost:11434/v1", api_key="ollama"),
-                mode=instructor.Mode.JSON
-            )
-            model = "qwen2.5" # Ensure this model works with JSON mode
-        elif provider == "gemini":
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key: raise ValueError("GEMINI_API_KEY not found.")
-            client = instructor.from_openai(
-                openai.OpenAI(api_key=api_key, base_url="https://generativelanguage.googleapis.com/v1beta/openai/"),
-                mode=instructor.Mode.JSON
-            )
-            model = "gemini-2.0-flash"
-        elif provider == "mistral":
-            from mistralai.client import MistralClient
-            api_key = os.getenv("MISTRAL_API_KEY")
-            if not api_key: raise ValueError("MISTRAL_API_KEY not found.")
-            client = instructor.from_mistral(
-                 MistralClient(api_key=api_key), mode=instructor.Mode.MISTRAL_TOOLS # Use TOOL mode for Mistral
-            )
-            model = "mistral-small-latest"
-
-        else:
-            raise ValueError(f"Unsupported provider: {provider}")
-
+        client, model = create_client(provider)
         print(f"Using provider: {provider}, model: {model}", file=sys.stderr)
         return client, model
 
@@ -104,13 +86,173 @@ def display_tool_output(console: Console, tool_name: str, tool_output: BaseIOSch
         console.print(Panel(f"[red]Error formatting output:[/red] {e}\n\n[dim]{tool_output.model_dump_json(indent=2)}[/dim]", title=panel_title, border_style="red"))
 
 
+def get_tool_calls(agent_output: HeimdallOutputSchema) -> List[ToolCallSchema]:
+    """Returns the tool invocations requested in an agent step, whether batched or single."""
+    if agent_output.tool_calls:
+        return list(agent_output.tool_calls)
+    if agent_output.tool_to_use:
+        return [ToolCallSchema(tool_name=agent_output.tool_to_use, tool_parameters=agent_output.tool_parameters or {})]
+    return []
+
+
+def display_tool_call(console: Console, tool_call: ToolCallSchema):
+    """Prints the tool about to be used and its parameters."""
+    console.print(f"\n🛠️ [bold yellow]Using Tool:[/bold yellow] {tool_call.tool_name}")
+    if tool_call.tool_parameters:
+        param_table = Table(show_header=False, box=None, padding=(0, 1))
+        param_table.add_column(style="bold magenta")
+        param_table.add_column()
+        for k, v in tool_call.tool_parameters.items():
+            param_table.add_row(f"{k}:", str(v))
+        console.print(Panel(param_table, title="Tool Parameters", border_style="magenta", expand=False))
+
+
+def run_tool(tool, tool_call: ToolCallSchema, tool_input: BaseIOSchema) -> ToolCallResult:
+    """Runs one validated tool call, turning an exception into an error result."""
+    try:
+        return tool_call, tool.run(tool_input), None
+    except Exception as e:
+        return tool_call, None, f"Error running tool '{tool_call.tool_name}': {e}"
+
+
+def execute_tool_calls(console: Optional[Console], tools: ToolRegistry, tool_calls: List[ToolCallSchema]) -> List[ToolCallResult]:
+    """
+    Runs a batch of tool calls and returns their results in request order.
+
+    Calls that need the user (console commands, file writes) run one at a time so each approval
+    prompt stands alone; afterwards, the parallel-safe calls of the batch (web searches, file reads)
+    run concurrently. Nothing is displayed if console is None.
+    """
+    results: List[Optional[ToolCallResult]] = [None] * len(tool_calls)
+    concurrent_calls = []
+    for i, tool_call in enumerate(tool_calls):
+        if console is not None:
+            display_tool_call(console, tool_call)
+        if tool_call.tool_name not in tools:
+            results[i] = (tool_call, None, f"Error: Unknown tool '{tool_call.tool_name}' requested.")
+            continue
+        tool = tools[tool_call.tool_name]
+        try:
+            tool_input = tool.input_schema(**tool_call.tool_parameters)
+        except Exception as e:
+            results[i] = (tool_call, None, f"Error running tool '{tool_call.tool_name}': {e}")
+            continue
+        if len(tool_calls) > 1 and tool.is_parallel_safe(tool_input):
+            concurrent_calls.append((i, tool, tool_call, tool_input))
+        else:
+            results[i] = run_tool(tool, tool_call, tool_input)
+
+    if concurrent_calls:
+        if console is not None:
+            console.print(f"[dim]Running {len(concurrent_calls)} tool call(s) concurrently...[/dim]")
+        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_TOOL_CALLS, len(concurrent_calls))) as pool:
+            futures = [(i, pool.submit(run_tool, tool, tool_call, tool_input)) for i, tool, tool_call, tool_input in concurrent_calls]
+            for i, future in futures:
+                results[i] = future.result()
+    return results
+
+
+def format_tool_results(results: List[ToolCallResult], result_store: ToolResultStore) -> str:
+    """
+    Builds the previous_tool_result text for the next agent step from a batch of results.
+
+    Long outputs are stored and only their head is sent, with a handle; a single call keeps the
+    plain output format of one tool.
+    """
+    texts = []
+    for tool_call, tool_output, error in results:
+        if error is not None:
+            texts.append(error)
+        elif tool_call.tool_name == "ToolResultReader":
+            texts.append(tool_output.model_dump_json()) # Already a bounded slice of a stored result
+        else:
+            texts.append(result_store.present(tool_call.tool_name, tool_output.model_dump_json()))
+    if len(results) == 1:
+        return texts[0]
+    return "\n\n".join(
+        f"[Result {i + 1}/{len(results)}] {tool_call.tool_name} {json.dumps(tool_call.tool_parameters)}:\n{text}"
+        for i, ((tool_call, _, _), text) in enumerate(zip(results, texts))
+    )
+
+
+def remember_pending_tool_result(memory: AgentMemory, last_tool_result_str: Optional[str]) -> None:
+    """
+    Keeps tool results the agent has not seen yet in its memory. Results normally reach the agent as
+    the next step's previous_tool_result, but there is no next step once the step limit is reached.
+    """
+    if last_tool_result_str is not None:
+        memory.add_message(
+            role="system",
+            content=TextMessageSchema(text=f"Tool results from the last step, not yet reviewed:\n{last_tool_result_str}")
+        )
+
+
+def create_memory() -> CompactingAgentMemory:
+    """Creates the agent memory, whose old tool outputs are compacted past MEMORY_MAX_TOKENS."""
+    return CompactingAgentMemory(
+        max_tokens=MEMORY_MAX_TOKENS,
+        compactable_fields={
+            ("system", TextMessageSchema): "text",
+            ("user", HeimdallInputSchema): "previous_tool_result",
+        },
+    )
+
+
+def create_tools(
+    working_dir: str,
+    result_store: ToolResultStore,
+    policy: Optional[ApprovalPolicy] = None,
+    headless: bool = False,
+    provider: str = PROVIDER,
+) -> ToolRegistry:
+    """
+    Registers Heimdall's tools. Tools are registered by name and schema only; each tool module is
+    imported on its first run.
+
+    Args:
+        working_dir: Workspace for the FileManager and for spooled console outputs.
+        result_store: Store holding full tool outputs for the ToolResultReader.
+        policy: Approval policy deciding on commands and file writes. If None, the user is prompted.
+        headless: Set up the tools for unattended runs: console commands run inside working_dir and
+            the web search flow prints nothing.
+        provider: LLM provider of the web search flow's agents.
+
+    Returns:
+        The tool registry.
+    """
+    tools = ToolRegistry()
+    tools.register(
+        "HumanInTheLoopConsole", "tools.human_in_the_loop_console_tool", "HumanInTheLoopConsoleTool",
+        ConsoleToolInputSchema, ConsoleToolConfig(workspace_dir=working_dir, cwd=working_dir if headless else None),
+        approver=policy.approve_command if policy is not None else None
+    )
+    tools.register(
+        "FileManager", "tools.file_manager_tool", "FileManagerTool",
+        FileManagerInputSchema, FileManagerConfig(working_dir=working_dir),
+        parallel_safe=lambda params: params.action in ("read", "list"),
+        approver=policy.approve_file_action if policy is not None else None
+    )
+    tools.register(
+        "WebSearchTool", "tools.web_search_tool_wrapper", "WebSearchToolWrapper",
+        WebSearchToolInputSchema, WebSearchToolConfig(), parallel_safe=True,
+        client_factory=lambda: create_client(provider, async_client=True),
+        headless=headless
+    )
+    tools.register(
+        "ToolResultReader", "tools.tool_result_reader_tool", "ToolResultReaderTool",
+        ToolResultReaderInputSchema, ToolResultReaderConfig(max_length=TOOL_RESULT_PREVIEW_CHARS), parallel_safe=True,
+        store=result_store
+    )
+    return tools
+
+
 ### MAIN FUNCTION ###
 def main():
     console = Console()
     console.print(Panel("[bold green]Welcome to Heimdall - Atomic Pentesting Assistant[/bold green]", title_align="center"))
 
     client, model = setup_client(PROVIDER)
-    shared_memory = AgentMemory()
+    shared_memory = create_memory()
     heimdall_agent = HeimdallAgent(client=client, model=model, memory=shared_memory)
     console.print(f"[cyan]Heimdall Agent initialized with model:[/cyan] {model}")
 
@@ -118,12 +260,9 @@ def main():
     if not os.path.exists(fm_working_dir):
         os.makedirs(fm_working_dir)
 
-    tools: dict[str, BaseTool] = {
-        "HumanInTheLoopConsole": HumanInTheLoopConsoleTool(ConsoleToolConfig()),
-        "FileManager": FileManagerTool(FileManagerConfig(working_dir=fm_working_dir)),
-        "WebSearchTool": WebSearchToolWrapper(WebSearchToolConfig())
-    }
-    console.print(f"[cyan]Initialized Tools:[/cyan] {', '.join(tools.keys())}")
+    result_store = ToolResultStore(preview_chars=TOOL_RESULT_PREVIEW_CHARS)
+    tools = create_tools(fm_working_dir, result_store)
+    console.print(f"[cyan]Registered Tools:[/cyan] {', '.join(tools.keys())}")
     console.print(f"[cyan]FileManager working directory:[/cyan] {os.path.abspath(fm_working_dir)}")
 
     while True:
@@ -134,6 +273,15 @@ def main():
                 break
             if not user_input_text.strip():
                 continue
+            if user_input_text.startswith("/pin "):
+                fact = user_input_text[len("/pin "):].strip()
+                heimdall_agent.memory.add_message(
+                    role="system",
+                    content=TextMessageSchema(text=f"Pinned fact from the user: {fact}"),
+                    pinned=True
+                )
+                console.print(f"[cyan]Pinned:[/cyan] {fact}")
+                continue
 
             heimdall_agent.memory.add_message(
                 role="user",
@@ -168,56 +316,30 @@ def main():
 
                 console.print(Panel(f"[dim]Thought:[/dim] {agent_output.thought}", title=f"Agent Thought (Step {step_count})", border_style="dim cyan", title_align="left"))
 
-                if agent_output.tool_to_use:
-                    tool_name = agent_output.tool_to_use
-                    tool_params_dict = agent_output.tool_parameters or {} # Ensure dict
-
-                    if tool_name in tools:
-                        tool_instance = tools[tool_name]
-                        console.print(f"\n🛠️ [bold yellow]Using Tool:[/bold yellow] {tool_name}")
-                        if tool_params_dict:
-                             param_table = Table(show_header=False, box=None, padding=(0, 1))
-                             param_table.add_column(style="bold magenta")
-                             param_table.add_column()
-                             for k, v in tool_params_dict.items():
-                                 param_table.add_row(f"{k}:", str(v))
-                             console.print(Panel(param_table, title="Tool Parameters", border_style="magenta", expand=False))
-
-                        try:
-                            tool_input_schema_class = tool_instance.input_schema
-                            tool_input = tool_input_schema_class(**tool_params_dict)
-                            tool_output = tool_instance.run(tool_input)
-
-                            display_tool_output(console, tool_name, tool_output)
-
-                            result_str = tool_output.model_dump_json()
-                            last_tool_result_str = result_str # Store for next agent input
-                            heimdall_agent.memory.add_message(
-                                role="system",
-                                content=TextMessageSchema(text=f"Tool '{tool_name}' output:\n{result_str}")
-                            )
-                            continue
-
-                        except Exception as e:
-                            console.print(f"[bold red]Error running tool '{tool_name}':[/bold red] {e}")
-                            error_message = f"Error running tool '{tool_name}': {e}"
-                            last_tool_result_str = error_message
-                            heimdall_agent.memory.add_message(
-                                role="system",
-                                content=TextMessageSchema(text=error_message)
-                            )
-                            break
-                    else:
-                        console.print(f"[bold red]Error:[/bold red] Agent specified unknown tool '{tool_name}'.")
-                        error_message = f"Error: Unknown tool '{tool_name}' requested."
-                        last_tool_result_str = error_message
+                tool_calls = get_tool_calls(agent_output)
+                if tool_calls:
+                    results = execute_tool_calls(console, tools, tool_calls)
+                    errors = []
+                    for tool_call, tool_output, error in results:
+                        if error is not None:
+                            console.print(f"[bold red]{error}[/bold red]")
+                            errors.append(error)
+                        else:
+                            display_tool_output(console, tool_call.tool_name, tool_output)
+
+                    if len(errors) == len(results):
                         heimdall_agent.memory.add_message(
                             role="system",
-                            content=TextMessageSchema(text=f"Agent hallucinated unknown tool: {tool_name}")
+                            content=TextMessageSchema(text="\n".join(errors))
                         )
                         break
 
-                elif agent_output.response_to_user:
+                    # All results reach the agent once, together, as the next step's previous_tool_result
+                    # (which memory keeps)
+                    last_tool_result_str = format_tool_results(results, result_store)
+                    continue
+
+                if agent_output.response_to_user:
                     response_text = agent_output.response_to_user
                     console.print("\n🤖 [bold blue]Heimdall:[/bold blue]")
                     console.print(Panel(Markdown(response_text), border_style="blue", title="Agent Response", title_align="left"))
@@ -236,6 +358,8 @@ def main():
                     )
                     break
 
+            # Set only when the loop ended on the step limit right after a tool call
+            remember_pending_tool_result(heimdall_agent.memory, last_tool_result_str)
             if step_count >= MAX_AUTO_STEPS:
                 console.print(f"[bold yellow]Warning:[/bold yellow] Reached maximum auto steps ({MAX_AUTO_STEPS}). Pausing for user input.")
                 heimdall_agent.memory.add_message(
@@ -1,6 +1,6 @@
 # heimdall_atomic/schemas/agent_schemas.py
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import Field
 from atomic_agents.lib.base.base_io_schema import BaseIOSchema
 
@@ -16,7 +16,12 @@ class TextMessageSchema(BaseIOSchema):
 class HeimdallInputSchema(BaseIOSchema):
     """Input schema for the Heimdall agent, representing the user's request or task."""
     task: str = Field(..., description="The user's high-level pentesting task or question.")
-    previous_tool_result: Optional[str] = Field(default=None, description="The JSON string result from the previously executed tool, if any.") # Clarified description
+    previous_tool_result: Optional[str] = Field(default=None, description="The JSON string result from the previously executed tool, if any. Long results are truncated and end with a handle for the ToolResultReader tool.") # Clarified description
+
+class ToolCallSchema(BaseIOSchema):
+    """A single tool invocation requested by the Heimdall agent as part of a batch."""
+    tool_name: str = Field(..., description="The name of the tool to use (e.g., 'FileManager', 'WebSearchTool').")
+    tool_parameters: Dict[str, Any] = Field(default_factory=dict, description="The parameters for the tool, matching the tool's input schema.")
 
 class HeimdallOutputSchema(BaseIOSchema):
     """
@@ -24,6 +29,7 @@ class HeimdallOutputSchema(BaseIOSchema):
     which could be asking the user, using a tool, or providing a final response.
     """
     thought: str = Field(..., description="The agent's reasoning process and plan for the next step.")
-    tool_to_use: Optional[str] = Field(default=None, description="The name of the tool to use next (e.g., 'HumanInTheLoopConsole', 'FileManager', 'WebSearchTool').", examples=["HumanInTheLoopConsole", "FileManager", "WebSearchTool", None])
+    tool_to_use: Optional[str] = Field(default=None, description="The name of the tool to use next (e.g., 'HumanInTheLoopConsole', 'FileManager', 'WebSearchTool', 'ToolResultReader').", examples=["HumanInTheLoopConsole", "FileManager", "WebSearchTool", "ToolResultReader", None])
     tool_parameters: Optional[Dict[str, Any]] = Field(default=None, description="The parameters required for the selected tool, matching the tool's input schema.")
+    tool_calls: Optional[List[ToolCallSchema]] = Field(default=None, description="Several independent tool invocations to run in this step, used instead of 'tool_to_use'/'tool_parameters'. Their results come back together in the next step.")
     response_to_user: Optional[str] = Field(default=None, description="A direct message or final answer to the user if no tool is being used.")
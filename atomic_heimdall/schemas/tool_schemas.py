@@ -15,12 +15,19 @@ class ConsoleToolInputSchema(BaseIOSchema):
 
 class ConsoleToolOutputSchema(BaseIOSchema):
     """Output schema for the HumanInTheLoopConsole tool."""
-    result: str = Field(..., description="The captured stdout/stderr from the executed command, or a message indicating rejection or error.")
+    result: str = Field(..., description="The captured stdout/stderr from the executed command, or a message indicating rejection or error. Large streams are replaced by a head/tail preview.")
     executed: bool = Field(..., description="Indicates whether the command was actually executed.")
+    spooled_files: List[str] = Field(default_factory=list, description="Workspace-relative paths of output streams too large to return, readable in ranges with the FileManager tool.")
 
 class ConsoleToolConfig(BaseToolConfig):
-    """Configuration for the Console Tool (if any needed in the future)."""
+    """Configuration for the Console Tool."""
     timeout: int = Field(default=300, description="Timeout in seconds for command execution.")
+    cwd: Optional[str] = Field(default=None, description="Directory commands run in. The current directory if None.")
+    workspace_dir: str = Field(default="heimdall_workspace", description="FileManager workspace where large outputs are spooled (under .spool/).")
+    spool_threshold_bytes: int = Field(default=16384, description="Size in bytes above which an output stream is spooled instead of returned.")
+    preview_bytes: int = Field(default=1024, description="Bytes of a spooled stream shown from its head and from its tail.")
+    spool_max_bytes: int = Field(default=256 * 1024 * 1024, description="Size in bytes the spool directory is kept under; the oldest spooled outputs are deleted first.")
+    spool_max_age: float = Field(default=7 * 24 * 3600, description="Age in seconds after which a spooled output is deleted.")
 
 # --- FileManager Schemas ---
 
@@ -30,16 +37,41 @@ class FileManagerInputSchema(BaseIOSchema):
     path: str = Field(..., description="The relative path to the file or directory within the working directory.")
     content: Optional[str] = Field(default=None, description="The content to write or append (required for 'write'/'append').")
     reason: str = Field(..., description="A brief explanation why this file operation is needed (especially for write/append).")
+    offset: Optional[int] = Field(default=None, ge=0, description="For 'read': byte offset to start reading from. Use with large files and spooled outputs.")
+    length: Optional[int] = Field(default=None, gt=0, description="For 'read': number of bytes to read from 'offset'.")
 
 class FileManagerOutputSchema(BaseIOSchema):
     """Output schema for the FileManager tool."""
     status: str = Field(..., description="A message indicating success or failure of the operation.")
     content: Optional[str] = Field(default=None, description="The content read from the file (for 'read' action) or a list of files (for 'list' action).")
     action_performed: bool = Field(..., description="Indicates if the requested action was successfully performed (including user approval).")
+    total_bytes: Optional[int] = Field(default=None, description="For 'read': size of the file in bytes.")
+    next_offset: Optional[int] = Field(default=None, description="For ranged 'read': offset to continue reading from, or None at the end of the file.")
 
 class FileManagerConfig(BaseToolConfig):
     """Configuration for the FileManager Tool."""
     working_dir: str = Field(default="heimdall_workspace", description="The base directory for all file operations.")
+    max_read_bytes: int = Field(default=16384, description="Largest file returned whole by 'read', and largest range returned by a ranged 'read'.")
+    preview_bytes: int = Field(default=1024, description="Bytes shown from the head and from the tail of a file too large to read whole.")
+
+# --- ToolResultReader Schemas ---
+
+class ToolResultReaderInputSchema(BaseIOSchema):
+    """Input schema for the ToolResultReader tool."""
+    handle: str = Field(..., description="The handle of a truncated tool result, as given in the truncation notice (e.g. 'result-3').")
+    offset: int = Field(default=0, ge=0, description="Character offset to start reading from.")
+    length: int = Field(default=4000, gt=0, description="Number of characters to read.")
+
+class ToolResultReaderOutputSchema(BaseIOSchema):
+    """Output schema for the ToolResultReader tool."""
+    content: str = Field(..., description="The requested part of the stored tool result, or an error message.")
+    offset: int = Field(..., description="Character offset the content starts at.")
+    total_length: int = Field(..., description="Total length in characters of the stored result.")
+    next_offset: Optional[int] = Field(default=None, description="Offset to continue reading from, or None if the end was reached.")
+
+class ToolResultReaderConfig(BaseToolConfig):
+    """Configuration for the ToolResultReader Tool."""
+    max_length: int = Field(default=8000, description="Maximum number of characters returned per read.")
 
 # --- WebSearchToolWrapper Schemas ---
 
@@ -56,5 +88,17 @@ class WebSearchToolOutputSchema(BaseIOSchema):
     success: bool = Field(..., description="Indicates if the web search flow completed successfully.")
 
 class WebSearchToolConfig(BaseToolConfig):
-    """Configuration for the Web Search Tool Wrapper (if any needed)."""
-    pass # No specific config needed for the wrapper itself for now
+    """Configuration for the Web Search Tool Wrapper."""
+    scrape_workers: int = Field(default=4, gt=0, description="Number of search results scraped concurrently.")
+    scrape_url_timeout: float = Field(default=15.0, gt=0, description="Deadline in seconds for scraping a single URL.")
+    scrape_total_timeout: float = Field(default=30.0, gt=0, description="Overall time budget in seconds for the scraping step.")
+    near_duplicate_distance: int = Field(default=3, description="SimHash Hamming distance under which scraped pages count as near-duplicates. Negative disables the filter.")
+    context_token_budget: int = Field(default=12000, ge=0, description="Estimated token budget for the scraped content sent to answer synthesis. 0 sends every page in full.")
+    context_chunk_chars: int = Field(default=1500, gt=0, description="Maximum size in characters of the chunks ranked for the synthesis context.")
+    map_reduce_synthesis: bool = Field(default=False, description="Summarize groups of pages in parallel before synthesizing the answer, when the scraped content is large.")
+    map_reduce_threshold_tokens: int = Field(default=16000, ge=0, description="Estimated scraped tokens above which map-reduce synthesis is used instead of a single call.")
+    map_workers: int = Field(default=4, gt=0, description="Number of page-group summaries requested concurrently in map-reduce synthesis.")
+    map_group_tokens: int = Field(default=6000, gt=0, description="Estimated token budget of the pages summarized by a single map call.")
+    speculative_search: bool = Field(default=False, description="Search and scrape the raw user query while the search queries are being generated.")
+    speculative_results: int = Field(default=3, gt=0, description="Number of results scraped from the speculative search of the raw user query.")
+    stream_answer: bool = Field(default=True, description="Render the final answer on the console while it is being generated.")
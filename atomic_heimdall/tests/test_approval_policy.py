@@ -0,0 +1,146 @@
+"""
+Tests for the batch mode's approval policy and task loading.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+
+import batch
+from utils.approval_policy import ApprovalPolicy, CommandRule
+
+
+class ApprovalPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.workspace = os.path.join(self._tmp.name, "workspace")
+        os.makedirs(os.path.join(self.workspace, "sub"))
+        with open(os.path.join(self.workspace, "notes.txt"), "w") as f:
+            f.write("notes")
+        outside = os.path.join(self._tmp.name, "secret.txt")
+        with open(outside, "w") as f:
+            f.write("secret")
+        os.symlink(outside, os.path.join(self.workspace, "link.txt"))
+        os.symlink(self._tmp.name, os.path.join(self.workspace, "up"))
+
+        self.policy = ApprovalPolicy(
+            allowed_targets=["10.0.0.0/24", "192.168.1.7", "*.example.com", "scanme.org", "2001:db8::/32"],
+        ).for_task(self.workspace, ["web01.lab"])
+
+    def assertApproved(self, *commands):
+        for command in commands:
+            with self.subTest(command=command):
+                self.assertTrue(self.policy.approve_command(command, "test"))
+
+    def assertRejected(self, *commands):
+        for command in commands:
+            with self.subTest(command=command):
+                self.assertFalse(self.policy.approve_command(command, "test"))
+
+    def test_allowed_commands(self):
+        self.assertApproved(
+            "whoami", "ls", "ls -la sub", "cat notes.txt", "tail -n 20 notes.txt", "wc -l notes.txt",
+            "ping -c 3 10.0.0.5", "dig +short MX a.example.com", "curl -sI https://scanme.org/login",
+        )
+
+    def test_shell_operators_are_rejected(self):
+        self.assertRejected(
+            "cat notes.txt | sh", "cat notes.txt ; id", "whoami && id", "whoami > out.txt",
+            "cat < notes.txt", "whoami &", "cat \"unterminated",
+        )
+
+    def test_unlisted_programs_options_and_bad_values_are_rejected(self):
+        self.assertRejected(
+            "rm notes.txt", "tail -f notes.txt", "cat -- notes.txt", "curl -sI -K/tmp/cfg https://scanme.org",
+            "curl -o out https://scanme.org", "head -n x notes.txt", "head -n", "ping -c 100 10.0.0.5",
+            "ping 10.0.0.5", "whoami root", "dig @8.8.8.8 a.example.com",
+        )
+
+    def test_target_scope(self):
+        self.assertApproved(
+            "whois 10.0.0.254", "whois 192.168.1.7", "whois 2001:db8::1", "whois A.Example.com.",
+            "whois deep.sub.example.com", "whois scanme.org", "whois web01.lab", "curl -I http://[2001:db8::1]:8080/",
+        )
+        self.assertRejected(
+            "whois 10.0.1.1", "whois 192.168.1.8", "whois 2001:db9::1", "whois example.com",
+            "whois badexample.com", "whois scanme.org.evil.com", "whois evil.com",
+            "curl -sI evil.com/.example.com", "curl -sI http://scanme.org@evil.com/", "curl -sI http://[::1]/",
+        )
+
+    def test_task_targets_do_not_leak_into_the_base_policy(self):
+        base = ApprovalPolicy(allowed_targets=["scanme.org"])
+        base.for_task(self.workspace, ["web01.lab"])
+        self.assertEqual(base.allowed_targets, ["scanme.org"])
+
+    def test_workspace_escapes_are_rejected(self):
+        self.assertRejected(
+            "cat /etc/passwd", "cat ../secret.txt", "cat sub/../../secret.txt", "cat link.txt",
+            "cat up/secret.txt", "ls /", "ls ..",
+        )
+        self.assertApproved("cat sub/../notes.txt", f"cat {os.path.join(self.workspace, 'notes.txt')}")
+
+    def test_file_arguments_need_a_workspace(self):
+        self.assertFalse(ApprovalPolicy().approve_command("cat notes.txt", "test"))
+
+    def test_argument_counts_and_required_options(self):
+        policy = ApprovalPolicy(
+            rules=[CommandRule(program="nmap", options=["-sV"], required_options=["-sV"], arguments="targets", min_arguments=1, max_arguments=2)],
+            allowed_targets=["10.0.0.0/24"],
+        )
+        self.assertTrue(policy.approve_command("nmap -sV 10.0.0.1 10.0.0.2", "test"))
+        self.assertFalse(policy.approve_command("nmap -sV 10.0.0.1 10.0.0.2 10.0.0.3", "test"))
+        self.assertFalse(policy.approve_command("nmap -sV", "test"))
+        self.assertFalse(policy.approve_command("nmap 10.0.0.1", "test"))
+
+    def test_file_writes(self):
+        self.assertFalse(self.policy.approve_file_action("write", "notes.txt"))
+        self.assertTrue(ApprovalPolicy(allow_file_writes=True).approve_file_action("append", "notes.txt"))
+
+
+class LoadTasksTest(unittest.TestCase):
+    def load(self, lines):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write("\n".join(lines) + "\n")
+        self.addCleanup(os.remove, f.name)
+        return batch.load_tasks(f.name)
+
+    def test_plain_and_json_tasks(self):
+        tasks = self.load([
+            "# comment", "", "enumerate host a",
+            '{"id": "web01", "task": "check web01", "targets": ["web01.lab", 7]}',
+        ])
+        self.assertEqual([(t.id, t.task, t.targets, t.error) for t in tasks], [
+            ("task-1", "enumerate host a", [], None),
+            ("web01", "check web01", ["web01.lab", "7"], None),
+        ])
+
+    def test_duplicate_and_sanitized_ids_are_unique(self):
+        tasks = self.load([
+            '{"id": "web", "task": "a"}', '{"id": "web", "task": "b"}', '{"id": "we/b", "task": "c"}',
+            '{"id": "we b", "task": "d"}', '{"id": "../..", "task": "e"}', '{"id": "..", "task": "f"}',
+        ])
+        ids = [task.id for task in tasks]
+        self.assertEqual(ids, ["web", "web-2", "we_b", "we_b-2", "_..", "task-6"])
+        for task_id in ids:
+            self.assertNotIn(os.sep, task_id)
+            self.assertFalse(task_id.startswith("."))
+
+    def test_malformed_lines_become_task_errors(self):
+        tasks = self.load([
+            '{"id": "x"}', '{"id": "y", "task": "  "}', '{"id": "z", "task": "a", "targets": "nope"}',
+            "{broken", '{"id": "ok", "task": "fine"}',
+        ])
+        self.assertEqual([task.id for task in tasks], ["x", "y", "z", "task-4", "ok"])
+        self.assertIn("missing 'task'", tasks[0].error)
+        self.assertIn("missing 'task'", tasks[1].error)
+        self.assertIn("'targets' must be a list", tasks[2].error)
+        self.assertIn("invalid JSON", tasks[3].error)
+        self.assertIsNone(tasks[4].error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Tests for CompactingAgentMemory.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import unittest
+
+from schemas.agent_schemas import HeimdallInputSchema, TextMessageSchema
+from utils.compacting_memory import EVICTED_PLACEHOLDER, CompactingAgentMemory
+
+COMPACTABLE_FIELDS = {
+    ("system", TextMessageSchema): "text",
+    ("user", HeimdallInputSchema): "previous_tool_result",
+}
+
+
+class CompactingAgentMemoryTest(unittest.TestCase):
+    def test_copy_keeps_settings_and_pins(self):
+        memory = CompactingAgentMemory(max_tokens=500, compactable_fields=COMPACTABLE_FIELDS, keep_recent_turns=1)
+        memory.add_message("system", TextMessageSchema(text="scope: 10.0.0.0/24"), pinned=True)
+        memory.add_message("user", TextMessageSchema(text="scan it"))
+
+        copied = memory.copy()
+
+        self.assertIsInstance(copied, CompactingAgentMemory)
+        self.assertEqual((copied.max_tokens, copied.keep_recent_turns), (500, 1))
+        self.assertEqual(copied.get_history(), memory.get_history())
+        for _ in range(3):
+            copied.initialize_turn()
+            copied.add_message("system", TextMessageSchema(text="tool output " * 60))
+        self.assertEqual(copied.history[0].content.text, "scope: 10.0.0.0/24")
+        self.assertLessEqual(copied.total_tokens(), 500)
+        self.assertIn(EVICTED_PLACEHOLDER, [message.content.text for message in copied.history])
+
+    def test_max_messages_never_drops_pinned_messages(self):
+        memory = CompactingAgentMemory(max_tokens=10000, compactable_fields=COMPACTABLE_FIELDS, max_messages=3)
+        memory.add_message("system", TextMessageSchema(text="pinned fact"), pinned=True)
+        for i in range(5):
+            memory.add_message("user", TextMessageSchema(text=f"message {i}"))
+
+        self.assertEqual(
+            [message.content.text for message in memory.history],
+            ["pinned fact", "message 3", "message 4"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+"""
+Tests for the chunking used by query-aware context packing.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import unittest
+
+from pydantic import ValidationError
+
+from schemas.tool_schemas import WebSearchToolConfig
+from utils.context_packing import chunk_text
+
+
+class ChunkTextTest(unittest.TestCase):
+    def test_packs_paragraphs_and_cuts_long_ones(self):
+        text = "alpha\n\nbeta\n\n" + "x" * 25
+        self.assertEqual(chunk_text(text, 12), ["alpha\n\nbeta", "x" * 12, "x" * 12, "x"])
+
+    def test_rejects_non_positive_sizes(self):
+        for max_chars in (0, -1):
+            with self.subTest(max_chars=max_chars), self.assertRaises(ValueError):
+                chunk_text("some text", max_chars)
+
+    def test_config_rejects_sizes_that_would_stall_the_flow(self):
+        for field in ("context_chunk_chars", "scrape_workers", "scrape_url_timeout", "map_workers", "map_group_tokens", "speculative_results"):
+            with self.subTest(field=field), self.assertRaises(ValidationError):
+                WebSearchToolConfig(**{field: 0})
+        with self.assertRaises(ValidationError):
+            WebSearchToolConfig(context_token_budget=-1)
+        self.assertEqual(WebSearchToolConfig(context_token_budget=0).context_token_budget, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
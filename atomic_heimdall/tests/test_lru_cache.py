@@ -0,0 +1,78 @@
+"""
+Tests for PersistentLRUCache's disk persistence.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import os
+import time
+import tempfile
+import unittest
+
+from utils.lru_cache import PersistentLRUCache
+
+
+def cache_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+
+
+class PersistentLRUCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_evicted_entries_are_deleted_from_disk(self):
+        cache = PersistentLRUCache(max_entries=3, persist_dir=self.cache_dir)
+        for i in range(10):
+            cache.set(f"key-{i}", i)
+        self.assertEqual(len(cache_files(self.cache_dir)), 3)
+
+        reloaded = PersistentLRUCache(max_entries=3, persist_dir=self.cache_dir)
+        self.assertEqual([reloaded.get(f"key-{i}") for i in (6, 7, 8, 9)], [None, 7, 8, 9])
+
+    def test_load_sweeps_expired_and_excess_files(self):
+        cache = PersistentLRUCache(max_entries=10, persist_dir=self.cache_dir)
+        for i in range(6):
+            cache.set(f"key-{i}", i)
+        old = time.time() - 3600
+        for name in cache_files(self.cache_dir)[:2]:
+            os.utime(os.path.join(self.cache_dir, name), (old, old))
+
+        PersistentLRUCache(max_entries=10, ttl=60, persist_dir=self.cache_dir)
+        self.assertEqual(len(cache_files(self.cache_dir)), 4)
+
+        # Files from earlier runs count towards the bound until their keys are used again
+        smaller = PersistentLRUCache(max_entries=3, ttl=60, persist_dir=self.cache_dir)
+        self.assertEqual(len(cache_files(self.cache_dir)), 3)
+        for i in range(10, 13):
+            smaller.set(f"key-{i}", i)
+        self.assertEqual(len(cache_files(self.cache_dir)), 3)
+
+    def test_expired_entry_file_is_deleted_on_read(self):
+        cache = PersistentLRUCache(max_entries=3, ttl=0.05, persist_dir=self.cache_dir)
+        cache.set("key", "value")
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache_files(self.cache_dir), [])
+
+
+    def test_malformed_files_are_dropped(self):
+        contents = ['{"value": 1}', '{"stored_at": "soon", "value": 1}', '[1, 2]', '{"stored_at": null, "value": 1}', "{not json"]
+        for content in contents:
+            with self.subTest(content=content):
+                cache = PersistentLRUCache(max_entries=3, persist_dir=self.cache_dir)
+                with open(cache._path("key"), "w", encoding="utf-8") as f:
+                    f.write(content)
+                self.assertIsNone(cache.get("key"))
+                self.assertEqual(cache_files(self.cache_dir), [])
+                cache.set("key", "value")
+                self.assertEqual(PersistentLRUCache(max_entries=3, persist_dir=self.cache_dir).get("key"), "value")
+                os.remove(cache._path("key"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for spooling large tool outputs to the workspace.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import time
+import unittest
+
+from utils.output_spool import OutputSpool, preview_file, read_byte_range
+
+
+class ByteRangeTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, "out.log")
+        with open(self.path, "wb") as f:
+            f.write(bytes(range(48, 58)) * 10)  # "0123456789" ten times
+
+    def test_read_byte_range(self):
+        self.assertEqual(read_byte_range(self.path, 0, 4), ("0123", 100, 4))
+        self.assertEqual(read_byte_range(self.path, 95, 10), ("56789", 100, None))
+        self.assertEqual(read_byte_range(self.path, 96, 4), ("6789", 100, None))
+        self.assertEqual(read_byte_range(self.path, 150, 10), ("", 100, None))
+
+    def test_split_utf8_is_replaced(self):
+        with open(self.path, "wb") as f:
+            f.write("é".encode("utf-8") * 3)
+        self.assertEqual(read_byte_range(self.path, 1, 3), ("\ufffdé", 6, 4))
+
+    def test_preview_offsets(self):
+        preview = preview_file(self.path, ".spool/out.log", 8)
+        self.assertIn(".spool/out.log: 100 bytes, showing bytes 0-8 and 92-100", preview)
+        self.assertIn("--- bytes 0-8 ---\n01234567\n", preview)
+        self.assertTrue(preview.endswith("--- bytes 92-100 ---\n23456789"))
+
+    def test_preview_of_a_small_file_does_not_repeat_the_head(self):
+        preview = preview_file(self.path, "out.log", 80)
+        self.assertIn("showing bytes 0-80 and 80-100", preview)
+        self.assertTrue(preview.endswith("--- bytes 80-100 ---\n" + "0123456789" * 2))
+        preview = preview_file(self.path, "out.log", 500)
+        self.assertIn("showing bytes 0-100 and 100-100", preview)
+        self.assertTrue(preview.endswith("--- bytes 100-100 ---\n"))
+
+
+class OutputSpoolTest(unittest.TestCase):
+    def test_new_files_are_unique_and_relative_to_the_workspace(self):
+        with tempfile.TemporaryDirectory() as workspace:
+            spool = OutputSpool(workspace, threshold_bytes=4)
+            (path_a, display_a), (path_b, display_b) = spool.new_file("console-stdout"), spool.new_file("console-stdout")
+            self.assertNotEqual(path_a, path_b)
+            self.assertEqual(path_a, os.path.join(workspace, display_a))
+            self.assertTrue(display_a.startswith(".spool" + os.sep + "console-stdout-"))
+            with open(path_a, "wb") as f:
+                f.write(b"12345")
+            with open(path_b, "wb") as f:
+                f.write(b"1234")
+            self.assertTrue(spool.is_large(path_a))
+            self.assertFalse(spool.is_large(path_b))
+
+
+class SpoolPruningTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.workspace = self._tmp.name
+
+    def spool_file(self, spool, size, age):
+        path, _ = spool.new_file("out")
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+        return path
+
+    def test_expired_files_are_deleted(self):
+        spool = OutputSpool(self.workspace, max_age=3600)
+        old = self.spool_file(spool, 10, age=7200)
+        recent = self.spool_file(spool, 10, age=60)
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(recent))
+
+    def test_oldest_files_go_first_beyond_max_bytes(self):
+        spool = OutputSpool(self.workspace, max_bytes=250)
+        paths = [self.spool_file(spool, 100, age=age) for age in (40, 30, 20, 10)]
+        # Creating the fourth file pruned the first; pruning again drops the second
+        spool.prune()
+        self.assertEqual([os.path.exists(path) for path in paths], [False, False, True, True])
+
+    def test_missing_spool_directory(self):
+        OutputSpool(os.path.join(self.workspace, "none")).prune()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for the token-bucket rate limiting shared by outbound fetches.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+
+from utils.rate_limiter import RateLimitScheduler, TokenBucket
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_rejects_invalid_rate_and_burst(self):
+        for rate, burst in ((0, 1), (-1.0, 1), (1.0, 0)):
+            with self.subTest(rate=rate, burst=burst), self.assertRaises(ValueError):
+                TokenBucket(rate, burst)
+
+    def test_reservations_queue_up(self):
+        bucket = TokenBucket(rate=10.0, burst=2)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, places=2)
+
+
+class RateLimitSchedulerTest(unittest.TestCase):
+    def test_cancelled_waiter_refunds_its_token(self):
+        scheduler = RateLimitScheduler()
+
+        async def scenario():
+            await scheduler.aacquire("k", 1.0, 1)
+            waiter = asyncio.create_task(scheduler.aacquire("k", 1.0, 1))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+
+        asyncio.run(scenario())
+        # Only the first token is still owed: the next caller waits about one period, not two
+        self.assertLess(scheduler._buckets["k"].reserve(), 1.0)
+        self.assertEqual(scheduler.metrics()["k"].acquired, 1)
+
+    def test_waits_are_tallied_per_caller(self):
+        scheduler = RateLimitScheduler()
+
+        async def flow(key: str):
+            with scheduler.track_waits() as tally:
+                await asyncio.gather(*(scheduler.aacquire(key, 50.0, 1) for _ in range(3)))
+                # Worker threads count for the flow when they run in a copy of its context
+                context = contextvars.copy_context()
+                with ThreadPoolExecutor(1) as pool:
+                    pool.submit(context.run, scheduler.acquire, key, 50.0, 1).result()
+            return tally.seconds
+
+        async def scenario():
+            return await asyncio.gather(flow("a"), flow("b"))
+
+        first, second = asyncio.run(scenario())
+        # Two queued async waiters (0.02 + 0.04 s), then the thread's token, per flow
+        for seconds in (first, second):
+            self.assertGreater(seconds, 0.05)
+            self.assertLess(seconds, 0.2)
+        self.assertAlmostEqual(first + second, scheduler.total_wait(), places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
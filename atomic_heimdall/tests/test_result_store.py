@@ -0,0 +1,67 @@
+"""
+Tests for the store of truncated tool results and the ToolResultReader tool reading it.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import unittest
+
+from schemas.tool_schemas import ToolResultReaderConfig, ToolResultReaderInputSchema
+from tools.tool_result_reader_tool import ToolResultReaderTool
+from utils.result_store import ToolResultStore
+
+TEXT = "".join(chr(ord("a") + i % 26) for i in range(100))
+
+
+class ToolResultStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ToolResultStore(preview_chars=30, max_results=2)
+
+    def test_read_bounds(self):
+        handle = self.store.put(TEXT)
+        self.assertEqual(self.store.read(handle), (TEXT[:30], 100, 30))
+        self.assertEqual(self.store.read(handle, 30, 40), (TEXT[30:70], 100, 70))
+        self.assertEqual(self.store.read(handle, 90, 10), (TEXT[90:], 100, None))
+        self.assertEqual(self.store.read(handle, 95, 10), (TEXT[95:], 100, None))
+        self.assertEqual(self.store.read(handle, 100), ("", 100, None))
+        self.assertEqual(self.store.read(handle, 250), ("", 100, None))
+        self.assertIsNone(self.store.read("result-99"))
+
+    def test_paging_reassembles_the_result(self):
+        handle = self.store.put(TEXT)
+        parts, offset = [], 0
+        while offset is not None:
+            content, _, offset = self.store.read(handle, offset, 7)
+            parts.append(content)
+        self.assertEqual("".join(parts), TEXT)
+
+    def test_oldest_results_are_dropped(self):
+        handles = [self.store.put(f"result {i}") for i in range(3)]
+        self.assertEqual(handles, ["result-1", "result-2", "result-3"])
+        self.assertIsNone(self.store.get("result-1"))
+        self.assertEqual(self.store.get("result-3"), "result 2")
+
+    def test_present(self):
+        self.assertEqual(self.store.present("Tool", "short"), "short")
+        presented = self.store.present("Tool", TEXT)
+        self.assertTrue(presented.startswith(TEXT[:30] + "\n"))
+        self.assertIn("showing 30 of 100 characters", presented)
+        self.assertIn("handle='result-1' and offset=30", presented)
+
+
+class ToolResultReaderToolTest(unittest.TestCase):
+    def test_reads_are_capped_at_max_length(self):
+        store = ToolResultStore(preview_chars=30)
+        handle = store.put(TEXT)
+        reader = ToolResultReaderTool(ToolResultReaderConfig(max_length=20), store=store)
+        output = reader.run(ToolResultReaderInputSchema(handle=handle, offset=10, length=50))
+        self.assertEqual((output.content, output.offset, output.total_length, output.next_offset), (TEXT[10:30], 10, 100, 30))
+
+        missing = reader.run(ToolResultReaderInputSchema(handle="result-7"))
+        self.assertIn("No stored result", missing.content)
+        self.assertEqual((missing.total_length, missing.next_offset), (0, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests that tool results from the last allowed agent step are not lost.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import tempfile
+import unittest
+from unittest import mock
+
+import batch
+from main import remember_pending_tool_result
+from schemas.agent_schemas import HeimdallOutputSchema, TextMessageSchema, ToolCallSchema
+from utils.approval_policy import ApprovalPolicy
+from utils.compacting_memory import CompactingAgentMemory
+
+LIST_CALL = ToolCallSchema(tool_name="FileManager", tool_parameters={"action": "list", "path": ".", "reason": "look"})
+
+
+class StubAgent:
+    """Replaces HeimdallAgent: calls a tool on each step, then answers once `answer_on_step` is reached."""
+    answer_on_step = None
+    instances = []
+
+    def __init__(self, client, model, memory):
+        self.memory = memory
+        self.inputs = []
+        StubAgent.instances.append(self)
+
+    def run(self, agent_input):
+        self.inputs.append(agent_input)
+        if len(self.inputs) == StubAgent.answer_on_step:
+            return HeimdallOutputSchema(thought="done", response_to_user="finished")
+        return HeimdallOutputSchema(thought="look", tool_calls=[LIST_CALL])
+
+
+class StepLimitTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        patcher = mock.patch.dict(batch._worker_state, {
+            "provider": "ollama", "workspace_dir": self._tmp.name, "error": None,
+            "client": None, "model": "stub", "policy": ApprovalPolicy(),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        agent_patcher = mock.patch.object(batch, "HeimdallAgent", StubAgent)
+        agent_patcher.start()
+        self.addCleanup(agent_patcher.stop)
+        StubAgent.instances = []
+
+    def test_tool_call_on_last_step_is_kept(self):
+        StubAgent.answer_on_step = None
+        record = batch.run_task(batch.BatchTask(id="t", task="look around"), max_steps=2)
+
+        self.assertEqual(record["status"], "max_steps")
+        self.assertEqual(len(record["tool_calls"]), 2)
+        self.assertIn("Successfully listed", record["unreviewed_tool_result"])
+        last_message = StubAgent.instances[0].memory.history[-1]
+        self.assertEqual(last_message.role, "system")
+        self.assertIn(record["unreviewed_tool_result"], last_message.content.text)
+
+    def test_answered_task_has_no_pending_result(self):
+        StubAgent.answer_on_step = 2
+        record = batch.run_task(batch.BatchTask(id="t", task="look around"), max_steps=2)
+
+        self.assertEqual(record["status"], "answered")
+        self.assertNotIn("unreviewed_tool_result", record)
+        # The first step's results reached the agent as the second step's input
+        self.assertIn("Successfully listed", StubAgent.instances[0].inputs[1].previous_tool_result)
+
+    def test_remember_pending_tool_result(self):
+        memory = CompactingAgentMemory(max_tokens=1000, compactable_fields={})
+        remember_pending_tool_result(memory, None)
+        self.assertEqual(memory.history, [])
+        remember_pending_tool_result(memory, "exit code 0")
+        self.assertIsInstance(memory.history[0].content, TextMessageSchema)
+        self.assertTrue(memory.history[0].content.text.endswith("exit code 0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Tests for SimHash near-duplicate detection.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import unittest
+
+from utils.text_dedup import hamming_distance, near_duplicate_indices, simhash
+
+ARTICLE = (
+    "The vulnerability allows a remote attacker to execute arbitrary code on the affected server by "
+    "sending a crafted request to the management interface. Administrators should apply the vendor "
+    "patch released this week, restrict access to the interface and review the logs for signs of "
+    "exploitation. Versions prior to 4.2.1 are affected, and no workaround is available for older "
+    "branches that have reached the end of their support period."
+)
+
+
+class SimHashTest(unittest.TestCase):
+    def test_hamming_distance(self):
+        self.assertEqual(hamming_distance(0, 0), 0)
+        self.assertEqual(hamming_distance(0b1011, 0b0001), 2)
+        self.assertEqual(hamming_distance(0, (1 << 64) - 1), 64)
+
+    def test_fingerprints(self):
+        self.assertEqual(simhash(""), 0)
+        self.assertEqual(simhash("   ...  "), 0)
+        self.assertLess(simhash(ARTICLE), 1 << 64)
+        # Case, punctuation and spacing do not change the words
+        self.assertEqual(simhash(ARTICLE), simhash(ARTICLE.upper().replace(" ", "  \n")))
+        self.assertEqual(simhash("a few words"), simhash("A few, words!"))
+
+    def test_near_and_far_texts(self):
+        near = ARTICLE.replace("this week", "on Tuesday")
+        far = "A recipe for bread: mix flour, water, salt and yeast, then let the dough rise overnight before baking."
+        self.assertLessEqual(hamming_distance(simhash(ARTICLE), simhash(near)), 10)
+        self.assertGreater(hamming_distance(simhash(ARTICLE), simhash(far)), 10)
+
+
+class NearDuplicateIndicesTest(unittest.TestCase):
+    def test_keeps_the_first_of_each_group(self):
+        texts = [ARTICLE, "Completely different page about gardening tools and seasonal planting tips.", ARTICLE + " ", ARTICLE.lower()]
+        self.assertEqual(near_duplicate_indices(texts), [0, 1])
+
+    def test_distance_threshold(self):
+        near = ARTICLE.replace("this week", "on Tuesday")
+        distance = hamming_distance(simhash(ARTICLE), simhash(near))
+        self.assertEqual(near_duplicate_indices([ARTICLE, near], max_distance=distance), [0])
+        self.assertEqual(near_duplicate_indices([ARTICLE, near], max_distance=distance - 1), [0, 1])
+        self.assertEqual(near_duplicate_indices([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
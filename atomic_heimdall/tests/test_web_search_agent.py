@@ -0,0 +1,89 @@
+"""
+Tests for the web search flow's scraping step. Search, scraping and LLM calls are stubbed.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from rich.console import Console
+
+from schemas.tool_schemas import WebSearchToolConfig
+from tools.webpage_scraper_tool import WebpageScraperToolOutputSchema
+from tools import web_search_agent as flow
+from tools.websearch_tool import (
+    DuckDuckGoSearchResultItemSchema, DuckDuckGoSearchToolInputSchema, DuckDuckGoSearchToolOutputSchema,
+)
+from utils.client_factory import create_client
+
+RAW_QUERY_URLS = ["https://example.com/a", "https://example.com/b#intro"]
+GENERATED_QUERY_URLS = ["http://example.com/a", "https://example.com/b/"]
+
+
+def search_output(urls):
+    return DuckDuckGoSearchToolOutputSchema(
+        results=[DuckDuckGoSearchResultItemSchema(url=url, title="t", query="q") for url in urls]
+    )
+
+
+async def fake_search(params):
+    return search_output(GENERATED_QUERY_URLS if params.queries == ["generated"] else RAW_QUERY_URLS)
+
+
+async def fake_scrape(params):
+    url = str(params.url)
+    return WebpageScraperToolOutputSchema(content=f"Page {url}", metadata={"title": url, "domain": "example.com"})
+
+
+async def fake_query_generation(agent, user_input):
+    await asyncio.sleep(0.1) # The speculative search and scrape of the raw query finish first
+    return DuckDuckGoSearchToolInputSchema(queries=["generated"], max_results=3)
+
+
+class ScrapeSearchResultsTest(unittest.TestCase):
+    def test_no_urls_left_to_scrape(self):
+        config = WebSearchToolConfig()
+        console = Console(quiet=True)
+        self.assertEqual(asyncio.run(flow.ascrape_search_results([], config, console)), [])
+
+        scraped_urls = {"https://example.com/a"}
+        results = search_output(["http://example.com/a/"]).results
+        self.assertEqual(asyncio.run(flow.ascrape_search_results(results, config, console, scraped_urls)), [])
+
+    def test_tools_are_not_built_at_import(self):
+        self.assertIsNone(flow._webpage_scraper_tool)
+        self.assertIsNone(flow._duckduckgo_search_tool)
+
+
+class SpeculativeSearchFlowTest(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(flow.set_client_factory, flow._client_factory)
+        flow.set_client_factory(lambda: create_client("ollama", async_client=True))
+
+    def test_generated_urls_overlapping_speculative_urls(self):
+        config = WebSearchToolConfig(
+            speculative_search=True, stream_answer=False, near_duplicate_distance=-1, context_token_budget=0
+        )
+        synthesized = []
+
+        async def fake_synthesis(agent, scraped_data, config, console):
+            synthesized.append(scraped_data.scraped_pages)
+            return flow.FinalAnswerOutputSchema(final_answer="answer")
+
+        with mock.patch.object(flow, "get_duckduckgo_search_tool", return_value=mock.Mock(arun=fake_search)), \
+                mock.patch.object(flow, "get_webpage_scraper_tool", return_value=mock.Mock(arun=fake_scrape)), \
+                mock.patch.object(flow, "arun_agent", fake_query_generation), \
+                mock.patch.object(flow, "asynthesize_answer", fake_synthesis):
+            answer = asyncio.run(flow.arun_web_search_flow("raw query", Console(quiet=True), config))
+
+        self.assertIsNotNone(answer)
+        self.assertEqual(answer.markup, "answer")
+        # Every generated URL was already scraped speculatively: each page is used once
+        self.assertEqual([page.metadata.title for page in synthesized[0]], RAW_QUERY_URLS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Tests for the webpage scraper's streaming decoder, and for its fetching and response cache
+revalidation against a local HTTP server.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools.webpage_scraper_tool import (
+    StreamingHtmlDecoder, WebpageScraperTool, WebpageScraperToolConfig, WebpageScraperToolInputSchema,
+)
+
+PAGE = b"<html><head><title>Local page</title></head><body><main><p>Hello scraper</p></main></body></html>"
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serves PAGE with an ETag; /stale-proxy answers 304 to any request not marked no-cache, like a confused cache."""
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, dict(self.headers)))
+        no_cache = "no-cache" in self.headers.get("Cache-Control", "")
+        if self.headers.get("If-None-Match") == '"v1"' or (self.path == "/stale-proxy" and not no_cache):
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def decode(content_type, chunks, max_bytes=1000):
+    decoder = StreamingHtmlDecoder(content_type, max_bytes)
+    fed = 0
+    for chunk in chunks:
+        fed += 1
+        if not decoder.feed(chunk):
+            break
+    return decoder.finish(), decoder.truncated, fed
+
+
+class StreamingHtmlDecoderTest(unittest.TestCase):
+    def test_charset_from_header_then_meta_then_utf8(self):
+        latin1 = '<meta charset="utf-8"><p>café</p>'.encode("latin-1")
+        self.assertIn("café", decode("text/html; charset=ISO-8859-1", [latin1])[0])
+        self.assertIn("café", decode('text/html; charset="iso-8859-1"', [latin1])[0])
+
+        meta = '<meta http-equiv="Content-Type" content="text/html; charset=windows-1252"><p>café</p>'.encode("cp1252")
+        self.assertIn("café", decode("text/html", [meta])[0])
+
+        self.assertIn("café", decode("text/html", ["<p>café</p>".encode("utf-8")])[0])
+        self.assertIn("café", decode("text/html; charset=no-such-codec", ["<p>café</p>".encode("utf-8")])[0])
+
+    def test_multibyte_characters_split_across_chunks(self):
+        data = "<p>ünïcode</p>".encode("utf-8")
+        self.assertEqual(decode("text/html", [data[:4], data[4:5], data[5:]])[0], "<p>ünïcode</p>")
+
+    def test_truncation(self):
+        text, truncated, _ = decode("text/html", [b"a" * 6, b"b" * 6], max_bytes=8)
+        self.assertEqual((text, truncated), ("a" * 6 + "bb", True))
+
+        # The limit is filled exactly: truncated only if more body follows
+        text, truncated, fed = decode("text/html", [b"a" * 4, b"b" * 4, b"c"], max_bytes=8)
+        self.assertEqual((text, truncated, fed), ("a" * 4 + "b" * 4, True, 3))
+        text, truncated, _ = decode("text/html", [b"a" * 4, b"b" * 4, b""], max_bytes=8)
+        self.assertEqual((text, truncated), ("a" * 4 + "b" * 4, False))
+        self.assertEqual(decode("text/html", [b"short"], max_bytes=8)[1:], (False, 1))
+
+
+class ScraperFetchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        WebpageScraperTool.close_session()
+
+    def setUp(self):
+        PageHandler.requests_seen.clear()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def scraper(self, **config):
+        return WebpageScraperTool(WebpageScraperToolConfig(cache_dir=self._tmp.name, per_domain_rate=1000, **config))
+
+    def params(self, path):
+        return WebpageScraperToolInputSchema(url=f"{self.base_url}{path}")
+
+    def test_unexpected_304_is_fetched_again_in_full(self):
+        scraper = self.scraper(cache_enabled=False)
+        self.assertIn("Hello scraper", scraper.run(self.params("/stale-proxy")).content)
+
+        async def arun():
+            try:
+                return await scraper.arun(self.params("/stale-proxy"))
+            finally:
+                await WebpageScraperTool.aclose_async_client()
+
+        self.assertIn("Hello scraper", asyncio.run(arun()).content)
+        self.assertEqual(len(PageHandler.requests_seen), 4)
+
+    def test_stale_entry_is_revalidated(self):
+        scraper = self.scraper(cache_ttl=0)
+        first = scraper.run(self.params("/page"))
+
+        async def arun():
+            try:
+                return await scraper.arun(self.params("/page"))
+            finally:
+                await WebpageScraperTool.aclose_async_client()
+
+        second = asyncio.run(arun())
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first.metadata.title, "Local page")
+        self.assertEqual(PageHandler.requests_seen[1][1].get("If-None-Match"), '"v1"')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Tests for the DuckDuckGo search tool's per-query retries and result cache. Searches are stubbed,
+nothing reaches DuckDuckGo.
+
+Run from the atomic_heimdall directory:
+    python -m unittest discover tests
+"""
+
+import unittest
+from unittest import mock
+
+from tenacity import wait_none
+
+from tools.websearch_tool import DuckDuckGoSearchTool, DuckDuckGoSearchToolConfig, DuckDuckGoSearchToolInputSchema
+
+
+class StubbedSearchTest(unittest.TestCase):
+    """Base for tests running the tool with `_fetch_search_results` replaced by `self.fake_fetch`."""
+
+    def make_tool(self, **config):
+        tool = DuckDuckGoSearchTool(DuckDuckGoSearchToolConfig(**config))
+        self.fetched = []
+        patcher = mock.patch.object(tool, "_fetch_search_results", self.fake_fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(tool._executor.shutdown)
+        return tool
+
+    def fake_fetch(self, query, max_results, search_type):
+        self.fetched.append(query)
+        return [{"href": f"https://example.com/{query.replace(' ', '-')}", "title": query, "body": "", "query": query}]
+
+    def search(self, tool, *queries, max_results=3):
+        return tool.run(DuckDuckGoSearchToolInputSchema(queries=list(queries), max_results=max_results))
+
+
+class PerQueryRetryTest(StubbedSearchTest):
+    def setUp(self):
+        # Retry immediately instead of backing off
+        patcher = mock.patch("tools.websearch_tool.wait_random_exponential", lambda **kwargs: wait_none())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.failures = {}
+
+    def fake_fetch(self, query, max_results, search_type):
+        if self.failures.get(query, 0) > 0:
+            self.failures[query] -= 1
+            self.fetched.append(query)
+            raise RuntimeError(f"202 Ratelimit for {query}")
+        return super().fake_fetch(query, max_results, search_type)
+
+    def test_only_the_failing_query_is_retried(self):
+        tool = self.make_tool(max_attempts_per_query=4)
+        self.failures = {"flaky": 2}
+        output = self.search(tool, "steady", "flaky")
+        self.assertEqual(self.fetched.count("steady"), 1)
+        self.assertEqual(self.fetched.count("flaky"), 3)
+        self.assertEqual([(s.query, s.success, s.attempts) for s in output.query_statuses], [("steady", True, 1), ("flaky", True, 3)])
+        self.assertEqual([result.query for result in output.results], ["steady", "flaky"])
+
+    def test_failed_query_leaves_partial_results(self):
+        tool = self.make_tool(max_attempts_per_query=3)
+        self.failures = {"down": 10}
+        output = self.search(tool, "first", "down", "last")
+        self.assertEqual([result.query for result in output.results], ["first", "last"])
+        statuses = output.query_statuses
+        self.assertEqual([s.query for s in statuses], ["first", "down", "last"])
+        self.assertEqual((statuses[1].success, statuses[1].attempts, statuses[1].result_count), (False, 3, 0))
+        self.assertIn("202 Ratelimit for down", statuses[1].error)
+        self.assertTrue(statuses[0].success and statuses[2].success)
+
+        # A failed query is not cached: the next search tries it again
+        self.failures = {}
+        self.assertTrue(self.search(tool, "down").query_statuses[0].success)
+
+    def test_duplicate_urls_across_queries_are_dropped(self):
+        tool = self.make_tool()
+        tool._fetch_search_results = lambda query, max_results, search_type: [
+            {"href": "https://example.com/page?utm_source=x", "title": query, "body": "", "query": query}
+        ]
+        output = self.search(tool, "a", "b")
+        self.assertEqual(len(output.results), 1)
+        self.assertEqual([s.result_count for s in output.query_statuses], [1, 1])
+
+
+class SearchCacheTest(StubbedSearchTest):
+    def test_queries_differing_in_case_and_spacing_share_an_entry(self):
+        tool = self.make_tool()
+        self.search(tool, "CVE-2024 exploit")
+        output = self.search(tool, "  cve-2024   EXPLOIT ")
+        self.assertEqual(self.fetched, ["CVE-2024 exploit"])
+        status = output.query_statuses[0]
+        self.assertTrue(status.cached)
+        self.assertEqual(status.attempts, 0)
+        # Cached results are reported under the query that asked for them
+        self.assertEqual(output.results[0].query, "  cve-2024   EXPLOIT ")
+
+    def test_key_covers_every_search_setting(self):
+        tool = self.make_tool()
+        keys = {
+            tool._cache_key("q", 3, "text"), tool._cache_key("q", 5, "text"), tool._cache_key("q", 3, "news"),
+            tool._cache_key("other q", 3, "text"),
+        }
+        self.assertEqual(len(keys), 4)
+        self.assertNotEqual(
+            self.make_tool(region="us-en")._cache_key("q", 3, "text"), self.make_tool(region="fr-fr")._cache_key("q", 3, "text")
+        )
+
+    def test_entries_expire_after_ttl(self):
+        tool = self.make_tool(cache_ttl=60)
+        with mock.patch("utils.lru_cache.time.time", return_value=1000.0):
+            self.search(tool, "q")
+        with mock.patch("utils.lru_cache.time.time", return_value=1059.0):
+            self.assertTrue(self.search(tool, "q").query_statuses[0].cached)
+        with mock.patch("utils.lru_cache.time.time", return_value=1060.0):
+            self.assertFalse(self.search(tool, "q").query_statuses[0].cached)
+        self.assertEqual(self.fetched, ["q", "q"])
+
+    def test_cache_can_be_disabled(self):
+        tool = self.make_tool(cache_max_entries=0)
+        self.search(tool, "q")
+        self.search(tool, "q")
+        self.assertEqual(self.fetched, ["q", "q"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,9 @@
 import os
 import sys
-from typing import Optional
+from typing import Callable, Optional
 from atomic_agents.lib.base.base_tool import BaseTool
 from schemas.tool_schemas import FileManagerInputSchema, FileManagerOutputSchema, FileManagerConfig
+from utils.output_spool import read_byte_range, preview_file
 
 class FileManagerTool(BaseTool):
     """
@@ -12,9 +13,22 @@ class FileManagerTool(BaseTool):
     input_schema = FileManagerInputSchema
     output_schema = FileManagerOutputSchema
 
-    def __init__(self, config: FileManagerConfig = FileManagerConfig()):
+    def __init__(
+        self,
+        config: FileManagerConfig = FileManagerConfig(),
+        approver: Optional[Callable[[str, str], bool]] = None,
+    ):
+        """
+        Args:
+            config: Working directory and read limits.
+            approver: Decides on each write/append from the action and relative path, replacing the
+                interactive prompt (used by headless runs). If None, the user is asked.
+        """
         super().__init__(config)
+        self.approver = approver
         self.working_dir = os.path.abspath(config.working_dir)
+        self.max_read_bytes = config.max_read_bytes
+        self.preview_bytes = config.preview_bytes
         if not os.path.exists(self.working_dir):
             try:
                 os.makedirs(self.working_dir)
@@ -52,6 +66,11 @@ class FileManagerTool(BaseTool):
             print(f"   Content Preview:\n---\n{preview}\n---", file=sys.stderr)
         print("-" * 50, file=sys.stderr)
 
+        if self.approver is not None:
+            approved = self.approver(action, path)
+            print(f"File {action} {'allowed' if approved else 'rejected'} by the approval policy.", file=sys.stderr)
+            return approved
+
         while True:
             try:
                 approval = input(f"Do you want to {action} this file? (y/n): ").lower().strip()
@@ -82,6 +101,8 @@ class FileManagerTool(BaseTool):
         output_status = "Operation initiated."
         output_content = None
         action_performed = False
+        total_bytes = None
+        next_offset = None
 
         try:
             if action == "read":
@@ -89,9 +110,23 @@ class FileManagerTool(BaseTool):
                     output_status = f"Error: File not found at '{path}'."
                 elif not os.path.isfile(safe_abs_path):
                     output_status = f"Error: '{path}' is not a file."
+                elif params.offset is not None or params.length is not None:
+                    offset = params.offset or 0
+                    length = min(params.length or self.max_read_bytes, self.max_read_bytes)
+                    output_content, total_bytes, next_offset = read_byte_range(safe_abs_path, offset, length)
+                    end = next_offset if next_offset is not None else total_bytes
+                    output_status = f"Successfully read bytes {offset}-{max(offset, end)} of {total_bytes} from '{path}'."
+                    action_performed = True
+                elif os.path.getsize(safe_abs_path) > self.max_read_bytes:
+                    # Too large to return whole: show both ends and let the agent page through the rest
+                    total_bytes = os.path.getsize(safe_abs_path)
+                    output_content = preview_file(safe_abs_path, path, self.preview_bytes)
+                    output_status = f"'{path}' is {total_bytes} bytes; returned its head and tail. Use 'offset' and 'length' to read other ranges."
+                    action_performed = True
                 else:
                     with open(safe_abs_path, 'r', encoding='utf-8') as f:
                         output_content = f.read()
+                    total_bytes = os.path.getsize(safe_abs_path)
                     output_status = f"Successfully read content from '{path}'."
                     action_performed = True
 
@@ -127,7 +162,8 @@ class FileManagerTool(BaseTool):
                         return FileManagerOutputSchema(status=output_status, action_performed=False) # Early exit
 
                     if not self._confirm_write_action(action, path, reason, content_to_write):
-                        output_status = f"User rejected the '{action}' operation on '{path}'."
+                        rejected_by = "User" if self.approver is None else "The approval policy"
+                        output_status = f"{rejected_by} rejected the '{action}' operation on '{path}'."
                     else:
                         mode = 'w' if action == 'write' else 'a'
                         with open(safe_abs_path, mode, encoding='utf-8') as f:
@@ -148,7 +184,9 @@ class FileManagerTool(BaseTool):
         return FileManagerOutputSchema(
             status=output_status,
             content=output_content,
-            action_performed=action_performed
+            action_performed=action_performed,
+            total_bytes=total_bytes,
+            next_offset=next_offset
         )
 
 # Example usage
@@ -1,8 +1,11 @@
+import os
 import subprocess
 import shlex
 import sys
+from typing import Callable, List, Optional, Tuple
 from atomic_agents.lib.base.base_tool import BaseTool
 from schemas.tool_schemas import ConsoleToolInputSchema, ConsoleToolOutputSchema, ConsoleToolConfig
+from utils.output_spool import OutputSpool
 
 class HumanInTheLoopConsoleTool(BaseTool):
     """
@@ -11,13 +14,92 @@ class HumanInTheLoopConsoleTool(BaseTool):
     input_schema = ConsoleToolInputSchema
     output_schema = ConsoleToolOutputSchema
 
-    def __init__(self, config: ConsoleToolConfig = ConsoleToolConfig()):
+    def __init__(
+        self,
+        config: ConsoleToolConfig = ConsoleToolConfig(),
+        approver: Optional[Callable[[str, str], bool]] = None,
+    ):
+        """
+        Args:
+            config: Timeout and output spooling settings.
+            approver: Decides on each proposed command from its text and reason, replacing the
+                interactive prompt (used by headless runs). If None, the user is asked.
+        """
         super().__init__(config)
+        self.approver = approver
         self.timeout = config.timeout
+        self.cwd = config.cwd
+        self.spool = OutputSpool(
+            config.workspace_dir, threshold_bytes=config.spool_threshold_bytes, preview_bytes=config.preview_bytes,
+            max_bytes=config.spool_max_bytes, max_age=config.spool_max_age
+        )
+
+    def _collect_stream(self, name: str, path: str, display_path: str, spooled_files: List[str]) -> str:
+        """
+        Returns the output section for one captured stream. Small streams are inlined and their spool
+        file removed; large ones keep their file and are shown as a head/tail preview.
+        """
+        if not self.spool.is_large(path):
+            with open(path, "rb") as f:
+                text = f.read().decode("utf-8", errors="replace")
+            os.remove(path)
+            return f"--- {name} ---\n{text}\n" if text else ""
+        spooled_files.append(display_path)
+        return f"--- {name} (spooled) ---\n{self.spool.preview(path, display_path)}\n"
+
+    def _execute(self, command: str) -> Tuple[str, bool, List[str]]:
+        """
+        Runs an approved command, spooling its output.
+
+        Returns:
+            The result text, whether the command was executed, and the spooled files kept for it.
+        """
+        print("Executing command...", file=sys.stderr)
+        executed = False
+        spooled_files: List[str] = []
+        # Streams go straight to spool files so large outputs never sit in memory
+        stdout_path, stdout_display = self.spool.new_file("console-stdout")
+        stderr_path, stderr_display = self.spool.new_file("console-stderr")
+        try:
+            # shlex for command parsing
+            with open(stdout_path, "wb") as stdout_file, open(stderr_path, "wb") as stderr_file:
+                process = subprocess.run(
+                    shlex.split(command),
+                    stdout=stdout_file,
+                    stderr=stderr_file,
+                    check=False, # No exception raised
+                    timeout=self.timeout,
+                    cwd=self.cwd
+                )
+
+            output = f"Exit Code: {process.returncode}\n"
+            output += self._collect_stream("STDOUT", stdout_path, stdout_display, spooled_files)
+            output += self._collect_stream("STDERR", stderr_path, stderr_display, spooled_files)
+
+            executed = True
+            print("Command execution finished.", file=sys.stderr)
+            return output.strip(), executed, spooled_files
+
+        except subprocess.TimeoutExpired:
+            print(f"Error: Command timed out after {self.timeout} seconds.", file=sys.stderr)
+            return f"Error: Command execution timed out after {self.timeout} seconds.", executed, spooled_files
+        except FileNotFoundError:
+            cmd_name = shlex.split(command)[0] if shlex.split(command) else "Unknown"
+            print(f"Error: Command not found: {cmd_name}", file=sys.stderr)
+            return f"Error: Command not found. Make sure '{cmd_name}' is installed and in PATH.", executed, spooled_files
+        except Exception as e:
+            print(f"Error executing command: {e}", file=sys.stderr)
+            return f"Error executing command: {e}", executed, spooled_files
+        finally:
+            if not executed:
+                for path in (stdout_path, stderr_path):
+                    if os.path.exists(path):
+                        os.remove(path)
 
     def run(self, params: ConsoleToolInputSchema) -> ConsoleToolOutputSchema:
         """
         Proposes the command to the user and executes it if approved.
+        With an approver set, it decides instead and the user is never prompted.
         You may use sudo for commands that require elevated privileges.
 
         Args:
@@ -35,52 +117,27 @@ class HumanInTheLoopConsoleTool(BaseTool):
         print(f"   Command: `{command}`", file=sys.stderr)
         print("-" * 50, file=sys.stderr)
 
+        if self.approver is not None:
+            if not self.approver(command, reason):
+                print("Command rejected by the approval policy.", file=sys.stderr)
+                return ConsoleToolOutputSchema(
+                    result="Command rejected by the approval policy: only pre-approved programs and options may run, on in-scope targets and files inside the workspace.",
+                    executed=False
+                )
+            output_result, executed, spooled_files = self._execute(command)
+            return ConsoleToolOutputSchema(result=output_result, executed=executed, spooled_files=spooled_files)
+
         executed = False
         output_result = "Command proposal initiated."
+        spooled_files: List[str] = []
 
         while True:
             try:
                 # Prompt the user for approval
                 approval = input("Do you want to execute this command? (y/n/edit): ").lower().strip()
                 if approval == 'y':
-                    print("Executing command...", file=sys.stderr)
-                    try:
-                        # shlex for command parsing
-                        process = subprocess.run(
-                            shlex.split(command),
-                            capture_output=True,
-                            text=True,
-                            check=False, # No exception raised
-                            timeout=self.timeout
-                        )
-
-                        output = f"Exit Code: {process.returncode}\n"
-                        if process.stdout:
-                            output += f"--- STDOUT ---\n{process.stdout}\n"
-                        if process.stderr:
-                            output += f"--- STDERR ---\n{process.stderr}\n"
-
-                        output_result = output.strip()
-                        executed = True
-                        print("Command execution finished.", file=sys.stderr)
-                        break
-
-                    except subprocess.TimeoutExpired:
-                        print(f"Error: Command timed out after {self.timeout} seconds.", file=sys.stderr)
-                        output_result = f"Error: Command execution timed out after {self.timeout} seconds."
-                        executed = False
-                        break
-                    except FileNotFoundError:
-                        cmd_name = shlex.split(command)[0] if shlex.split(command) else "Unknown"
-                        print(f"Error: Command not found: {cmd_name}", file=sys.stderr)
-                        output_result = f"Error: Command not found. Make sure '{cmd_name}' is installed and in PATH."
-                        executed = False
-                        break
-                    except Exception as e:
-                        print(f"Error executing command: {e}", file=sys.stderr)
-                        output_result = f"Error executing command: {e}"
-                        executed = False
-                        break
+                    output_result, executed, spooled_files = self._execute(command)
+                    break
 
                 elif approval == 'n':
                     reason = input("Please provide a reason for rejection (or press Enter to skip): ").strip()
@@ -112,7 +169,7 @@ class HumanInTheLoopConsoleTool(BaseTool):
                 executed = False
                 break
 
-        return ConsoleToolOutputSchema(result=output_result, executed=executed)
+        return ConsoleToolOutputSchema(result=output_result, executed=executed, spooled_files=spooled_files)
 
 # Example usage (for testing the tool directly)
 if __name__ == "__main__":
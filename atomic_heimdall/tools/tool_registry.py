@@ -0,0 +1,138 @@
+import sys
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Type, Union
+
+from atomic_agents.lib.base.base_io_schema import BaseIOSchema
+from atomic_agents.lib.base.base_tool import BaseTool, BaseToolConfig
+
+# Whether a tool call may run concurrently with others: a constant, or a predicate on the call's input
+ParallelSafety = Union[bool, Callable[[BaseIOSchema], bool]]
+
+
+class LazyTool:
+    """
+    Stands in for a tool whose module is only imported, and the tool only built, on its first run.
+    Its input schema is known up front so tool calls can be validated without loading the tool.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        module: str,
+        class_name: str,
+        input_schema: Type[BaseIOSchema],
+        config: Optional[BaseToolConfig] = None,
+        parallel_safe: ParallelSafety = False,
+        **kwargs: Any,
+    ):
+        """
+        Args:
+            name: Name the agent uses to call the tool.
+            module: Dotted path of the module defining the tool class.
+            class_name: Name of the tool class in that module.
+            input_schema: The tool's input schema.
+            config: Configuration passed to the tool's constructor.
+            parallel_safe: Whether calls may run concurrently with other tool calls (no user prompt,
+                no shared mutable state), or a predicate deciding it from the call's input.
+            **kwargs: Extra keyword arguments for the tool's constructor.
+        """
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.input_schema = input_schema
+        self.config = config
+        self.parallel_safe = parallel_safe
+        self.kwargs = kwargs
+        self._instance: Optional[BaseTool] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the tool has been imported and built."""
+        return self._instance is not None
+
+    def is_parallel_safe(self, params: BaseIOSchema) -> bool:
+        """Whether this call may run concurrently with the other calls of a batch."""
+        if callable(self.parallel_safe):
+            return bool(self.parallel_safe(params))
+        return self.parallel_safe
+
+    def get(self) -> BaseTool:
+        """
+        Returns the tool instance, importing its module and building it on first use.
+
+        Returns:
+            The tool instance.
+        """
+        with self._lock:
+            if self._instance is None:
+                tool_class = getattr(importlib.import_module(self.module), self.class_name)
+                if self.config is not None:
+                    self._instance = tool_class(self.config, **self.kwargs)
+                else:
+                    self._instance = tool_class(**self.kwargs)
+                print(f"Loaded tool '{self.name}' from {self.module}.", file=sys.stderr)
+            return self._instance
+
+    def run(self, params: BaseIOSchema) -> BaseIOSchema:
+        """
+        Runs the tool, loading it first if needed.
+
+        Args:
+            params: Input matching the tool's input schema.
+
+        Returns:
+            The tool's output.
+        """
+        return self.get().run(params)
+
+
+class ToolRegistry:
+    """
+    Name-indexed collection of lazily loaded tools, used by the main loop like a dict of tools.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, LazyTool] = {}
+
+    def register(
+        self,
+        name: str,
+        module: str,
+        class_name: str,
+        input_schema: Type[BaseIOSchema],
+        config: Optional[BaseToolConfig] = None,
+        parallel_safe: ParallelSafety = False,
+        **kwargs: Any,
+    ) -> LazyTool:
+        """
+        Registers a tool without importing it.
+
+        Args:
+            name: Name the agent uses to call the tool.
+            module: Dotted path of the module defining the tool class.
+            class_name: Name of the tool class in that module.
+            input_schema: The tool's input schema.
+            config: Configuration passed to the tool's constructor.
+            parallel_safe: Whether calls may run concurrently with other tool calls, or a predicate on the input.
+            **kwargs: Extra keyword arguments for the tool's constructor.
+
+        Returns:
+            The registered lazy tool.
+        """
+        tool = LazyTool(name, module, class_name, input_schema, config, parallel_safe, **kwargs)
+        self._tools[name] = tool
+        return tool
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __getitem__(self, name: str) -> LazyTool:
+        return self._tools[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tools)
+
+    def keys(self):
+        return self._tools.keys()
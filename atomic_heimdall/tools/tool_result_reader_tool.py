@@ -0,0 +1,44 @@
+import sys
+from atomic_agents.lib.base.base_tool import BaseTool
+from schemas.tool_schemas import ToolResultReaderInputSchema, ToolResultReaderOutputSchema, ToolResultReaderConfig
+from utils.result_store import ToolResultStore
+
+class ToolResultReaderTool(BaseTool):
+    """
+    Atomic Agents Tool: Reads back parts of earlier tool outputs that were truncated in the prompt.
+    """
+    input_schema = ToolResultReaderInputSchema
+    output_schema = ToolResultReaderOutputSchema
+
+    def __init__(self, config: ToolResultReaderConfig = ToolResultReaderConfig(), store: ToolResultStore = None):
+        super().__init__(config)
+        self.max_length = config.max_length
+        self.store = store if store is not None else ToolResultStore()
+        print("ToolResultReaderTool initialized.", file=sys.stderr)
+
+    def run(self, params: ToolResultReaderInputSchema) -> ToolResultReaderOutputSchema:
+        """
+        Returns the requested slice of a stored tool result.
+
+        Args:
+            params: Input parameters including the handle, offset and length.
+
+        Returns:
+            Output schema containing the slice and where the next one starts.
+        """
+        result = self.store.read(params.handle, params.offset, min(params.length, self.max_length))
+        if result is None:
+            return ToolResultReaderOutputSchema(
+                content=f"Error: No stored result with handle '{params.handle}'.",
+                offset=params.offset,
+                total_length=0,
+                next_offset=None,
+            )
+
+        content, total_length, next_offset = result
+        return ToolResultReaderOutputSchema(
+            content=content,
+            offset=params.offset,
+            total_length=total_length,
+            next_offset=next_offset,
+        )
@@ -1,19 +1,28 @@
-import os
-from typing import List, Optional
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Set, Tuple
 import instructor
 from pydantic import Field
-import openai
 from dotenv import load_dotenv, find_dotenv
 from rich.console import Console
 from rich.panel import Panel
 from rich.syntax import Syntax
 from rich.markdown import Markdown
+from rich.live import Live
+from rich.errors import LiveError
 
 from atomic_agents.agents.base_agent import BaseAgent, BaseAgentConfig
 from atomic_agents.lib.base.base_io_schema import BaseIOSchema
 from atomic_agents.lib.components.agent_memory import AgentMemory
 from atomic_agents.lib.components.system_prompt_generator import SystemPromptGenerator
 
+from schemas.tool_schemas import WebSearchToolConfig
+from utils.rate_limiter import rate_limit_scheduler
+from utils.client_factory import create_client
+from utils.url_utils import canonicalize_url
+from utils.text_dedup import near_duplicate_indices
+from utils.context_packing import estimate_tokens, pack_context
 from tools.webpage_scraper_tool import (
     WebpageScraperTool,
     WebpageScraperToolConfig,
@@ -24,79 +33,70 @@ from tools.websearch_tool import (
     DuckDuckGoSearchTool,
     DuckDuckGoSearchToolConfig,
     DuckDuckGoSearchToolInputSchema,
+    DuckDuckGoSearchResultItemSchema,
     DuckDuckGoSearchToolOutputSchema,
 )
 
 
 load_dotenv(find_dotenv())
 
-### GEMINI CLIENT INITIALIZATION ###
-try:
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        print("Error: No API key found. Please set GEMINI_API_KEY in your environment or a .env file.")
-        exit(42)
-    client = instructor.from_openai(
-        openai.OpenAI(
-            api_key=api_key,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-        ),
-        mode=instructor.Mode.JSON,
-    )
-    model = "models/gemini-2.0-flash-lite"
-except Exception as e:
-    print(f"Error initializing Gemini client: {e}")
-    exit(42)
-
-### MISTRAL CLIENT INITIALIZATION ###
-# try:
-#     api_key = os.getenv("MISTRAL_API_KEY")
-#     if not api_key:
-#         print("Error: Mistral API key not found. Cannot initialize any client.")
-#         exit(42)
-#     client = instructor.from_openai(
-#         openai.OpenAI(
-#             api_key=api_key,
-#             base_url="https://api.mistral.ai/v1/",
-#         ),
-#         mode=instructor.Mode.JSON,
-#     )
-#     model = "mistral-small" # Specify the Mistral model name
-#     print("Using Mistral client.")
-# except Exception as e:
-#     print(f"Error initializing Mistral client: {e}")
-#     print("Cannot initialize any client. Exiting.")
-#     exit(42)
-
-### OPENAI CLIENT INITIALIZATION ###
-# try:
-#     api_key = os.getenv("OPENAI_API_KEY")
-#     if not api_key:
-#         print("Error: OpenAI API key not found. Cannot initialize any client.")
-#         exit(1)
-#     client = instructor.from_openai(openai.OpenAI(api_key=api_key))
-#     model = "gpt-4o-mini" # Specify the OpenAI model name
-#     print("Using OpenAI client.")
-# except Exception as e:
-#     print(f"Error initializing OpenAI client: {e}")
-#     print("Cannot initialize any client. Exiting.")
-#     exit(42)
-
-### LOCAL OLLAMA CLIENT INITIALIZATION ###
-# try:
-#     model = "qwen2.5" # Specify the local model name
-#     client = instructor.from_openai(
-#         openai.OpenAI(
-#             api_key="ollama",
-#             base_url="http://localhost:11434/v1",
-#         ),
-#         mode=instructor.Mode.JSON,
-#     )
-#     print("Using local Ollama client.")
-# except Exception as e:
-#     print(f"Error initializing local Ollama client: {e}")
-#     print("Cannot initialize any client. Exiting.")
-#     exit(42)
+#####################
+# CLIENT MANAGEMENT #
+#####################
+
+# The LLM client is built on first use rather than at import time, so importing this module is cheap
+# and never exits the process. Callers (main.py) inject their provider through `set_client_factory`;
+# every agent of every flow then shares the one async client, whose connection pool comes from
+# utils.client_factory.
+
+ClientFactory = Callable[[], Tuple[instructor.AsyncInstructor, str]]
+
+
+def create_default_client() -> Tuple[instructor.AsyncInstructor, str]:
+    """
+    Builds the default async client: Gemini, through the shared client factory.
+
+    Returns:
+        Tuple[instructor.AsyncInstructor, str]: The client and the model name.
+
+    Raises:
+        ValueError: If GEMINI_API_KEY is not set.
+    """
+    return create_client("gemini", async_client=True, model="models/gemini-2.0-flash-lite")
+
+
+_client_factory: ClientFactory = create_default_client
+_client: Optional[instructor.AsyncInstructor] = None
+_model: Optional[str] = None
+_client_lock = threading.Lock()
+
+
+def set_client_factory(factory: ClientFactory) -> None:
+    """
+    Sets the factory used to build the web search client, replacing any client already built.
+
+    Args:
+        factory (ClientFactory): Callable returning an async instructor client and a model name.
+    """
+    global _client_factory, _client, _model
+    with _client_lock:
+        _client_factory = factory
+        _client = None
+        _model = None
+
+
+def get_client() -> Tuple[instructor.AsyncInstructor, str]:
+    """
+    Returns the shared web search client and model, building them on first use.
+
+    Returns:
+        Tuple[instructor.AsyncInstructor, str]: The client and the model name.
+    """
+    global _client, _model
+    with _client_lock:
+        if _client is None:
+            _client, _model = _client_factory()
+        return _client, _model
 
 
 ########################
@@ -122,6 +122,23 @@ class ScrapedContentSchema(BaseIOSchema):
         ..., description="List of scraped webpage contents and metadata."
     )
 
+class PageGroupInputSchema(BaseIOSchema):
+    """Input schema for summarizing a group of scraped pages against the user query (map step)."""
+    query: str = Field(..., description="The user's original query.")
+    scraped_pages: List[WebpageScraperToolOutputSchema] = Field(
+        ..., description="The scraped pages to summarize."
+    )
+
+class PageGroupSummaryOutputSchema(BaseIOSchema):
+    """Schema for the summary of a group of scraped pages produced by the map step."""
+    summary: str = Field(..., description="The facts from the pages that are relevant to the query, in markdown, citing the page titles they come from.")
+
+class PageSummariesSchema(BaseIOSchema):
+    """Schema for the page-group summaries combined in the reduce step."""
+    summaries: List[PageGroupSummaryOutputSchema] = Field(
+        ..., description="Summaries of the scraped pages, one per page group."
+    )
+
 
 #####################
 # SYSTEM PROMPTS    #
@@ -168,131 +185,567 @@ answer_synthesis_system_prompt = SystemPromptGenerator(
     ],
 )
 
+# System prompt for the map step of map-reduce synthesis: summarizing a group of pages
+page_summary_system_prompt = SystemPromptGenerator(
+    background=[
+        "You are a research assistant summarizing scraped webpages for a web search system.",
+        "The input contains the user's 'query' and a list of 'scraped_pages', each with 'content' (markdown) and 'metadata'.",
+        "Your summary will be combined with summaries of other pages to answer the query.",
+    ],
+    output_instructions=[
+        "Extract every fact, figure, command or recommendation from the pages that helps answer the query.",
+        "Attribute the facts to the title of the page they come from.",
+        "Ignore navigation, boilerplate and content unrelated to the query.",
+        "If the pages contain nothing relevant, say so in one sentence.",
+        "Format your output strictly according to the PageGroupSummaryOutputSchema.",
+    ],
+)
+
+# System prompt for the reduce step of map-reduce synthesis: combining the summaries
+summary_synthesis_system_prompt = SystemPromptGenerator(
+    background=[
+        "You are a helpful answer synthesis agent.",
+        "You have been provided with summaries of the webpages scraped for the user's original query.",
+        "The input contains a JSON object with a key 'summaries', a list of objects each holding a 'summary' of a group of pages.",
+    ],
+    output_instructions=[
+        "Review the original user query.",
+        "Synthesize the summaries into a single, coherent answer that directly addresses the user's original query.",
+        "Reconcile overlapping or conflicting information, keeping the attributions to the source pages.",
+        "If the summaries do not contain sufficient information to fully answer the query, state this limitation in your answer.",
+        "Format your final answer strictly according to the FinalAnswerOutputSchema, ensuring the synthesized answer is a single string in the 'final_answer' field.",
+        "You are encouraged to use markdown formatting in your final answer to structure the information.",
+    ],
+)
+
 ######################
 # AGENT DEFINITIONS  #
 ######################
 
+# Agents are built per flow so that concurrent searches never share (and clobber) a memory.
+# They are cheap to construct: the underlying client and its connection pool are shared (see `get_client`).
+
 # Agent 1: Generates search queries
-query_generation_agent = BaseAgent(
-    BaseAgentConfig(
-        client=client,
-        model=model,
-        system_prompt_generator=query_generation_system_prompt,
-        input_schema=UserQueryInputSchema,
-        output_schema=DuckDuckGoSearchToolInputSchema, # Outputs parameters for the search tool
-        memory=AgentMemory(), # Each agent instance gets its own memory initially
+def create_query_generation_agent(memory: AgentMemory) -> BaseAgent:
+    client, model = get_client()
+    return BaseAgent(
+        BaseAgentConfig(
+            client=client,
+            model=model,
+            system_prompt_generator=query_generation_system_prompt,
+            input_schema=UserQueryInputSchema,
+            output_schema=DuckDuckGoSearchToolInputSchema, # Outputs parameters for the search tool
+            memory=memory,
+        )
     )
-)
 
 # Agent 2: Synthesizes the final answer
-answer_synthesis_agent = BaseAgent(
-    BaseAgentConfig(
-        client=client,
-        model=model,
-        system_prompt_generator=answer_synthesis_system_prompt,
-        input_schema=ScrapedContentSchema,
-        output_schema=FinalAnswerOutputSchema, # Outputs the final answer
-        memory=AgentMemory(), # Each agent instance gets its own memory initially
+def create_answer_synthesis_agent(memory: AgentMemory) -> BaseAgent:
+    client, model = get_client()
+    return BaseAgent(
+        BaseAgentConfig(
+            client=client,
+            model=model,
+            system_prompt_generator=answer_synthesis_system_prompt,
+            input_schema=ScrapedContentSchema,
+            output_schema=FinalAnswerOutputSchema, # Outputs the final answer
+            memory=memory,
+        )
+    )
+
+
+# Map-reduce synthesis: one summary agent per page group, each with its own memory
+def create_page_summary_agent() -> BaseAgent:
+    client, model = get_client()
+    return BaseAgent(
+        BaseAgentConfig(
+            client=client,
+            model=model,
+            system_prompt_generator=page_summary_system_prompt,
+            input_schema=PageGroupInputSchema,
+            output_schema=PageGroupSummaryOutputSchema,
+            memory=AgentMemory(),
+        )
+    )
+
+def create_summary_synthesis_agent(memory: AgentMemory) -> BaseAgent:
+    client, model = get_client()
+    return BaseAgent(
+        BaseAgentConfig(
+            client=client,
+            model=model,
+            system_prompt_generator=summary_synthesis_system_prompt,
+            input_schema=PageSummariesSchema,
+            output_schema=FinalAnswerOutputSchema,
+            memory=memory,
+        )
+    )
+
+
+async def arun_agent(agent: BaseAgent, user_input: BaseIOSchema) -> BaseIOSchema:
+    """
+    Awaitable counterpart of `BaseAgent.run` for agents built on an async instructor client.
+
+    Args:
+        agent (BaseAgent): The agent to run.
+        user_input (BaseIOSchema): The input for the agent, recorded in its memory.
+
+    Returns:
+        BaseIOSchema: The agent's response, matching its output schema.
+    """
+    agent.memory.initialize_turn()
+    agent.current_user_input = user_input
+    agent.memory.add_message("user", user_input)
+
+    messages = []
+    if agent.system_role is not None:
+        messages.append({"role": agent.system_role, "content": agent.system_prompt_generator.generate_prompt()})
+    messages += agent.memory.get_history()
+    response = await agent.client.chat.completions.create(
+        messages=messages,
+        model=agent.model,
+        response_model=agent.output_schema,
+        **agent.model_api_parameters,
     )
-)
+
+    agent.memory.add_message("assistant", response)
+    return response
+
+
+class NullConsole:
+    """
+    Stands in for a Rich Console in headless runs. Output calls do nothing, so no renderable
+    (tables, syntax-highlighted JSON, Markdown) is ever rendered.
+    """
+
+    def print(self, *objects: Any, **kwargs: Any) -> None:
+        pass
+
+
+async def astream_final_answer(agent: BaseAgent, user_input: BaseIOSchema, console: Console) -> FinalAnswerOutputSchema:
+    """
+    Runs an answer agent with partial streaming, rendering the answer live as it is generated.
+
+    Args:
+        agent (BaseAgent): An agent whose output schema is `FinalAnswerOutputSchema`.
+        user_input (BaseIOSchema): The input for the agent, recorded in its memory.
+        console (Console): Console the answer is rendered on.
+
+    Returns:
+        FinalAnswerOutputSchema: The complete answer.
+    """
+    # A console holds one live display at a time; concurrent flows sharing it print once at the end instead
+    live = Live(Markdown(""), console=console, refresh_per_second=8, vertical_overflow="visible")
+    try:
+        live.start()
+    except LiveError:
+        live = None
+
+    partial_response = None
+    try:
+        async for partial_response in agent.run_async(user_input):
+            if live is not None and partial_response.final_answer:
+                live.update(Markdown(partial_response.final_answer))
+    finally:
+        if live is not None:
+            live.stop()
+
+    if partial_response is None:
+        raise RuntimeError("The answer stream ended without any output.")
+    final_answer_output = FinalAnswerOutputSchema(**partial_response.model_dump())
+    if live is None:
+        console.print(Markdown(final_answer_output.final_answer))
+    return final_answer_output
+
+
+async def asynthesize_answer(
+    agent: BaseAgent,
+    user_input: BaseIOSchema,
+    config: WebSearchToolConfig,
+    console: Console,
+) -> FinalAnswerOutputSchema:
+    """
+    Runs the final answer agent, streaming the answer to the console if `stream_answer` is set.
+
+    Returns:
+        FinalAnswerOutputSchema: The complete answer.
+    """
+    if config.stream_answer:
+        console.print("\n[bold blue]Final Answer:[/bold blue]")
+        return await astream_final_answer(agent, user_input, console)
+    return await arun_agent(agent, user_input)
+
+
+#####################
+# SHARED TOOL STATE #
+#####################
+
+# Shared so every search in a session reuses the tools' pooled connections and clients. Like the LLM
+# client, they are built on first use: the scraper opens its on-disk cache and the search tool starts
+# its worker threads, which importing this module should not do.
+_webpage_scraper_tool: Optional[WebpageScraperTool] = None
+_duckduckgo_search_tool: Optional[DuckDuckGoSearchTool] = None
+_tools_lock = threading.Lock()
+
+
+def get_webpage_scraper_tool() -> WebpageScraperTool:
+    """Returns the shared webpage scraper, building it on first use."""
+    global _webpage_scraper_tool
+    with _tools_lock:
+        if _webpage_scraper_tool is None:
+            _webpage_scraper_tool = WebpageScraperTool(WebpageScraperToolConfig())
+        return _webpage_scraper_tool
+
+
+def get_duckduckgo_search_tool() -> DuckDuckGoSearchTool:
+    """Returns the shared DuckDuckGo search tool, building it on first use."""
+    global _duckduckgo_search_tool
+    with _tools_lock:
+        if _duckduckgo_search_tool is None:
+            _duckduckgo_search_tool = DuckDuckGoSearchTool(DuckDuckGoSearchToolConfig())
+        return _duckduckgo_search_tool
 
 
 #################
 # EXECUTION FLOW #
 #################
 
-def run_web_search_flow(user_query: str, console: Optional[Console]) -> Optional[str]:
+async def ascrape_search_results(
+    results: List[DuckDuckGoSearchResultItemSchema],
+    config: WebSearchToolConfig,
+    console: Console,
+    scraped_urls: Optional[Set[str]] = None,
+) -> List[WebpageScraperToolOutputSchema]:
     """
-    Runs the complete web search and answer synthesis flow for a given user query.
+    Scrapes search results concurrently and returns the successful pages in search order.
+
+    Results are deduplicated on their canonical URL, and URLs already in `scraped_urls` are skipped,
+    so a page is fetched at most once per flow even when several searches return it.
+
+    At most `scrape_workers` pages are fetched at once, each URL gets its own deadline
+    (`scrape_url_timeout`) and the whole step is bounded by `scrape_total_timeout`.
+    Failed or late URLs are reported and skipped without holding up the others.
 
     Args:
-        user_query (str): The natural language query from the user.
+        results (List[DuckDuckGoSearchResultItemSchema]): The search results to scrape.
+        config (WebSearchToolConfig): Worker count and deadlines for the scraping step.
+        console (Console): Console used for progress reporting.
+        scraped_urls (Optional[Set[str]]): Canonical URLs already scraped in this flow. Updated in place.
 
     Returns:
-        Optional[str]: The synthesized final answer, or None if an error occurred.
+        List[WebpageScraperToolOutputSchema]: The scraped pages, in the same order as `results`.
     """
-    if console is None:
-        console = Console()
+    if scraped_urls is None:
+        scraped_urls = set()
+    urls = []
+    for result in results:
+        canonical_url = canonicalize_url(result.url)
+        if canonical_url not in scraped_urls:
+            scraped_urls.add(canonical_url)
+            urls.append(result.url)
+    if not urls:
+        return []
+
+    workers = asyncio.Semaphore(max(1, config.scrape_workers))
+    webpage_scraper_tool = get_webpage_scraper_tool()
+
+    async def scrape(i: int, url: str) -> Optional[WebpageScraperToolOutputSchema]:
+        async with workers:
+            console.print(f"[yellow]Scraping URL {i+1}/{len(urls)}: {url}[/yellow]")
+            try:
+                scraped_result = await asyncio.wait_for(
+                    webpage_scraper_tool.arun(WebpageScraperToolInputSchema(url=url, include_links=True)),
+                    timeout=config.scrape_url_timeout,
+                )
+            except asyncio.TimeoutError:
+                console.print(f"[red]Timed out scraping {url} after {config.scrape_url_timeout}s[/red]")
+                return None
+            except Exception as e:
+                console.print(f"[red]Error scraping {url}: {str(e)}[/red]")
+                return None
+            console.print(f"[green]Successfully scraped: {url}[/green]")
+            return scraped_result
+
+    tasks = [asyncio.create_task(scrape(i, url)) for i, url in enumerate(urls)]
+    _, pending = await asyncio.wait(tasks, timeout=config.scrape_total_timeout)
+    if pending:
+        console.print(f"[red]Scraping budget of {config.scrape_total_timeout}s exhausted, skipping {len(pending)} URL(s).[/red]")
+        for task in pending:
+            task.cancel()
+
+    return [task.result() for task in tasks if task not in pending and task.result() is not None]
+
+
+def pack_scraped_contents(
+    query: str,
+    pages: List[WebpageScraperToolOutputSchema],
+    token_budget: int,
+    chunk_chars: int,
+) -> List[WebpageScraperToolOutputSchema]:
+    """
+    Reduces scraped pages to their chunks most relevant to the query, within a token budget.
 
-    console.print(f"Using model: {model}")
+    Chunks are ranked with BM25 across all pages; each page keeps its metadata and its selected
+    chunks in document order, and pages with no selected chunk are dropped.
 
-    current_flow_memory = AgentMemory()
+    Args:
+        query (str): The text the chunks are ranked against.
+        pages (List[WebpageScraperToolOutputSchema]): The scraped pages.
+        token_budget (int): Estimated token budget for the packed content, metadata included.
+        chunk_chars (int): Maximum size of a chunk in characters.
+
+    Returns:
+        List[WebpageScraperToolOutputSchema]: The packed pages, in their original order.
+    """
+    overhead = max(estimate_tokens(page.metadata.model_dump_json()) for page in pages)
+    selected = pack_context(query, [page.content for page in pages], token_budget, chunk_chars, overhead)
+    return [
+        WebpageScraperToolOutputSchema(content="\n\n[...]\n\n".join(chunks), metadata=page.metadata)
+        for page, chunks in zip(pages, selected)
+        if chunks
+    ]
 
-    query_generation_agent.memory = current_flow_memory
-    answer_synthesis_agent.memory = current_flow_memory
 
-    duckduckgo_search_tool = DuckDuckGoSearchTool(DuckDuckGoSearchToolConfig())
-    webpage_scraper_tool = WebpageScraperTool(WebpageScraperToolConfig())
+def group_pages(pages: List[WebpageScraperToolOutputSchema], group_tokens: int) -> List[List[WebpageScraperToolOutputSchema]]:
+    """
+    Splits pages into consecutive groups of at most `group_tokens` estimated tokens.
 
-    console.print(Panel(f"[bold cyan]User Input:[/bold cyan] {user_query}", expand=False))
+    A page larger than the budget gets a group of its own.
+    """
+    groups: List[List[WebpageScraperToolOutputSchema]] = []
+    current: List[WebpageScraperToolOutputSchema] = []
+    current_tokens = 0
+    for page in pages:
+        tokens = estimate_tokens(page.content)
+        if current and current_tokens + tokens > group_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(page)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def amap_reduce_answer(
+    user_query: str,
+    ranking_query: str,
+    pages: List[WebpageScraperToolOutputSchema],
+    memory: AgentMemory,
+    config: WebSearchToolConfig,
+    console: Console,
+) -> FinalAnswerOutputSchema:
+    """
+    Synthesizes the final answer by summarizing page groups in parallel, then combining the summaries.
 
-    console.print("\n[bold yellow]Step 1: Query Generation Agent generating search queries...[/bold yellow]")
-    search_tool_params = None
-    try:
-        agent_input = UserQueryInputSchema(query=user_query)
-        search_tool_params: DuckDuckGoSearchToolInputSchema = query_generation_agent.run(agent_input)
+    Each group is packed to `map_group_tokens` and summarized by its own agent, with at most
+    `map_workers` calls in flight. Groups whose summary fails are reported and left out.
 
-        console.print("\n[bold magenta]Generated Search Parameters:[/bold magenta]")
-        search_params_syntax = Syntax(
-            str(search_tool_params.model_dump_json(indent=2)), "json", theme="monokai", line_numbers=True
-        )
-        console.print(search_params_syntax)
+    Args:
+        user_query (str): The user's original query, given to every map call.
+        ranking_query (str): The text used to rank chunks when a group must be packed.
+        pages (List[WebpageScraperToolOutputSchema]): The scraped pages.
+        memory (AgentMemory): The flow memory used by the reduce call.
+        config (WebSearchToolConfig): Fan-out and group size for the map step.
+        console (Console): Console used for progress reporting.
 
-    except Exception as e:
-        console.print(f"[red]Error during search query generation:[/red] {str(e)}")
-        return None
+    Returns:
+        FinalAnswerOutputSchema: The final answer produced by the reduce call, streamed if `stream_answer` is set.
+    """
+    groups = group_pages(pages, config.map_group_tokens)
+    workers = asyncio.Semaphore(max(1, config.map_workers))
 
-    console.print("\n[bold yellow]Step 2: Executing search tool...[/bold yellow]")
-    search_results = None
-    try:
-        search_results: DuckDuckGoSearchToolOutputSchema = duckduckgo_search_tool.run(search_tool_params)
+    async def summarize(i: int, group: List[WebpageScraperToolOutputSchema]) -> PageGroupSummaryOutputSchema:
+        async with workers:
+            packed = await asyncio.to_thread(
+                pack_scraped_contents, ranking_query, group, config.map_group_tokens, config.context_chunk_chars
+            )
+            console.print(f"[yellow]Summarizing page group {i+1}/{len(groups)} ({len(packed)} page(s))[/yellow]")
+            return await arun_agent(create_page_summary_agent(), PageGroupInputSchema(query=user_query, scraped_pages=packed))
+
+    results = await asyncio.gather(*[summarize(i, group) for i, group in enumerate(groups)], return_exceptions=True)
+    summaries = []
+    for i, result in enumerate(results):
+        if isinstance(result, BaseException):
+            console.print(f"[red]Error summarizing page group {i+1}: {str(result)}[/red]")
+        else:
+            summaries.append(result)
+    if not summaries:
+        raise RuntimeError("Every page group failed to summarize.")
+
+    console.print(f"[dim]Combining {len(summaries)} summaries...[/dim]")
+    return await asynthesize_answer(
+        create_summary_synthesis_agent(memory), PageSummariesSchema(summaries=summaries), config, console
+    )
 
-        console.print("\n[bold green]Search Results:[/bold green]")
-        search_results_syntax = Syntax(
-            str(search_results.model_dump_json(indent=2)), "json", theme="monokai", line_numbers=True
-        )
-        console.print(search_results_syntax)
 
-        if not search_results or not search_results.results:
-            console.print("[yellow]No search results found.[/yellow]")
-        # else:
-        #     current_flow_memory.add_message("assistant", search_results)
+async def aspeculative_scrape(
+    user_query: str,
+    config: WebSearchToolConfig,
+    console: Console,
+    scraped_urls: Set[str],
+) -> List[WebpageScraperToolOutputSchema]:
+    """
+    Searches the raw user query and scrapes its top hits, to overlap with query generation.
 
-    except Exception as e:
-        console.print(f"[red]Error during search execution:[/red] {str(e)}")
-        # We might still proceed to synthesis to report the error or return None
-
-    console.print("\n[bold yellow]Step 3: Scraping search results...[/bold yellow]")
-    scraped_contents: List[WebpageScraperToolOutputSchema] = []
-    if search_results and search_results.results:
-        for i, result in enumerate(search_results.results):
-            console.print(f"[yellow]Scraping URL {i+1}/{len(search_results.results)}: {result.url}[/yellow]")
-            webpage_scraper_tool_input = WebpageScraperToolInputSchema(
-                url=result.url,
-                include_links=True,
+    Args:
+        user_query (str): The user's query, searched as-is.
+        config (WebSearchToolConfig): Number of results and scraping limits.
+        console (Console): Console used for progress reporting.
+        scraped_urls (Set[str]): Canonical URLs already scraped in this flow. Updated in place.
+
+    Returns:
+        List[WebpageScraperToolOutputSchema]: The scraped pages, in search order.
+    """
+    search_results = await get_duckduckgo_search_tool().arun(
+        DuckDuckGoSearchToolInputSchema(queries=[user_query], max_results=config.speculative_results)
+    )
+    for status in search_results.query_statuses:
+        if not status.success:
+            console.print(f"[yellow]Speculative search failed after {status.attempts} attempt(s): {status.error}[/yellow]")
+    console.print(f"[dim]Speculative search returned {len(search_results.results)} result(s), scraping them now.[/dim]")
+    return await ascrape_search_results(search_results.results, config, console, scraped_urls)
+
+
+async def arun_web_search_flow(
+    user_query: str,
+    console: Optional[Console],
+    config: Optional[WebSearchToolConfig] = None,
+) -> Optional[str]:
+    """
+    Runs the complete web search and answer synthesis flow for a given user query.
+
+    Args:
+        user_query (str): The natural language query from the user.
+        console (Optional[Console]): Console used for progress output. If None, the flow runs headless: nothing is printed or rendered and the answer is not streamed.
+        config (Optional[WebSearchToolConfig]): Tuning for the flow. Defaults are used if None.
+
+    Returns:
+        Optional[str]: The synthesized final answer, or None if an error occurred.
+    """
+    if config is None:
+        config = WebSearchToolConfig()
+    if console is None:
+        console = NullConsole()
+        config = config.model_copy(update={"stream_answer": False})
+
+    _, model = get_client()
+    console.print(f"Using model: {model}")
+
+    current_flow_memory = AgentMemory()
+
+    query_generation_agent = create_query_generation_agent(current_flow_memory)
+    answer_synthesis_agent = create_answer_synthesis_agent(current_flow_memory)
+
+    console.print(Panel(f"[bold cyan]User Input:[/bold cyan] {user_query}", expand=False))
+    with rate_limit_scheduler.track_waits() as rate_limit_waits:
+        # Speculatively search and scrape the raw query while the LLM is still generating queries
+        scraped_urls: Set[str] = set()
+        speculative_task = None
+        if config.speculative_search:
+            speculative_task = asyncio.create_task(aspeculative_scrape(user_query, config, console, scraped_urls))
+
+        console.print("\n[bold yellow]Step 1: Query Generation Agent generating search queries...[/bold yellow]")
+        search_tool_params = None
+        try:
+            agent_input = UserQueryInputSchema(query=user_query)
+            search_tool_params: DuckDuckGoSearchToolInputSchema = await arun_agent(query_generation_agent, agent_input)
+
+            console.print("\n[bold magenta]Generated Search Parameters:[/bold magenta]")
+            search_params_syntax = Syntax(
+                str(search_tool_params.model_dump_json(indent=2)), "json", theme="monokai", line_numbers=True
+            )
+            console.print(search_params_syntax)
+
+        except Exception as e:
+            console.print(f"[red]Error during search query generation:[/red] {str(e)}")
+            if speculative_task is None:
+                return None
+            console.print("[yellow]Continuing with the speculative results only.[/yellow]")
+
+        console.print("\n[bold yellow]Step 2: Executing search tool...[/bold yellow]")
+        search_results = None
+        try:
+            if search_tool_params is not None:
+                search_results: DuckDuckGoSearchToolOutputSchema = await get_duckduckgo_search_tool().arun(search_tool_params)
+            else:
+                search_results = DuckDuckGoSearchToolOutputSchema(results=[])
+
+            console.print("\n[bold green]Search Results:[/bold green]")
+            search_results_syntax = Syntax(
+                str(search_results.model_dump_json(indent=2)), "json", theme="monokai", line_numbers=True
             )
+            console.print(search_results_syntax)
+
+            for status in search_results.query_statuses:
+                if not status.success:
+                    console.print(f"[yellow]Query '{status.query}' failed after {status.attempts} attempt(s): {status.error}[/yellow]")
+
+            if not search_results or not search_results.results:
+                console.print("[yellow]No search results found.[/yellow]")
+            # else:
+            #     current_flow_memory.add_message("assistant", search_results)
+
+        except Exception as e:
+            console.print(f"[red]Error during search execution:[/red] {str(e)}")
+            # We might still proceed to synthesis to report the error or return None
+
+        console.print("\n[bold yellow]Step 3: Scraping search results...[/bold yellow]")
+        scraped_contents: List[WebpageScraperToolOutputSchema] = []
+        try:
+            if search_results and search_results.results:
+                scraped_contents = await ascrape_search_results(search_results.results, config, console, scraped_urls)
+        except Exception as e:
+            console.print(f"[red]Error during scraping:[/red] {str(e)}")
+
+        if speculative_task is not None:
             try:
-                scraped_result: WebpageScraperToolOutputSchema = webpage_scraper_tool.run(webpage_scraper_tool_input)
-                scraped_contents.append(scraped_result)
-                console.print(f"[green]Successfully scraped: {result.url}[/green]")
+                scraped_contents = await speculative_task + scraped_contents
             except Exception as e:
-                console.print(f"[red]Error scraping {result.url}: {str(e)}[/red]")
-                # Continue to try and scrape other results
-                continue
+                console.print(f"[red]Error during speculative search:[/red] {str(e)}")
 
-    if not scraped_contents:
-         console.print("[yellow]No content was successfully scraped.[/yellow]")
+        if not scraped_contents:
+             console.print("[yellow]No content was successfully scraped.[/yellow]")
 
-    scraped_data = ScrapedContentSchema(scraped_pages=scraped_contents)
+    if rate_limit_waits.seconds > 0:
+        console.print(f"[dim]Time spent waiting on rate limits: {rate_limit_waits.seconds:.2f}s[/dim]")
+
+    if config.near_duplicate_distance >= 0 and len(scraped_contents) > 1:
+        kept = await asyncio.to_thread(
+            near_duplicate_indices, [page.content for page in scraped_contents], config.near_duplicate_distance
+        )
+        if len(kept) < len(scraped_contents):
+            console.print(f"[dim]Dropped {len(scraped_contents) - len(kept)} near-duplicate page(s).[/dim]")
+            scraped_contents = [scraped_contents[i] for i in kept]
+
+    ranking_query = " ".join([user_query, *(search_tool_params.queries if search_tool_params else [])])
+    scraped_tokens = sum(estimate_tokens(page.content) for page in scraped_contents)
+    use_map_reduce = config.map_reduce_synthesis and scraped_tokens > config.map_reduce_threshold_tokens
+
+    if not use_map_reduce and config.context_token_budget > 0 and scraped_contents:
+        scraped_contents = await asyncio.to_thread(
+            pack_scraped_contents, ranking_query, scraped_contents, config.context_token_budget, config.context_chunk_chars
+        )
+        console.print(f"[dim]Packed {len(scraped_contents)} page(s) into a {config.context_token_budget}-token context.[/dim]")
 
     console.print("\n[bold yellow]Step 4: Answer Synthesis Agent generating final answer...[/bold yellow]")
     final_answer = None
     try:
-        final_answer_output: FinalAnswerOutputSchema = answer_synthesis_agent.run(scraped_data)
+        if use_map_reduce:
+            console.print(f"[dim]~{scraped_tokens} tokens of scraped content, using map-reduce synthesis.[/dim]")
+            final_answer_output: FinalAnswerOutputSchema = await amap_reduce_answer(
+                user_query, ranking_query, scraped_contents, current_flow_memory, config, console
+            )
+        else:
+            scraped_data = ScrapedContentSchema(scraped_pages=scraped_contents)
+            final_answer_output: FinalAnswerOutputSchema = await asynthesize_answer(
+                answer_synthesis_agent, scraped_data, config, console
+            )
         final_answer = Markdown(final_answer_output.final_answer)
 
-        console.print("\n[bold blue]Final Answer:[/bold blue]")
-        console.print(final_answer)
+        if not config.stream_answer:
+            console.print("\n[bold blue]Final Answer:[/bold blue]")
+            console.print(final_answer)
 
     except Exception as e:
         console.print(f"[red]Error during final answer generation:[/red] {str(e)}")
@@ -303,6 +756,53 @@ def run_web_search_flow(user_query: str, console: Optional[Console]) -> Optional
     return final_answer
 
 
+# Every flow runs on one long-lived background loop, so the async HTTP and LLM clients
+# (and their keep-alive connections) survive between calls made from synchronous code.
+_flow_loop: Optional[asyncio.AbstractEventLoop] = None
+_flow_loop_lock = threading.Lock()
+
+def _get_flow_loop() -> asyncio.AbstractEventLoop:
+    global _flow_loop
+    with _flow_loop_lock:
+        if _flow_loop is None:
+            _flow_loop = asyncio.new_event_loop()
+            threading.Thread(target=_flow_loop.run_forever, name="web-search-loop", daemon=True).start()
+        return _flow_loop
+
+
+def submit_web_search_flow(
+    user_query: str,
+    console: Optional[Console],
+    config: Optional[WebSearchToolConfig] = None,
+) -> Future:
+    """
+    Schedules `arun_web_search_flow` on the shared background loop.
+
+    Returns:
+        Future: A concurrent future resolving to the synthesized answer (or None).
+    """
+    return asyncio.run_coroutine_threadsafe(arun_web_search_flow(user_query, console, config), _get_flow_loop())
+
+
+def run_web_search_flow(
+    user_query: str,
+    console: Optional[Console],
+    config: Optional[WebSearchToolConfig] = None,
+) -> Optional[str]:
+    """
+    Blocking wrapper around `arun_web_search_flow`.
+
+    Args:
+        user_query (str): The natural language query from the user.
+        console (Optional[Console]): Console used for progress output. If None, the flow runs headless: nothing is printed or rendered and the answer is not streamed.
+        config (Optional[WebSearchToolConfig]): Tuning for the flow. Defaults are used if None.
+
+    Returns:
+        Optional[str]: The synthesized final answer, or None if an error occurred.
+    """
+    return submit_web_search_flow(user_query, console, config).result()
+
+
 #################
 # EXAMPLE USAGE #
 #################
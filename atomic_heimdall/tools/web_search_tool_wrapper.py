@@ -1,9 +1,12 @@
 import sys
+import asyncio
+from types import ModuleType
+from typing import Any, Callable, Optional, Tuple
 from rich.console import Console
+from rich.markdown import Markdown
 
 from atomic_agents.lib.base.base_tool import BaseTool
 from schemas.tool_schemas import WebSearchToolInputSchema, WebSearchToolOutputSchema, WebSearchToolConfig
-from .web_search_agent import run_web_search_flow
 
 
 class WebSearchToolWrapper(BaseTool):
@@ -14,11 +17,70 @@ class WebSearchToolWrapper(BaseTool):
     input_schema = WebSearchToolInputSchema
     output_schema = WebSearchToolOutputSchema
 
-    def __init__(self, config: WebSearchToolConfig = WebSearchToolConfig()):
+    def __init__(
+        self,
+        config: WebSearchToolConfig = WebSearchToolConfig(),
+        client_factory: Optional[Callable[[], Tuple[Any, str]]] = None,
+        headless: bool = False,
+    ):
+        """
+        Args:
+            config: Tuning for the web search flow.
+            client_factory: Returns the async instructor client and model name used by the flow's agents.
+                Called on the first search; defaults to the flow's own Gemini client.
+            headless: Run the flow without any console output or answer streaming (batch runs).
+        """
         super().__init__(config)
-        self.console = Console()
+        self.config = config
+        self.client_factory = client_factory
+        self.console: Optional[Console] = None if headless else Console()
+        self._flow: Optional[ModuleType] = None
         print("WebSearchToolWrapper initialized.", file=sys.stderr)
 
+    def _get_flow(self) -> ModuleType:
+        """
+        Imports the web search flow on first use, keeping its scraping, search and LLM client
+        dependencies out of application startup.
+        """
+        if self._flow is None:
+            from tools import web_search_agent as flow
+            if self.client_factory is not None:
+                flow.set_client_factory(self.client_factory)
+            self._flow = flow
+        return self._flow
+
+    def _build_output(self, result_markdown: Optional[Markdown]) -> WebSearchToolOutputSchema:
+        """
+        Converts the flow's result into the tool's output schema.
+
+        Args:
+            result_markdown: The rich Markdown answer returned by the flow, or None.
+
+        Returns:
+            Output schema containing the final_answer and success status.
+        """
+        if result_markdown is not None:
+            print("WebSearchToolWrapper: Web search flow completed successfully.", file=sys.stderr)
+            return WebSearchToolOutputSchema(final_answer=str(result_markdown.markup), success=True)
+
+        print("WebSearchToolWrapper: Web search flow returned None (likely an internal error or no answer).", file=sys.stderr)
+        return WebSearchToolOutputSchema(
+            final_answer="The web search process completed, but no answer could be synthesized (check logs for details).",
+            success=False,
+        )
+
+    def _build_error_output(self, error: Exception) -> WebSearchToolOutputSchema:
+        """
+        Converts an exception raised by the flow into the tool's output schema.
+        """
+        if isinstance(error, ImportError):
+            print(f"WebSearchToolWrapper: CRITICAL ERROR - Could not execute web search. {error}", file=sys.stderr)
+            final_answer = "Error: The web search tool is not configured correctly (failed to import agent flow)."
+        else:
+            print(f"WebSearchToolWrapper: Error during web search flow execution: {error}", file=sys.stderr)
+            final_answer = f"An error occurred during the web search: {error}"
+        return WebSearchToolOutputSchema(final_answer=final_answer, success=False)
+
     def run(self, params: WebSearchToolInputSchema) -> WebSearchToolOutputSchema:
         """
         Executes the wrapped web search agent flow.
@@ -29,34 +91,32 @@ class WebSearchToolWrapper(BaseTool):
         Returns:
             Output schema containing the final_answer and success status.
         """
-        user_query = params.query
-        final_answer = None
-        success = False
+        print(f"WebSearchToolWrapper: Starting web search flow for query: '{params.query}'", file=sys.stderr)
+        try:
+            result_markdown = self._get_flow().run_web_search_flow(user_query=params.query, console=self.console, config=self.config)
+        except Exception as e:
+            return self._build_error_output(e)
+        return self._build_output(result_markdown)
 
-        print(f"WebSearchToolWrapper: Starting web search flow for query: '{user_query}'", file=sys.stderr)
+    async def arun(self, params: WebSearchToolInputSchema) -> WebSearchToolOutputSchema:
+        """
+        Executes the wrapped web search agent flow without blocking the caller's event loop.
+        The flow itself runs on the shared web search loop, where its HTTP and LLM clients live.
 
+        Args:
+            params: Input schema containing the user_query.
+
+        Returns:
+            Output schema containing the final_answer and success status.
+        """
+        print(f"WebSearchToolWrapper: Starting web search flow for query: '{params.query}'", file=sys.stderr)
         try:
-            result_markdown = run_web_search_flow(user_query=user_query, console=self.console)
-
-            if result_markdown is not None:
-                final_answer = str(result_markdown.markup)
-                success = True
-                print("WebSearchToolWrapper: Web search flow completed successfully.", file=sys.stderr)
-            else:
-                print("WebSearchToolWrapper: Web search flow returned None (likely an internal error or no answer).", file=sys.stderr)
-                final_answer = "The web search process completed, but no answer could be synthesized (check logs for details)."
-                success = False
-
-        except ImportError as e:
-             print(f"WebSearchToolWrapper: CRITICAL ERROR - Could not execute web search. {e}", file=sys.stderr)
-             final_answer = "Error: The web search tool is not configured correctly (failed to import agent flow)."
-             success = False
+            result_markdown = await asyncio.wrap_future(
+                self._get_flow().submit_web_search_flow(user_query=params.query, console=self.console, config=self.config)
+            )
         except Exception as e:
-            print(f"WebSearchToolWrapper: Error during web search flow execution: {e}", file=sys.stderr)
-            final_answer = f"An error occurred during the web search: {e}"
-            success = False
-
-        return WebSearchToolOutputSchema(final_answer=final_answer, success=success)
+            return self._build_error_output(e)
+        return self._build_output(result_markdown)
 
 if __name__ == "__main__":
     from dotenv import load_dotenv, find_dotenv
@@ -1,15 +1,37 @@
-from typing import Optional
+from typing import Optional, Tuple
 from urllib.parse import urlparse
+import asyncio
+import codecs
+import hashlib
 import re
+import threading
+import httpx
 import requests
-from bs4 import BeautifulSoup
-from markdownify import markdownify
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, Tag
+from markdownify import MarkdownConverter
 from pydantic import Field, HttpUrl
-from readability import Document
 
 from atomic_agents.agents.base_agent import BaseIOSchema
 from atomic_agents.lib.base.base_tool import BaseTool, BaseToolConfig
 
+from utils.http_cache import HttpCacheEntry, HttpResponseCache
+from utils.lru_cache import PersistentLRUCache
+from utils.rate_limiter import rate_limit_scheduler
+
+
+# Matches ids and classes of elements that usually wrap a page's main content
+CONTENT_HINT_PATTERN = re.compile(r"content|main", re.I)
+
+# Content types worth downloading; anything else is rejected before the body is read
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# Sent when a 304 arrived with nothing cached to serve, so intermediate caches return the full page
+NO_CACHE_HEADERS = {"Cache-Control": "no-cache", "Pragma": "no-cache"}
+
+# Matches <meta charset="..."> and <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_PATTERN = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.I)
+
 
 ################
 # INPUT SCHEMA #
@@ -69,10 +91,123 @@ class WebpageScraperToolConfig(BaseToolConfig):
     )
     max_content_length: int = Field(
         default=100_000,
-        description="Maximum content length in bytes to process.",
+        description="Maximum number of body bytes read per page; the download stops there.",
+    )
+    pool_connections: int = Field(
+        default=10,
+        description="Number of per-host connection pools kept alive by the shared HTTP session.",
+    )
+    pool_maxsize: int = Field(
+        default=4,
+        description="Maximum number of concurrent keep-alive connections to a single host.",
+    )
+    per_domain_rate: float = Field(
+        default=2.0,
+        gt=0,
+        description="Sustained requests per second allowed towards a single domain, shared by all scrapers.",
+    )
+    per_domain_burst: int = Field(
+        default=4,
+        ge=1,
+        description="Number of requests a domain may receive back-to-back before the rate applies.",
+    )
+    cache_enabled: bool = Field(
+        default=True,
+        description="Whether to keep fetched pages in the on-disk response cache.",
+    )
+    cache_dir: str = Field(
+        default="~/.cache/heimdall/http",
+        description="Directory of the on-disk response cache, shared across sessions.",
+    )
+    cache_ttl: int = Field(
+        default=86_400,
+        description="Seconds during which a cached page is served without revalidation.",
+    )
+    cache_max_bytes: int = Field(
+        default=200 * 1024 * 1024,
+        description="Size budget of the response cache; least recently used pages are evicted beyond it.",
+    )
+    conversion_cache_size: int = Field(
+        default=256,
+        description="Number of converted pages kept in memory, keyed by a hash of the raw HTML. 0 disables the cache.",
+    )
+    conversion_cache_dir: Optional[str] = Field(
+        default=None,
+        description="Optional directory where converted pages are also persisted.",
     )
 
 
+###########
+# HELPERS #
+###########
+class StreamingHtmlDecoder:
+    """
+    Incrementally decodes a streamed HTML body, stopping once `max_bytes` have been read.
+
+    The charset comes from the Content-Type header if present, otherwise from a <meta> tag
+    in the first bytes of the body, and defaults to UTF-8.
+    """
+
+    def __init__(self, content_type: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.truncated = False
+        self._charset = self._charset_from_content_type(content_type)
+        self._decoder = None
+        self._parts = []
+
+    @staticmethod
+    def _charset_from_content_type(content_type: str) -> Optional[str]:
+        for param in content_type.split(";")[1:]:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "charset" and value.strip():
+                return value.strip().strip("\"'")
+        return None
+
+    def _make_decoder(self, first_chunk: bytes):
+        charset = self._charset
+        if charset is None:
+            match = META_CHARSET_PATTERN.search(first_chunk[:2048])
+            charset = match.group(1).decode("ascii") if match else "utf-8"
+        try:
+            return codecs.getincrementaldecoder(charset)(errors="replace")
+        except LookupError:
+            return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Decodes the next chunk of the body.
+
+        Args:
+            chunk (bytes): The raw bytes received.
+
+        Returns:
+            bool: False once the body has gone past the byte limit and reading should stop. A body
+                filling the limit exactly is only known to be complete at its end, so reading
+                continues until the next chunk shows whether anything is left.
+        """
+        if not chunk:
+            return True
+        if self.bytes_read >= self.max_bytes:
+            self.truncated = True
+            return False
+        if self._decoder is None:
+            self._decoder = self._make_decoder(chunk)
+        remaining = self.max_bytes - self.bytes_read
+        if len(chunk) > remaining:
+            self.truncated = True
+            chunk = chunk[:remaining]
+        self.bytes_read += len(chunk)
+        self._parts.append(self._decoder.decode(chunk))
+        return not self.truncated
+
+    def finish(self) -> str:
+        """Flushes the decoder and returns the decoded text."""
+        if self._decoder is not None:
+            self._parts.append(self._decoder.decode(b"", final=True))
+        return "".join(self._parts)
+
+
 #####################
 # MAIN TOOL & LOGIC #
 #####################
@@ -83,6 +218,11 @@ class WebpageScraperTool(BaseTool):
 
     input_schema = WebpageScraperToolInputSchema
     output_schema = WebpageScraperToolOutputSchema
+    session: requests.Session = None  # Class-level session, shared by every scraper instance
+    _session_lock = threading.Lock()
+    async_client: httpx.AsyncClient = None  # Class-level async client, bound to the event loop that created it
+    _async_client_loop: asyncio.AbstractEventLoop = None
+    _host_semaphores: dict = {}
 
     def __init__(self, config: WebpageScraperToolConfig = WebpageScraperToolConfig()):
         """
@@ -93,40 +233,285 @@ class WebpageScraperTool(BaseTool):
         """
         super().__init__(config)
         self.config = config
+        self.response_cache = None
+        if config.cache_enabled:
+            self.response_cache = HttpResponseCache(config.cache_dir, config.cache_ttl, config.cache_max_bytes)
+        self.conversion_cache = None
+        if config.conversion_cache_size > 0:
+            self.conversion_cache = PersistentLRUCache(config.conversion_cache_size, persist_dir=config.conversion_cache_dir)
+
+    @classmethod
+    def get_session(cls, config: WebpageScraperToolConfig) -> requests.Session:
+        """
+        Returns the shared keep-alive session, creating it on first use.
+
+        The session is sized from the config of the first scraper that needs it. Each host gets its
+        own pool of at most `pool_maxsize` connections; callers block rather than opening more.
+
+        Args:
+            config (WebpageScraperToolConfig): Configuration used to size the connection pools.
 
-    def _fetch_webpage(self, url: str) -> str:
+        Returns:
+            requests.Session: The shared session.
         """
-        Fetches the webpage content with custom headers.
+        with cls._session_lock:
+            if cls.session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=config.pool_connections,
+                    pool_maxsize=config.pool_maxsize,
+                    pool_block=True,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                cls.session = session
+            return cls.session
+
+    @classmethod
+    def close_session(cls):
+        """
+        Closes the shared session and drops its pooled connections.
+        """
+        with cls._session_lock:
+            if cls.session is not None:
+                cls.session.close()
+                cls.session = None
+
+    @classmethod
+    def get_async_client(cls, config: WebpageScraperToolConfig) -> httpx.AsyncClient:
+        """
+        Returns the shared async client for the running event loop, creating it on first use.
+
+        httpx connections cannot move between event loops, so a new client is created if the
+        running loop differs from the one the current client was created on.
 
         Args:
-            url (str): The URL to fetch.
+            config (WebpageScraperToolConfig): Configuration used to size the connection pool.
 
         Returns:
-            str: The HTML content of the webpage.
+            httpx.AsyncClient: The shared async client.
+        """
+        loop = asyncio.get_running_loop()
+        if cls.async_client is None or cls._async_client_loop is not loop:
+            max_connections = config.pool_connections * config.pool_maxsize
+            cls.async_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                follow_redirects=True,
+            )
+            cls._async_client_loop = loop
+            cls._host_semaphores = {}
+        return cls.async_client
+
+    @classmethod
+    async def aclose_async_client(cls):
+        """
+        Closes the shared async client and drops its pooled connections.
+        """
+        if cls.async_client is not None:
+            await cls.async_client.aclose()
+            cls.async_client = None
+            cls._async_client_loop = None
+            cls._host_semaphores = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """
+        Returns the semaphore limiting concurrent async fetches to the host of `url`.
+        """
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.config.pool_maxsize)
+        return self._host_semaphores[host]
+
+    def _rate_limit_key(self, url: str) -> str:
+        return f"domain:{urlparse(url).netloc.lower()}"
+
+    def _request_headers(self) -> dict:
         """
-        headers = {
+        Builds the headers sent with every page request.
+        """
+        return {
             "User-Agent": self.config.user_agent,
             "Accept": "text/html,application/xhtml+xml,application/xml;" "q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
             "Connection": "keep-alive",
         }
 
-        response = requests.get(url, headers=headers, timeout=self.config.timeout)
-        response.raise_for_status()
+    def _check_content_type(self, url: str, headers) -> str:
+        """
+        Rejects responses that are not HTML before their body is downloaded.
+
+        Args:
+            url (str): The fetched URL.
+            headers: The response headers.
+
+        Returns:
+            str: The Content-Type header (empty if the server sent none).
+        """
+        content_type = headers.get("Content-Type", "")
+        mime_type = content_type.split(";")[0].strip().lower()
+        if mime_type and mime_type not in HTML_CONTENT_TYPES:
+            raise ValueError(f"Unsupported content type '{mime_type}' for {url}")
+        return content_type
+
+    def _warn_if_truncated(self, url: str, decoder: StreamingHtmlDecoder):
+        if decoder.truncated:
+            print(f"Warning: Content of {url} truncated at maximum of {self.config.max_content_length} bytes")
+
+    def _not_modified(self, url: str, cached: Optional[HttpCacheEntry], no_cache: bool) -> bool:
+        """
+        Handles a 304 Not Modified answer.
+
+        Args:
+            url (str): The fetched URL.
+            cached (Optional[HttpCacheEntry]): The cache entry that was revalidated, if any.
+            no_cache (bool): Whether the request already asked caches for a full response.
+
+        Returns:
+            bool: True if `cached` was confirmed valid, False if the page must be fetched again
+                without validators because there is nothing cached to serve.
+        """
+        if cached is not None:
+            self.response_cache.refresh(cached)
+            return True
+        if no_cache:
+            raise ValueError(f"Got 304 Not Modified for {url} without asking to revalidate")
+        return False
+
+    def _fetch_webpage(
+        self, url: str, cached: Optional[HttpCacheEntry] = None, no_cache: bool = False
+    ) -> Optional[Tuple[str, dict]]:
+        """
+        Fetches the webpage content with custom headers.
+        The body is streamed and reading stops at `max_content_length` bytes.
+
+        Args:
+            url (str): The URL to fetch.
+            cached (Optional[HttpCacheEntry]): A stale cache entry to revalidate, if any.
+            no_cache (bool): Whether to ask intermediate caches for a full response.
 
-        if len(response.content) > self.config.max_content_length:
-            # raise ValueError(f"Content length exceeds maximum of {self.config.max_content_length} bytes")
-            print(f"Warning: Content length ({len(response.content)}) exceeds maximum of {self.config.max_content_length} bytes")
+        Returns:
+            Optional[Tuple[str, dict]]: The HTML content of the webpage and the response headers,
+                or None if the server confirmed `cached` is still valid.
+        """
+        headers = self._request_headers()
+        if cached is not None:
+            headers.update(self.response_cache.conditional_headers(cached))
+        if no_cache:
+            headers.update(NO_CACHE_HEADERS)
+
+        session = self.get_session(self.config)
+        rate_limit_scheduler.acquire(self._rate_limit_key(url), self.config.per_domain_rate, self.config.per_domain_burst)
+        with session.get(url, headers=headers, timeout=self.config.timeout, stream=True) as response:
+            decoder = None
+            if response.status_code == 304:
+                if self._not_modified(url, cached, no_cache):
+                    return None
+            else:
+                response.raise_for_status()
+                decoder = StreamingHtmlDecoder(self._check_content_type(url, response.headers), self.config.max_content_length)
+                for chunk in response.iter_content(chunk_size=16_384):
+                    if not decoder.feed(chunk):
+                        break
+
+        if decoder is None:
+            return self._fetch_webpage(url, no_cache=True)
+        self._warn_if_truncated(url, decoder)
+        return decoder.finish(), dict(response.headers)
+
+    async def _afetch_webpage(
+        self, url: str, cached: Optional[HttpCacheEntry] = None, no_cache: bool = False
+    ) -> Optional[Tuple[str, dict]]:
+        """
+        Fetches the webpage content asynchronously with custom headers.
+        The body is streamed and reading stops at `max_content_length` bytes.
 
-        return response.text[:self.config.max_content_length]
+        Args:
+            url (str): The URL to fetch.
+            cached (Optional[HttpCacheEntry]): A stale cache entry to revalidate, if any.
+            no_cache (bool): Whether to ask intermediate caches for a full response.
 
-    def _extract_metadata(self, soup: BeautifulSoup, doc: Document, url: str) -> WebpageMetadata:
+        Returns:
+            Optional[Tuple[str, dict]]: The HTML content of the webpage and the response headers,
+                or None if the server confirmed `cached` is still valid.
+        """
+        headers = self._request_headers()
+        if cached is not None:
+            headers.update(self.response_cache.conditional_headers(cached))
+        if no_cache:
+            headers.update(NO_CACHE_HEADERS)
+
+        client = self.get_async_client(self.config)
+        await rate_limit_scheduler.aacquire(self._rate_limit_key(url), self.config.per_domain_rate, self.config.per_domain_burst)
+        async with self._host_semaphore(url):
+            async with client.stream("GET", url, headers=headers, timeout=self.config.timeout) as response:
+                decoder = None
+                if response.status_code == 304:
+                    if await asyncio.to_thread(self._not_modified, url, cached, no_cache):
+                        return None
+                else:
+                    response.raise_for_status()
+                    decoder = StreamingHtmlDecoder(self._check_content_type(url, response.headers), self.config.max_content_length)
+                    async for chunk in response.aiter_bytes(chunk_size=16_384):
+                        if not decoder.feed(chunk):
+                            break
+
+        if decoder is None:
+            return await self._afetch_webpage(url, no_cache=True)
+        self._warn_if_truncated(url, decoder)
+        return decoder.finish(), dict(response.headers)
+
+    @staticmethod
+    def _output_variant(include_links: bool) -> str:
+        return "links" if include_links else "no_links"
+
+    def _cache_response(self, url: str, html_content: str, headers: dict, include_links: bool, output: WebpageScraperToolOutputSchema):
         """
-        Extracts metadata from the webpage.
+        Stores a fetched page and its converted output in the response cache,
+        unless caching is disabled or forbidden by the server.
+
+        Args:
+            url (str): The fetched URL.
+            html_content (str): The HTML content of the webpage.
+            headers (dict): The response headers.
+            include_links (bool): Whether `output` preserved hyperlinks.
+            output (WebpageScraperToolOutputSchema): The converted page.
+        """
+        headers = {k.lower(): v for k, v in headers.items()}
+        if self.response_cache is None or "no-store" in headers.get("cache-control", "").lower():
+            return
+        self.response_cache.store(
+            url,
+            html_content,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            outputs={self._output_variant(include_links): output.model_dump()},
+        )
+
+    def _cached_output(self, entry: HttpCacheEntry, url: str, include_links: bool) -> WebpageScraperToolOutputSchema:
+        """
+        Returns the converted page for a cache hit, converting the cached HTML only if this variant was never produced.
+
+        Args:
+            entry (HttpCacheEntry): The fresh or revalidated cache entry.
+            url (str): The requested URL.
+            include_links (bool): Whether to preserve hyperlinks in the markdown output.
+
+        Returns:
+            WebpageScraperToolOutputSchema: The output containing the markdown content and metadata.
+        """
+        variant = self._output_variant(include_links)
+        if variant in entry.outputs:
+            return WebpageScraperToolOutputSchema.model_validate(entry.outputs[variant])
+        output = self._process_html(entry.body, url, include_links)
+        self.response_cache.store_output(entry, variant, output.model_dump())
+        return output
+
+    def _extract_metadata(self, soup: BeautifulSoup, url: str) -> WebpageMetadata:
+        """
+        Extracts metadata from the webpage in a single pass over its meta tags.
 
         Args:
             soup (BeautifulSoup): The parsed HTML content.
-            doc (Document): The readability document.
             url (str): The URL of the webpage.
 
         Returns:
@@ -134,27 +519,22 @@ class WebpageScraperTool(BaseTool):
         """
         domain = urlparse(url).netloc
 
-        # Extract metadata from meta tags
+        meta_values = {}
+        for meta_tag in soup.find_all("meta"):
+            key = meta_tag.get("name") or meta_tag.get("property")
+            if key and key not in meta_values:
+                meta_values[key] = meta_tag.get("content")
+
+        title = soup.title.get_text(strip=True) if soup.title else ""
+
         metadata = {
-            "title": doc.title(),
+            "title": title or meta_values.get("og:title") or "[no-title]",
             "domain": domain,
-            "author": None,
-            "description": None,
-            "site_name": None,
+            "author": meta_values.get("author"),
+            "description": meta_values.get("description"),
+            "site_name": meta_values.get("og:site_name"),
         }
 
-        author_tag = soup.find("meta", attrs={"name": "author"})
-        if author_tag:
-            metadata["author"] = author_tag.get("content")
-
-        description_tag = soup.find("meta", attrs={"name": "description"})
-        if description_tag:
-            metadata["description"] = description_tag.get("content")
-
-        site_name_tag = soup.find("meta", attrs={"property": "og:site_name"})
-        if site_name_tag:
-            metadata["site_name"] = site_name_tag.get("content")
-
         return WebpageMetadata(**metadata)
 
     def _clean_markdown(self, markdown: str) -> str:
@@ -175,55 +555,87 @@ class WebpageScraperTool(BaseTool):
         markdown = markdown.strip() + "\n"
         return markdown
 
-    def _extract_main_content(self, soup: BeautifulSoup) -> str:
+    def _extract_main_content(self, soup: BeautifulSoup) -> Tag:
         """
         Extracts the main content from the webpage using custom heuristics.
 
+        Candidates are, by priority: <main>, an element whose id mentions content/main, an element
+        whose class does, <article>, then <body>. They are all collected in one walk of the tree.
+
         Args:
             soup (BeautifulSoup): Parsed HTML content.
 
         Returns:
-            str: Main content HTML.
+            Tag: The element holding the main content.
         """
         # Remove unwanted elements
         for element in soup.find_all(["script", "style", "nav", "header", "footer"]):
             element.decompose()
 
         # Try to find main content container
-        content_candidates = [
-            soup.find("main"),
-            soup.find(id=re.compile(r"content|main", re.I)),
-            soup.find(class_=re.compile(r"content|main", re.I)),
-            soup.find("article"),
-        ]
-
-        main_content = next((candidate for candidate in content_candidates if candidate), None)
-
-        if not main_content:
-            main_content = soup.find("body")
+        by_id = by_class = article = None
+        for element in soup.find_all(True):
+            if element.name == "main":
+                return element
+            if by_id is None and CONTENT_HINT_PATTERN.search(element.get("id") or ""):
+                by_id = element
+            if by_class is None and any(CONTENT_HINT_PATTERN.search(cls) for cls in element.get("class") or ()):
+                by_class = element
+            if article is None and element.name == "article":
+                article = element
+
+        return by_id or by_class or article or soup.body or soup
+
+    def _process_html(self, html_content: str, url: str, include_links: bool) -> WebpageScraperToolOutputSchema:
+        """
+        Converts fetched HTML into markdown content and metadata.
+        Identical HTML is converted only once, whichever URL (mirror, query string...) it was served from.
 
-        return str(main_content) if main_content else str(soup)
+        Args:
+            html_content (str): The HTML content of the webpage.
+            url (str): The URL the content was fetched from.
+            include_links (bool): Whether to preserve hyperlinks in the markdown output.
 
-    def run(self, params: WebpageScraperToolInputSchema) -> WebpageScraperToolOutputSchema:
+        Returns:
+            WebpageScraperToolOutputSchema: The output containing the markdown content and metadata.
         """
-        Runs the WebpageScraperTool with the given parameters.
+        if self.conversion_cache is None:
+            return self._convert_html(html_content, url, include_links)
+
+        digest = hashlib.sha256(html_content.encode("utf-8", errors="replace")).hexdigest()
+        cache_key = f"{digest}:{int(include_links)}"
+        cached = self.conversion_cache.get(cache_key)
+        if cached is not None:
+            output = WebpageScraperToolOutputSchema.model_validate(cached)
+            output.metadata.domain = urlparse(url).netloc  # The same page may be served by another host
+            return output
+
+        output = self._convert_html(html_content, url, include_links)
+        self.conversion_cache.set(cache_key, output.model_dump())
+        return output
+
+    def _convert_html(self, html_content: str, url: str, include_links: bool) -> WebpageScraperToolOutputSchema:
+        """
+        Parses the HTML and converts its main content to markdown, extracting metadata along the way.
 
         Args:
-            params (WebpageScraperToolInputSchema): The input parameters for the tool.
+            html_content (str): The HTML content of the webpage.
+            url (str): The URL the content was fetched from.
+            include_links (bool): Whether to preserve hyperlinks in the markdown output.
 
         Returns:
             WebpageScraperToolOutputSchema: The output containing the markdown content and metadata.
         """
-        # Fetch webpage content
-        html_content = self._fetch_webpage(str(params.url))
+        # Parse HTML once with lxml; metadata and content are both read from this tree
+        soup = BeautifulSoup(html_content, "lxml")
 
-        # Parse HTML with BeautifulSoup
-        soup = BeautifulSoup(html_content, "html.parser")
+        # Extract metadata before the content heuristics prune the tree
+        metadata = self._extract_metadata(soup, url)
 
         # Extract main content using custom extraction
         main_content = self._extract_main_content(soup)
 
-        # Convert to markdown
+        # Convert to markdown straight from the parsed tree
         markdown_options = {
             "strip": ["script", "style"],
             "heading_style": "ATX",
@@ -231,22 +643,68 @@ class WebpageScraperTool(BaseTool):
             "wrap": True,
         }
 
-        if not params.include_links:
+        if not include_links:
             markdown_options["strip"].append("a")
 
-        markdown_content = markdownify(main_content, **markdown_options)
+        markdown_content = MarkdownConverter(**markdown_options).convert_soup(main_content)
 
         # Clean up the markdown
         markdown_content = self._clean_markdown(markdown_content)
 
-        # Extract metadata
-        metadata = self._extract_metadata(soup, Document(html_content), str(params.url))
-
         return WebpageScraperToolOutputSchema(
             content=markdown_content,
             metadata=metadata,
         )
 
+    def run(self, params: WebpageScraperToolInputSchema) -> WebpageScraperToolOutputSchema:
+        """
+        Runs the WebpageScraperTool with the given parameters.
+
+        Args:
+            params (WebpageScraperToolInputSchema): The input parameters for the tool.
+
+        Returns:
+            WebpageScraperToolOutputSchema: The output containing the markdown content and metadata.
+        """
+        url = str(params.url)
+        cached = self.response_cache.get(url) if self.response_cache else None
+        if cached is not None and self.response_cache.is_fresh(cached):
+            return self._cached_output(cached, url, params.include_links)
+
+        fetched = self._fetch_webpage(url, cached)
+        if fetched is None:  # 304 Not Modified
+            return self._cached_output(cached, url, params.include_links)
+
+        html_content, headers = fetched
+        output = self._process_html(html_content, url, params.include_links)
+        self._cache_response(url, html_content, headers, params.include_links, output)
+        return output
+
+    async def arun(self, params: WebpageScraperToolInputSchema) -> WebpageScraperToolOutputSchema:
+        """
+        Runs the WebpageScraperTool asynchronously. HTML conversion and response cache reads and
+        writes run in worker threads, off the event loop.
+
+        Args:
+            params (WebpageScraperToolInputSchema): The input parameters for the tool.
+
+        Returns:
+            WebpageScraperToolOutputSchema: The output containing the markdown content and metadata.
+        """
+        url = str(params.url)
+        cached = await asyncio.to_thread(self.response_cache.get, url) if self.response_cache else None
+        if cached is not None and self.response_cache.is_fresh(cached):
+            return await asyncio.to_thread(self._cached_output, cached, url, params.include_links)
+
+        fetched = await self._afetch_webpage(url, cached)
+        if fetched is None:  # 304 Not Modified
+            return await asyncio.to_thread(self._cached_output, cached, url, params.include_links)
+
+        html_content, headers = fetched
+        output = await asyncio.to_thread(self._process_html, html_content, url, params.include_links)
+        await asyncio.to_thread(self._cache_response, url, html_content, headers, params.include_links, output)
+        return output
+
 
 #################
 # EXAMPLE USAGE #
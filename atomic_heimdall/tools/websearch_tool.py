@@ -1,15 +1,23 @@
-from typing import List, Literal, Optional
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Literal, Optional, Tuple
 from pydantic import Field
-from tenacity import retry, stop_after_attempt, stop_after_delay, wait_exponential
+from tenacity import Retrying, stop_after_attempt, stop_after_delay, wait_random_exponential
 from duckduckgo_search import DDGS
 
 from atomic_agents.agents.base_agent import BaseIOSchema
 from atomic_agents.lib.base.base_tool import BaseTool, BaseToolConfig
 
+from utils.lru_cache import PersistentLRUCache
+from utils.rate_limiter import rate_limit_scheduler
+from utils.url_utils import canonicalize_url
+
 """
 This module provides a tool for performing searches on DuckDuckGo based on the provided queries.
 Can perform text, image, and news searches.
-Rate-limited to 20 requests per second (duckduckgo policy).
+Rate-limited to 20 requests per second (duckduckgo policy) through the shared rate limit scheduler.
 """
 
 ################
@@ -49,19 +57,32 @@ class DuckDuckGoNewsResultItemSchema(DuckDuckGoSearchResultItemSchema):
     date: Optional[str] = Field(None, description="Publication date of the article")
 
 
+class DuckDuckGoQueryStatusSchema(BaseIOSchema):
+    """Schema for the outcome of a single search query"""
+    query: str = Field(..., description="The search query")
+    success: bool = Field(..., description="Whether the query eventually returned results from DuckDuckGo")
+    result_count: int = Field(0, description="Number of results returned for this query, before deduplication")
+    attempts: int = Field(..., description="Number of attempts made for this query")
+    cached: bool = Field(False, description="Whether the results were served from the search cache")
+    error: Optional[str] = Field(None, description="The last error, if the query failed")
+
+
 class DuckDuckGoSearchToolOutputSchema(BaseIOSchema):
     """Base schema for the output of the DuckDuckGo search tool."""
     results: List[DuckDuckGoSearchResultItemSchema] = Field(..., description="List of search result items")
+    query_statuses: List[DuckDuckGoQueryStatusSchema] = Field(default_factory=list, description="Outcome of each query, in query order")
 
 
 class DuckDuckGoImageSearchToolOutputSchema(BaseIOSchema):
     """Schema for the output of the DuckDuckGo image search tool."""
     results: List[DuckDuckGoImageResultItemSchema] = Field(..., description="List of image search result items")
+    query_statuses: List[DuckDuckGoQueryStatusSchema] = Field(default_factory=list, description="Outcome of each query, in query order")
 
 
 class DuckDuckGoNewsSearchToolOutputSchema(BaseIOSchema):
     """Schema for the output of the DuckDuckGo news search tool."""
     results: List[DuckDuckGoNewsResultItemSchema] = Field(..., description="List of news search result items")
+    query_statuses: List[DuckDuckGoQueryStatusSchema] = Field(default_factory=list, description="Outcome of each query, in query order")
 
 
 ##############
@@ -73,11 +94,27 @@ class DuckDuckGoSearchToolConfig(BaseToolConfig):
     Attributes:
         safesearch (str): The safe search level (on, moderate, off).
         region (Optional[str]): The region to focus the search on (e.g., 'us-en').
+        requests_per_second (float): Sustained request rate allowed towards DuckDuckGo.
+        burst (int): Number of requests that may be sent back-to-back before the rate applies.
+        max_concurrent_queries (int): Number of queries searched in parallel.
+        max_attempts_per_query (int): Attempts per query before it is reported as failed.
+        max_retry_delay (float): Seconds after which a query stops being retried.
+        cache_ttl (float): Seconds during which a query's results are reused without searching again.
+        cache_max_entries (int): Number of cached queries kept in memory (0 disables the cache).
+        cache_dir (Optional[str]): Optional directory where cached results are also persisted.
     """
     safesearch: Literal["on", "moderate", "off"] = Field(
         "off", description="Safe search level."
     )
     region: Optional[str] = Field("wt-wt", description="The region to focus the search on (e.g., 'us-en').")
+    requests_per_second: float = Field(20.0, gt=0, description="Sustained request rate allowed towards DuckDuckGo.")
+    burst: int = Field(5, ge=1, description="Number of requests that may be sent back-to-back before the rate applies.")
+    max_concurrent_queries: int = Field(3, description="Number of queries searched in parallel.")
+    max_attempts_per_query: int = Field(4, description="Attempts per query before it is reported as failed.")
+    max_retry_delay: float = Field(20.0, description="Seconds after which a query stops being retried.")
+    cache_ttl: float = Field(3600.0, description="Seconds during which a query's results are reused without searching again.")
+    cache_max_entries: int = Field(512, description="Number of cached queries kept in memory (0 disables the cache).")
+    cache_dir: Optional[str] = Field(None, description="Optional directory where cached results are also persisted.")
 
 
 class DuckDuckGoSearchTool(BaseTool):
@@ -91,6 +128,26 @@ class DuckDuckGoSearchTool(BaseTool):
         super().__init__(config)
         self.safesearch = config.safesearch
         self.region = config.region
+        self.requests_per_second = config.requests_per_second
+        self.burst = config.burst
+        self.max_attempts_per_query = config.max_attempts_per_query
+        self.max_retry_delay = config.max_retry_delay
+        self.search_cache = None
+        if config.cache_max_entries > 0:
+            self.search_cache = PersistentLRUCache(config.cache_max_entries, ttl=config.cache_ttl, persist_dir=config.cache_dir)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, config.max_concurrent_queries), thread_name_prefix="ddgs")
+        self._thread_state = threading.local()
+
+    def _get_ddgs(self) -> DDGS:
+        """
+        Returns the DDGS client of the current worker thread, creating it on first use.
+        Clients (and their connections and cookies) are reused across queries and runs; they are
+        kept per thread because DDGS shares a non thread-safe lxml parser between calls.
+        """
+        ddgs = getattr(self._thread_state, "ddgs", None)
+        if ddgs is None:
+            ddgs = self._thread_state.ddgs = DDGS()
+        return ddgs
 
     def _fetch_search_results(self, query: str, max_results: int, search_type: str) -> List[dict]:
         """
@@ -104,31 +161,73 @@ class DuckDuckGoSearchTool(BaseTool):
         Returns:
             List[dict]: A list of search result dictionaries.
         """
-        with DDGS() as ddgs:
-            if search_type == "text":
-                results = ddgs.text(query, safesearch=self.safesearch, region=self.region, max_results=max_results)
-            elif search_type == "images":
-                results = ddgs.images(query, safesearch=self.safesearch, region=self.region, max_results=max_results)
-            elif search_type == "videos":
-                results = ddgs.videos(query, safesearch=self.safesearch, region=self.region, max_results=max_results)
-            elif search_type == "news":
-                results = ddgs.news(query, safesearch=self.safesearch, region=self.region, max_results=max_results)
-            else:
-                raise ValueError(f"Invalid search type: {search_type}")
-
-            # Add the query to each result
-            for result in results:
-                result["query"] = query
-            return results
-
-    @retry(
-        stop=stop_after_attempt(10) | stop_after_delay(60),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        reraise=True,
-    )
+        rate_limit_scheduler.acquire("duckduckgo", self.requests_per_second, self.burst)
+        ddgs = self._get_ddgs()
+        if search_type == "text":
+            results = ddgs.text(query, safesearch=self.safesearch, region=self.region, max_results=max_results)
+        elif search_type == "images":
+            results = ddgs.images(query, safesearch=self.safesearch, region=self.region, max_results=max_results)
+        elif search_type == "videos":
+            results = ddgs.videos(query, safesearch=self.safesearch, region=self.region, max_results=max_results)
+        elif search_type == "news":
+            results = ddgs.news(query, safesearch=self.safesearch, region=self.region, max_results=max_results)
+        else:
+            raise ValueError(f"Invalid search type: {search_type}")
+
+        # Add the query to each result
+        for result in results:
+            result["query"] = query
+        return results
+
+    def _cache_key(self, query: str, max_results: int, search_type: str) -> str:
+        """Builds the search cache key; queries differing only in case or spacing share an entry."""
+        normalized_query = " ".join(query.lower().split())
+        return "|".join([normalized_query, search_type, str(self.region), self.safesearch, str(max_results)])
+
+    def _search_query(self, query: str, max_results: int, search_type: str) -> Tuple[List[dict], DuckDuckGoQueryStatusSchema]:
+        """
+        Fetches the results of a single query, retrying only that query with jittered exponential backoff.
+        Results found in the search cache are returned without contacting DuckDuckGo.
+
+        Args:
+            query (str): The search query.
+            max_results (int): The maximum number of results to retrieve.
+            search_type (str): The type of search to perform.
+
+        Returns:
+            Tuple[List[dict], DuckDuckGoQueryStatusSchema]: The results (empty if the query failed) and the query's status.
+        """
+        cache_key = self._cache_key(query, max_results, search_type)
+        if self.search_cache is not None:
+            cached_results = self.search_cache.get(cache_key)
+            if cached_results is not None:
+                results = [{**result, "query": query} for result in cached_results]
+                status = DuckDuckGoQueryStatusSchema(query=query, success=True, result_count=len(results), attempts=0, cached=True)
+                return results, status
+
+        retrying = Retrying(
+            stop=stop_after_attempt(self.max_attempts_per_query) | stop_after_delay(self.max_retry_delay),
+            wait=wait_random_exponential(multiplier=1, max=10),
+            reraise=True,
+        )
+        attempts = 0
+        try:
+            for attempt in retrying:
+                with attempt:
+                    attempts = attempt.retry_state.attempt_number
+                    results = self._fetch_search_results(query, max_results, search_type)
+        except Exception as e:
+            return [], DuckDuckGoQueryStatusSchema(query=query, success=False, attempts=attempts, error=str(e))
+
+        if self.search_cache is not None:
+            self.search_cache.set(cache_key, results)
+        return results, DuckDuckGoQueryStatusSchema(query=query, success=True, result_count=len(results), attempts=attempts)
+
     def run(self, params: DuckDuckGoSearchToolInputSchema) -> DuckDuckGoSearchToolOutputSchema:
         """
         Runs the DuckDuckGoSearchTool with the given parameters.
+        A query that keeps failing does not fail the run: the output carries the results of the
+        other queries and a status entry describing the failure.
 
         Args:
             params (DuckDuckGoSearchToolInputSchema): The input parameters for the tool.
@@ -136,23 +235,27 @@ class DuckDuckGoSearchTool(BaseTool):
         Returns:
             DuckDuckGoSearchToolOutputSchema: The output of the tool.
         """
-        all_results = []
-
-        for query in params.queries:
-            results = self._fetch_search_results(
-                query,
-                params.max_results,
-                params.category,
-            )
-            all_results.extend(results)
-
-        # Deduplicate results based on URL while preserving order
+        # Fan the queries out over the worker threads; map() keeps the results in query order.
+        # Each query runs in a copy of the caller's context, so its rate-limit waits count for the caller.
+        outcomes = list(self._executor.map(
+            lambda query, context: context.run(self._search_query, query, params.max_results, params.category),
+            params.queries,
+            [contextvars.copy_context() for _ in params.queries],
+        ))
+        all_results = [result for results, _ in outcomes for result in results]
+        query_statuses = [status for _, status in outcomes]
+
+        # Deduplicate results on their canonical URL while preserving order
         seen_urls = set()
         unique_results = []
         for result in all_results:
-            if result.get("url") or result.get("href") not in seen_urls:
+            url = result.get("url") or result.get("href")
+            if not url:
+                continue
+            canonical_url = canonicalize_url(url)
+            if canonical_url not in seen_urls:
                 unique_results.append(result)
-                seen_urls.add(result.get("url") or result.get("href"))
+                seen_urls.add(canonical_url)
 
         if params.category == "text":
             formatted_results = [
@@ -164,7 +267,7 @@ class DuckDuckGoSearchTool(BaseTool):
                 )
                 for result in unique_results
             ]
-            return DuckDuckGoSearchToolOutputSchema(results=formatted_results)
+            return DuckDuckGoSearchToolOutputSchema(results=formatted_results, query_statuses=query_statuses)
 
         elif params.category == "images":
             formatted_results = [
@@ -179,7 +282,7 @@ class DuckDuckGoSearchTool(BaseTool):
                 )
                 for result in unique_results
             ]
-            return DuckDuckGoImageSearchToolOutputSchema(results=formatted_results)
+            return DuckDuckGoImageSearchToolOutputSchema(results=formatted_results, query_statuses=query_statuses)
 
         elif params.category == "news":
             formatted_results = [
@@ -192,9 +295,22 @@ class DuckDuckGoSearchTool(BaseTool):
                 )
                 for result in unique_results
             ]
-            return DuckDuckGoNewsSearchToolOutputSchema(results=formatted_results)
+            return DuckDuckGoNewsSearchToolOutputSchema(results=formatted_results, query_statuses=query_statuses)
         else:
-            return DuckDuckGoSearchToolOutputSchema(results=[])
+            return DuckDuckGoSearchToolOutputSchema(results=[], query_statuses=query_statuses)
+
+    async def arun(self, params: DuckDuckGoSearchToolInputSchema) -> DuckDuckGoSearchToolOutputSchema:
+        """
+        Runs the DuckDuckGoSearchTool without blocking the event loop.
+        DDGS only offers a blocking API, so the search runs in a worker thread.
+
+        Args:
+            params (DuckDuckGoSearchToolInputSchema): The input parameters for the tool.
+
+        Returns:
+            DuckDuckGoSearchToolOutputSchema: The output of the tool.
+        """
+        return await asyncio.to_thread(self.run, params)
 
 
 #################
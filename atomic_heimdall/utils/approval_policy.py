@@ -0,0 +1,175 @@
+import os
+import re
+import sys
+import json
+import shlex
+import ipaddress
+from typing import Dict, List, Literal, Optional
+from urllib.parse import urlsplit
+from pydantic import BaseModel, Field
+
+
+class CommandRule(BaseModel):
+    """
+    One pre-approved program and the exact command-line shape it may be run with.
+
+    Every token after the program is checked on its own: an option must be listed in `options` or
+    `value_options`, and every other token must be an argument of the rule's `arguments` kind or
+    match one of `extra_arguments`.
+    """
+    program: str = Field(..., description="Program name, matched exactly against the first token (e.g. 'dig').")
+    options: List[str] = Field(default_factory=list, description="Regular expressions an option token ('-...') must fully match, e.g. '-[lah]+'.")
+    value_options: Dict[str, str] = Field(default_factory=dict, description="Options followed by a value token, mapped to the regular expression the value must fully match, e.g. {'-c': '[1-9]'}.")
+    required_options: List[str] = Field(default_factory=list, description="Options that must be present, e.g. ping's '-c' so it terminates.")
+    arguments: Literal["none", "targets", "workspace_files"] = Field("none", description="What the positional arguments are: hosts/URLs from the allowed targets, or files inside the task workspace.")
+    extra_arguments: List[str] = Field(default_factory=list, description="Regular expressions for other accepted positional tokens, e.g. dig's record types.")
+    min_arguments: int = Field(0, description="Minimum number of target/file arguments.")
+    max_arguments: int = Field(1, description="Maximum number of target/file arguments.")
+
+
+# Commands run without a shell, but a chained command is never what a rule approved
+SHELL_OPERATORS = {"|", "||", "&", "&&", ";", ">", ">>", "<", "<<"}
+
+HOSTNAME_RE = re.compile(r"[a-z0-9]([a-z0-9-]*[a-z0-9])?(\.[a-z0-9]([a-z0-9-]*[a-z0-9])?)*")
+
+# Read-only commands approved when no policy file is given. Files must be inside the workspace and
+# hosts among the allowed targets.
+DEFAULT_RULES = [
+    CommandRule(program="pwd"),
+    CommandRule(program="whoami"),
+    CommandRule(program="id"),
+    CommandRule(program="ls", options=["-[lah1]+"], arguments="workspace_files", max_arguments=4),
+    CommandRule(program="cat", arguments="workspace_files", min_arguments=1, max_arguments=4),
+    CommandRule(program="head", value_options={"-n": r"\d+"}, arguments="workspace_files", min_arguments=1),
+    CommandRule(program="tail", value_options={"-n": r"\d+"}, arguments="workspace_files", min_arguments=1),
+    CommandRule(program="wc", options=["-[lwc]+"], arguments="workspace_files", min_arguments=1, max_arguments=4),
+    CommandRule(program="whois", arguments="targets", min_arguments=1),
+    CommandRule(program="host", arguments="targets", min_arguments=1),
+    CommandRule(program="nslookup", arguments="targets", min_arguments=1),
+    CommandRule(
+        program="dig", arguments="targets", min_arguments=1,
+        extra_arguments=[r"\+short", "A|AAAA|MX|NS|TXT|SOA|CNAME|PTR"]
+    ),
+    CommandRule(program="ping", value_options={"-c": r"[1-9]|10"}, required_options=["-c"], arguments="targets", min_arguments=1),
+    CommandRule(program="curl", options=["-s", "-I", "-sI", "-Is"], arguments="targets", min_arguments=1),
+]
+
+
+class ApprovalPolicy(BaseModel):
+    """
+    Approval decisions for headless runs, replacing the interactive prompts of the console
+    and file manager tools.
+
+    A command is approved only if it has no shell operator, its program has a rule and every one of
+    its tokens is allowed by that rule; hosts must be in scope and files inside the workspace.
+    Everything else is rejected, and the agent is told so.
+    """
+    rules: List[CommandRule] = Field(default_factory=lambda: [rule.model_copy() for rule in DEFAULT_RULES], description="Pre-approved programs and their allowed command-line shapes.")
+    allowed_targets: List[str] = Field(default_factory=list, description="Hosts in scope: hostnames, '*.domain' wildcards (subdomains only), IP addresses or CIDR ranges.")
+    allow_file_writes: bool = Field(False, description="Whether FileManager write/append actions are approved.")
+    workspace_dir: Optional[str] = Field(None, description="Directory file arguments must stay in. Without it, no file argument is approved.")
+
+    @classmethod
+    def from_file(cls, path: str) -> "ApprovalPolicy":
+        """
+        Loads a policy from a JSON file with the model's fields, e.g.
+        {"rules": [{"program": "nmap", "options": ["-sV", "-Pn"], "arguments": "targets", "min_arguments": 1}],
+         "allowed_targets": ["10.0.0.0/24", "*.example.com"], "allow_file_writes": true}.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def for_task(self, workspace_dir: str, targets: List[str]) -> "ApprovalPolicy":
+        """Returns this policy confined to a task's workspace, with the task's own targets added to the scope."""
+        return self.model_copy(update={"workspace_dir": workspace_dir, "allowed_targets": self.allowed_targets + targets})
+
+    def _target_allowed(self, token: str) -> bool:
+        """Checks a host, IP address or URL against the allowed targets."""
+        host = urlsplit(token).hostname if "://" in token else token
+        if not host:
+            return False
+        host = host.lower().rstrip(".")
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            address = None
+            if not HOSTNAME_RE.fullmatch(host):
+                return False
+        for target in self.allowed_targets:
+            target = target.lower().rstrip(".")
+            if address is not None:
+                try:
+                    if address in ipaddress.ip_network(target, strict=False):
+                        return True
+                except ValueError:
+                    continue
+            elif target.startswith("*."):
+                if host.endswith(target[1:]):
+                    return True
+            elif host == target:
+                return True
+        return False
+
+    def _workspace_file_allowed(self, token: str) -> bool:
+        """Checks that a path resolves inside the workspace, following symlinks."""
+        if self.workspace_dir is None:
+            return False
+        workspace = os.path.realpath(self.workspace_dir)
+        path = os.path.realpath(os.path.join(workspace, token))
+        return path == workspace or path.startswith(workspace + os.sep)
+
+    def _rule_allows(self, rule: CommandRule, args: List[str]) -> bool:
+        """Checks every token after the program against the rule."""
+        seen_options = set()
+        positional = 0
+        i = 0
+        while i < len(args):
+            token = args[i]
+            if token in rule.value_options:
+                if i + 1 >= len(args) or not re.fullmatch(rule.value_options[token], args[i + 1]):
+                    return False
+                seen_options.add(token)
+                i += 2
+                continue
+            if token.startswith("-"):
+                if not any(re.fullmatch(pattern, token) for pattern in rule.options):
+                    return False
+                seen_options.add(token)
+            elif any(re.fullmatch(pattern, token) for pattern in rule.extra_arguments):
+                pass
+            elif rule.arguments == "targets" and self._target_allowed(token):
+                positional += 1
+            elif rule.arguments == "workspace_files" and self._workspace_file_allowed(token):
+                positional += 1
+            else:
+                return False
+            i += 1
+        return (
+            rule.min_arguments <= positional <= rule.max_arguments
+            and all(option in seen_options for option in rule.required_options)
+        )
+
+    def approve_command(self, command: str, reason: str) -> bool:
+        """
+        Decides whether a proposed console command may run.
+
+        Args:
+            command: The command line proposed by the agent.
+            reason: The agent's stated reason (logged only).
+
+        Returns:
+            True if a rule allows the program and every one of its arguments.
+        """
+        try:
+            tokens = shlex.split(command)
+        except ValueError:
+            tokens = []
+        approved = bool(tokens) and not SHELL_OPERATORS.intersection(tokens) and any(
+            rule.program == tokens[0] and self._rule_allows(rule, tokens[1:]) for rule in self.rules
+        )
+        print(f"Approval policy: {'approved' if approved else 'rejected'} `{command}` ({reason})", file=sys.stderr)
+        return approved
+
+    def approve_file_action(self, action: str, path: str) -> bool:
+        """Decides whether a FileManager write/append on a workspace path may proceed."""
+        return self.allow_file_writes
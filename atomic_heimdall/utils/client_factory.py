@@ -0,0 +1,138 @@
+"""
+Single place where LLM provider clients are built.
+
+Every provider is reached through its OpenAI-compatible endpoint, and all clients of one kind
+(sync or async) share one pooled httpx client, so the Heimdall agent and the web search agents
+reuse warm keep-alive connections and TLS sessions instead of each opening their own.
+"""
+
+import os
+import sys
+import threading
+import importlib.util
+from typing import Dict, Optional, Tuple, Union
+
+import httpx
+import openai
+import instructor
+from pydantic import BaseModel, Field
+
+
+class ProviderSettings(BaseModel):
+    """Endpoint, credentials and defaults of an OpenAI-compatible LLM provider."""
+    base_url: Optional[str] = Field(None, description="OpenAI-compatible base URL; None for OpenAI itself.")
+    api_key_env: Optional[str] = Field(None, description="Environment variable holding the API key; None if no key is needed.")
+    default_api_key: Optional[str] = Field(None, description="API key used when no environment variable is needed.")
+    model: str = Field(..., description="Default model name.")
+    mode: instructor.Mode = Field(instructor.Mode.TOOLS, description="Instructor mode used for structured outputs.")
+
+
+PROVIDERS: Dict[str, ProviderSettings] = {
+    "openai": ProviderSettings(api_key_env="OPENAI_API_KEY", model="gpt-4o-mini"),
+    "ollama": ProviderSettings(
+        base_url="http://localhost:11434/v1", default_api_key="ollama", model="qwen2.5", mode=instructor.Mode.JSON
+    ),
+    "gemini": ProviderSettings(
+        base_url="https://generativelanguage.googleapis.com/v1beta/openai/", api_key_env="GEMINI_API_KEY",
+        model="gemini-2.0-flash", mode=instructor.Mode.JSON
+    ),
+    "mistral": ProviderSettings(
+        base_url="https://api.mistral.ai/v1/", api_key_env="MISTRAL_API_KEY",
+        model="mistral-small-latest", mode=instructor.Mode.JSON
+    ),
+}
+
+
+class LLMClientConfig(BaseModel):
+    """Connection pool, keep-alive and timeout settings shared by all LLM clients."""
+    max_connections: int = Field(default=20, description="Maximum number of concurrent connections in the pool.")
+    max_keepalive_connections: int = Field(default=10, description="Maximum number of idle connections kept open.")
+    keepalive_expiry: float = Field(default=120.0, description="Seconds an idle connection is kept open for reuse.")
+    timeout: float = Field(default=120.0, description="Read/write timeout in seconds for a single LLM request.")
+    connect_timeout: float = Field(default=10.0, description="Timeout in seconds for establishing a connection.")
+    http2: bool = Field(default=True, description="Use HTTP/2 when the optional 'h2' package is installed.")
+    max_retries: int = Field(default=2, description="Retries on connection errors and retryable status codes.")
+
+
+# One pooled transport per kind; sync and async clients cannot share a pool
+_http_clients: Dict[bool, Union[httpx.Client, httpx.AsyncClient]] = {}
+_http_clients_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    """Whether the optional 'h2' package needed by httpx for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_http_client(async_client: bool = False, config: Optional[LLMClientConfig] = None) -> Union[httpx.Client, httpx.AsyncClient]:
+    """
+    Returns the shared pooled httpx client of the requested kind, creating it on first use.
+
+    The configuration of the first call wins; later calls reuse the same pool.
+
+    Args:
+        async_client (bool): Whether to return the async client.
+        config (Optional[LLMClientConfig]): Pool and timeout settings. Defaults are used if None.
+
+    Returns:
+        Union[httpx.Client, httpx.AsyncClient]: The shared client.
+    """
+    with _http_clients_lock:
+        if async_client not in _http_clients:
+            config = config or LLMClientConfig()
+            http2 = config.http2 and http2_available()
+            client_class = httpx.AsyncClient if async_client else httpx.Client
+            _http_clients[async_client] = client_class(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_keepalive_connections,
+                    keepalive_expiry=config.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+                follow_redirects=True,
+            )
+            print(f"LLM HTTP pool ({'async' if async_client else 'sync'}) created, HTTP/2 {'on' if http2 else 'off'}.", file=sys.stderr)
+        return _http_clients[async_client]
+
+
+def create_client(
+    provider: str,
+    async_client: bool = False,
+    model: Optional[str] = None,
+    config: Optional[LLMClientConfig] = None,
+) -> Tuple[Union[instructor.Instructor, instructor.AsyncInstructor], str]:
+    """
+    Creates an Instructor client for a provider on top of the shared connection pool.
+
+    Args:
+        provider (str): One of the keys of `PROVIDERS`.
+        async_client (bool): Whether to create an async client.
+        model (Optional[str]): Model name overriding the provider's default.
+        config (Optional[LLMClientConfig]): Pool and timeout settings, used if the pool does not exist yet.
+
+    Returns:
+        Tuple[Union[instructor.Instructor, instructor.AsyncInstructor], str]: The client and the model name.
+
+    Raises:
+        ValueError: If the provider is unknown or its API key is not set.
+    """
+    settings = PROVIDERS.get(provider)
+    if settings is None:
+        raise ValueError(f"Unsupported provider: {provider}")
+
+    api_key = settings.default_api_key
+    if settings.api_key_env:
+        api_key = os.getenv(settings.api_key_env)
+        if not api_key:
+            raise ValueError(f"{settings.api_key_env} not found.")
+
+    config = config or LLMClientConfig()
+    openai_client_class = openai.AsyncOpenAI if async_client else openai.OpenAI
+    openai_client = openai_client_class(
+        api_key=api_key,
+        base_url=settings.base_url,
+        max_retries=config.max_retries,
+        http_client=get_http_client(async_client, config),
+    )
+    return instructor.from_openai(openai_client, mode=settings.mode), model or settings.model
@@ -0,0 +1,186 @@
+"""
+AgentMemory that keeps the conversation under a token budget by compacting old tool outputs.
+"""
+
+import json
+from typing import Dict, List, Optional, Set, Tuple, Type
+
+from atomic_agents.lib.base.base_io_schema import BaseIOSchema
+from atomic_agents.lib.components.agent_memory import AgentMemory, Message
+
+from utils.context_packing import estimate_tokens
+
+EVICTED_PLACEHOLDER = "[older tool output removed from memory]"
+
+
+class CompactingAgentMemory(AgentMemory):
+    """
+    Tracks an estimated token count per message and, once the history exceeds `max_tokens`,
+    compacts older tool outputs until it is back under `target_ratio * max_tokens`.
+
+    Only the fields listed in `compactable_fields` are ever touched. Messages from the last
+    `keep_recent_turns` turns and pinned messages are kept verbatim. Compaction first truncates
+    old tool outputs to a head and tail of `compacted_chars` characters, oldest first, and then, if
+    that is not enough, replaces them with a short placeholder.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        compactable_fields: Dict[Tuple[str, Type[BaseIOSchema]], str],
+        keep_recent_turns: int = 2,
+        compacted_chars: int = 800,
+        target_ratio: float = 0.75,
+        max_messages: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_tokens (int): Estimated history size that triggers compaction.
+            compactable_fields (Dict[Tuple[str, Type[BaseIOSchema]], str]): Maps (role, content schema)
+                to the string field holding tool output in such messages.
+            keep_recent_turns (int): Number of most recent turns never compacted.
+            compacted_chars (int): Size of a truncated tool output.
+            target_ratio (float): Fraction of `max_tokens` that compaction brings the history down to.
+            max_messages (Optional[int]): Maximum number of messages kept; the oldest unpinned
+                messages are dropped first, and pinned messages are never dropped.
+        """
+        super().__init__(max_messages=max_messages)
+        self.max_tokens = max_tokens
+        self.compactable_fields = compactable_fields
+        self.keep_recent_turns = keep_recent_turns
+        self.compacted_chars = compacted_chars
+        self.target_ratio = target_ratio
+        self._token_counts: Dict[int, Tuple[Message, int]] = {}  # id(message) -> (message, tokens)
+        self._pinned: Set[int] = set()
+
+    def add_message(self, role: str, content: BaseIOSchema, pinned: bool = False) -> None:
+        """
+        Adds a message to the history, compacting older tool outputs if the budget is exceeded.
+
+        Args:
+            role (str): The role of the message sender.
+            content (BaseIOSchema): The content of the message.
+            pinned (bool): Keep this message verbatim regardless of its age.
+        """
+        if pinned:
+            if self.current_turn_id is None:
+                self.initialize_turn()
+            message = Message(role=role, content=content, turn_id=self.current_turn_id)
+            self._pinned.add(id(message))
+            self.history.append(message)
+            self._manage_overflow()
+        else:
+            super().add_message(role, content)
+
+    def message_tokens(self, message: Message) -> int:
+        """Returns the estimated token count of a message, cached until the message is compacted."""
+        cached = self._token_counts.get(id(message))
+        if cached is None or cached[0] is not message:
+            cached = (message, estimate_tokens(json.dumps(message.content.model_dump(mode="json"))))
+            self._token_counts[id(message)] = cached
+        return cached[1]
+
+    def total_tokens(self) -> int:
+        """Returns the estimated token count of the whole history."""
+        return sum(self.message_tokens(message) for message in self.history)
+
+    def copy(self) -> "CompactingAgentMemory":
+        """
+        Creates a copy of the memory with the same budget, compaction settings and pinned messages.
+
+        Returns:
+            CompactingAgentMemory: The copy.
+        """
+        new_memory = CompactingAgentMemory(
+            max_tokens=self.max_tokens,
+            compactable_fields=dict(self.compactable_fields),
+            keep_recent_turns=self.keep_recent_turns,
+            compacted_chars=self.compacted_chars,
+            target_ratio=self.target_ratio,
+            max_messages=self.max_messages,
+        )
+        new_memory.load(self.dump())
+        new_memory.current_turn_id = self.current_turn_id
+        # Pins are tracked by message identity, so map them onto the copied messages by position
+        new_memory._pinned = {
+            id(copied) for original, copied in zip(self.history, new_memory.history) if id(original) in self._pinned
+        }
+        return new_memory
+
+    def _manage_overflow(self) -> None:
+        if self.max_messages is not None:
+            index = 0
+            while len(self.history) > self.max_messages and index < len(self.history):
+                if id(self.history[index]) in self._pinned:
+                    index += 1
+                else:
+                    self.history.pop(index)
+        live_ids = {id(message) for message in self.history}
+        self._token_counts = {key: value for key, value in self._token_counts.items() if key in live_ids}
+        self._pinned &= live_ids
+        if self.total_tokens() > self.max_tokens:
+            self.compact()
+
+    def _compaction_candidates(self) -> List[Tuple[int, str]]:
+        """Returns (history index, field name) of the compactable messages, oldest first."""
+        recent_turns: List[str] = []
+        for message in reversed(self.history):
+            if message.turn_id not in recent_turns:
+                recent_turns.append(message.turn_id)
+            if len(recent_turns) >= self.keep_recent_turns:
+                break
+        protected_turns = set(recent_turns[:self.keep_recent_turns])
+
+        candidates = []
+        for index, message in enumerate(self.history):
+            if message.turn_id in protected_turns or id(message) in self._pinned:
+                continue
+            field = self.compactable_fields.get((message.role, type(message.content)))
+            if field and getattr(message.content, field, None):
+                candidates.append((index, field))
+        return candidates
+
+    def _replace_field(self, index: int, field: str, value: str) -> int:
+        """Replaces a field of a message's content and returns the tokens saved."""
+        message = self.history[index]
+        before = self.message_tokens(message)
+        compacted = Message(
+            role=message.role,
+            content=message.content.model_copy(update={field: value}),
+            turn_id=message.turn_id,
+        )
+        self.history[index] = compacted
+        self._token_counts.pop(id(message), None)
+        return before - self.message_tokens(compacted)
+
+    def compact(self) -> int:
+        """
+        Compacts old tool outputs until the history is under `target_ratio * max_tokens`.
+
+        Returns:
+            int: Estimated tokens saved.
+        """
+        target = int(self.max_tokens * self.target_ratio)
+        total = self.total_tokens()
+        saved = 0
+        candidates = self._compaction_candidates()
+
+        # Pass 1: truncate long outputs to their head and tail
+        head = self.compacted_chars * 2 // 3
+        tail = self.compacted_chars - head
+        for index, field in candidates:
+            if total - saved <= target:
+                return saved
+            text = getattr(self.history[index].content, field)
+            if len(text) > self.compacted_chars + 100:
+                omitted = len(text) - head - tail
+                truncated = f"{text[:head]}\n[... {omitted} characters compacted ...]\n{text[-tail:]}"
+                saved += self._replace_field(index, field, truncated)
+
+        # Pass 2: drop the remaining old outputs entirely
+        for index, field in candidates:
+            if total - saved <= target:
+                return saved
+            if getattr(self.history[index].content, field) != EVICTED_PLACEHOLDER:
+                saved += self._replace_field(index, field, EVICTED_PLACEHOLDER)
+        return saved
@@ -0,0 +1,146 @@
+"""
+Query-aware context packing: splits documents into chunks, ranks them with BM25 and keeps the best
+ones that fit a token budget.
+"""
+
+import re
+import math
+from collections import Counter
+from typing import List, Tuple
+
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+BLOCK_SEPARATOR = re.compile(r"\n\s*\n|\n(?=#{1,6} )")
+
+# Rough token estimate shared by the packing stage; close enough for budgeting English markdown
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Returns a rough token count for a text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits a text into lowercase terms."""
+    return TERM_PATTERN.findall(text.lower())
+
+
+def chunk_text(text: str, max_chars: int) -> List[str]:
+    """
+    Splits a markdown text into chunks of at most `max_chars` characters.
+
+    Paragraphs and headings are packed together until the next one would overflow the chunk;
+    paragraphs longer than `max_chars` are cut into pieces.
+
+    Args:
+        text (str): The markdown text to split.
+        max_chars (int): Maximum size of a chunk.
+
+    Returns:
+        List[str]: The chunks, in document order.
+
+    Raises:
+        ValueError: If `max_chars` is not positive.
+    """
+    if max_chars <= 0:
+        raise ValueError(f"max_chars must be positive, got {max_chars}")
+    chunks: List[str] = []
+    current = ""
+    for block in BLOCK_SEPARATOR.split(text):
+        block = block.strip()
+        if not block:
+            continue
+        while len(block) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(block[:max_chars])
+            block = block[max_chars:]
+        if current and len(current) + len(block) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{block}" if current else block
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def bm25_scores(query: str, documents: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """
+    Scores documents against a query with Okapi BM25.
+
+    Args:
+        query (str): The query text.
+        documents (List[str]): The documents to score.
+        k1 (float): Term frequency saturation.
+        b (float): Document length normalization.
+
+    Returns:
+        List[float]: One score per document, higher is more relevant.
+    """
+    query_terms = set(tokenize(query))
+    term_counts = [Counter(tokenize(document)) for document in documents]
+    lengths = [sum(counts.values()) for counts in term_counts]
+    average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    document_frequency = Counter()
+    for counts in term_counts:
+        document_frequency.update(term for term in query_terms if term in counts)
+
+    n = len(documents)
+    idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    scores = []
+    for counts, length in zip(term_counts, lengths):
+        norm = k1 * (1 - b + b * length / average_length) if average_length else k1
+        score = 0.0
+        for term, weight in idf.items():
+            tf = counts.get(term, 0)
+            if tf:
+                score += weight * tf * (k1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def pack_context(
+    query: str,
+    documents: List[str],
+    token_budget: int,
+    chunk_chars: int = 1500,
+    document_overhead: int = 0,
+) -> List[List[str]]:
+    """
+    Selects the chunks most relevant to a query across documents, within a token budget.
+
+    Chunks are taken in descending BM25 score until the budget is spent; chunks that do not fit are
+    skipped in favour of smaller ones further down. `document_overhead` tokens are charged the first
+    time a chunk of a document is selected, to account for per-document metadata.
+
+    Args:
+        query (str): The query the chunks are ranked against.
+        documents (List[str]): The documents to pack.
+        token_budget (int): Maximum estimated tokens of selected content.
+        chunk_chars (int): Maximum size of a chunk in characters.
+        document_overhead (int): Estimated tokens of metadata per selected document.
+
+    Returns:
+        List[List[str]]: For each document, its selected chunks in document order (possibly empty).
+    """
+    chunks: List[Tuple[int, int, str]] = []  # (document index, position, text)
+    for doc_index, document in enumerate(documents):
+        chunks.extend((doc_index, position, text) for position, text in enumerate(chunk_text(document, chunk_chars)))
+
+    scores = bm25_scores(query, [text for _, _, text in chunks])
+    ranked = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+
+    remaining = token_budget
+    selected: List[List[Tuple[int, str]]] = [[] for _ in documents]
+    for i in ranked:
+        doc_index, position, text = chunks[i]
+        cost = estimate_tokens(text) + (0 if selected[doc_index] else document_overhead)
+        if cost > remaining:
+            continue
+        selected[doc_index].append((position, text))
+        remaining -= cost
+
+    return [[text for _, text in sorted(doc_chunks)] for doc_chunks in selected]
@@ -0,0 +1,192 @@
+"""
+Disk-backed HTTP response cache with conditional revalidation.
+Entries are keyed by canonical URL and evicted by TTL and least-recent use once the cache outgrows its size budget.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
+
+from utils.url_utils import canonicalize_url
+
+
+class HttpCacheEntry(BaseModel):
+    """A cached HTTP response body, its validators, and the outputs already derived from it."""
+    url: str = Field(..., description="The canonical URL of the response.")
+    body: str = Field(..., description="The decoded response body.")
+    etag: Optional[str] = Field(None, description="The ETag validator sent by the server, if any.")
+    last_modified: Optional[str] = Field(None, description="The Last-Modified validator sent by the server, if any.")
+    stored_at: float = Field(..., description="Unix time at which the response was last fetched or revalidated.")
+    outputs: Dict[str, dict] = Field(default_factory=dict, description="Derived outputs keyed by variant (e.g. with or without links).")
+
+
+class HttpResponseCache:
+    """
+    Stores HTTP responses as one JSON file per URL under `cache_dir`.
+
+    Entries younger than `ttl` seconds are served without touching the network. Older entries are
+    revalidated with If-None-Match / If-Modified-Since. When the files exceed `max_bytes`, the least
+    recently used ones are removed first.
+    """
+
+    def __init__(self, cache_dir: str, ttl: float, max_bytes: int):
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Dict[str, tuple] = {}  # key -> (size in bytes, last access time)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    self._index[entry.name[:-5]] = (stat.st_size, stat.st_mtime)
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str) -> Optional[HttpCacheEntry]:
+        """
+        Returns the cached entry for `url` and marks it as recently used.
+        Stale entries are returned only if they carry a validator to revalidate with.
+
+        Args:
+            url (str): The requested URL.
+
+        Returns:
+            Optional[HttpCacheEntry]: The cached entry, or None on a miss or unreadable entry.
+        """
+        key = self._key(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = HttpCacheEntry.model_validate(json.load(f))
+                if not self.is_fresh(entry) and not (entry.etag or entry.last_modified):
+                    # Expired and impossible to revalidate: treat as a miss
+                    self._remove(key)
+                    return None
+                now = time.time()
+                os.utime(path, (now, now))
+                self._index[key] = (self._index[key][0], now)
+                return entry
+            except (OSError, ValueError) as e:
+                print(f"Warning: Dropping unreadable cache entry for {url}: {e}", file=sys.stderr)
+                self._remove(key)
+                return None
+
+    def is_fresh(self, entry: HttpCacheEntry) -> bool:
+        """Returns True if the entry may be served without revalidation."""
+        return time.time() - entry.stored_at < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: HttpCacheEntry) -> Dict[str, str]:
+        """
+        Builds the revalidation headers for a stale entry.
+
+        Args:
+            entry (HttpCacheEntry): The cached entry.
+
+        Returns:
+            Dict[str, str]: If-None-Match / If-Modified-Since headers, possibly empty.
+        """
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(
+        self,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        outputs: Optional[Dict[str, dict]] = None,
+    ) -> HttpCacheEntry:
+        """
+        Stores a freshly fetched response, replacing any previous body and the outputs derived from it.
+
+        Args:
+            url (str): The requested URL.
+            body (str): The decoded response body.
+            etag (Optional[str]): The response's ETag header.
+            last_modified (Optional[str]): The response's Last-Modified header.
+            outputs (Optional[Dict[str, dict]]): Outputs already derived from `body`, keyed by variant.
+
+        Returns:
+            HttpCacheEntry: The stored entry.
+        """
+        entry = HttpCacheEntry(
+            url=canonicalize_url(url),
+            body=body,
+            etag=etag,
+            last_modified=last_modified,
+            stored_at=time.time(),
+            outputs=outputs or {},
+        )
+        self._write(entry)
+        return entry
+
+    def refresh(self, entry: HttpCacheEntry) -> None:
+        """Marks an entry as fresh again after the server answered 304 Not Modified."""
+        entry.stored_at = time.time()
+        self._write(entry)
+
+    def store_output(self, entry: HttpCacheEntry, variant: str, output: dict) -> None:
+        """
+        Attaches an output derived from the entry's body, so later hits can skip the conversion.
+
+        Args:
+            entry (HttpCacheEntry): The cached entry the output was derived from.
+            variant (str): Name of the conversion variant (e.g. "links" or "no_links").
+            output (dict): The serialized output.
+        """
+        entry.outputs[variant] = output
+        self._write(entry)
+
+    def _write(self, entry: HttpCacheEntry) -> None:
+        key = self._key(entry.url)
+        path = self._path(key)
+        # Unique per process and thread, as several processes may share the cache directory
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        data = entry.model_dump_json()
+        with self._lock:
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Warning: Could not write cache entry for {entry.url}: {e}", file=sys.stderr)
+                return
+            self._index[key] = (len(data.encode("utf-8")), time.time())
+            self._evict()
+
+    def _remove(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+        self._index.pop(key, None)
+
+    def _evict(self) -> None:
+        """Removes least recently used entries until the cache fits in `max_bytes`. Caller holds the lock."""
+        total = sum(size for size, _ in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
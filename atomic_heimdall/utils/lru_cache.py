@@ -0,0 +1,152 @@
+"""
+Small thread-safe LRU cache for JSON-serializable values, with optional expiry and disk persistence.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class PersistentLRUCache:
+    """
+    Keeps up to `max_entries` values in memory, evicting the least recently used one first.
+
+    If `ttl` is set, entries older than `ttl` seconds are treated as misses. If `persist_dir` is set,
+    every value is also written there as a JSON file, so memory misses fall back to disk and the
+    cache survives restarts. The directory is bounded too: files of evicted or expired entries are
+    deleted, and on load expired files are swept and only the `max_entries` newest are kept.
+    """
+
+    def __init__(self, max_entries: int, ttl: Optional[float] = None, persist_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_dir = os.path.abspath(os.path.expanduser(persist_dir)) if persist_dir else None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        # Files left by earlier runs whose keys are not in memory yet, oldest first
+        self._untracked: "OrderedDict[str, None]" = OrderedDict()
+        if self.persist_dir:
+            os.makedirs(self.persist_dir, exist_ok=True)
+            self._sweep_disk()
+
+    def _sweep_disk(self) -> None:
+        """Deletes expired cache files and the oldest ones beyond `max_entries`, and tracks the rest."""
+        files = []
+        for name in os.listdir(self.persist_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.persist_dir, name)
+            try:
+                stored_at = os.path.getmtime(path)  # Files are written when their entry is stored
+            except OSError:
+                continue
+            if self._expired(stored_at):
+                self._remove_file(path)
+            else:
+                files.append((stored_at, path))
+        files.sort()
+        excess = max(0, len(files) - self.max_entries)
+        for _, path in files[:excess]:
+            self._remove_file(path)
+        self._untracked = OrderedDict((path, None) for _, path in files[excess:])
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Could not delete cache file {path}: {e}", file=sys.stderr)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at >= self.ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.persist_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the value stored under `key`, or None on a miss or expired entry.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[Any]: The cached value.
+        """
+        with self._lock:
+            if key in self._entries:
+                stored_at, value = self._entries[key]
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        if not self.persist_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+            stored_at, value = float(record["stored_at"]), record["value"]
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Warning: Ignoring unreadable cache file for key {key[:16]}...: {e}", file=sys.stderr)
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Warning: Dropping malformed cache file for key {key[:16]}...: {e!r}", file=sys.stderr)
+            stored_at, value = None, None
+        if stored_at is None or self._expired(stored_at):
+            with self._lock:
+                self._untracked.pop(path, None)
+            self._remove_file(path)
+            return None
+        self._remember(key, stored_at, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores `value` under `key`, in memory and, if enabled, on disk.
+
+        Args:
+            key (str): The cache key.
+            value (Any): A JSON-serializable value.
+        """
+        stored_at = time.time()
+        if self.persist_dir:
+            # Written before the entry is remembered, so an immediate eviction also deletes the file
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"stored_at": stored_at, "value": value}, f)
+                os.replace(tmp_path, path)
+            except (OSError, TypeError) as e:
+                print(f"Warning: Could not persist cache entry for key {key[:16]}...: {e}", file=sys.stderr)
+        self._remember(key, stored_at, value)
+
+    def _remember(self, key: str, stored_at: float, value: Any) -> None:
+        stale_files = []
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                if self.persist_dir:
+                    stale_files.append(self._path(evicted_key))
+            if self.persist_dir:
+                self._untracked.pop(self._path(key), None)
+                while self._untracked and len(self._entries) + len(self._untracked) > self.max_entries:
+                    stale_files.append(self._untracked.popitem(last=False)[0])
+        for path in stale_files:
+            self._remove_file(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
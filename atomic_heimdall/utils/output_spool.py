@@ -0,0 +1,137 @@
+"""
+Spooling of large tool outputs to the workspace, with head/tail previews and byte-range reads.
+"""
+
+import os
+import time
+import itertools
+from typing import Optional, Tuple
+
+_spool_counter = itertools.count(1)
+
+
+def read_byte_range(path: str, offset: int, length: int) -> Tuple[str, int, Optional[int]]:
+    """
+    Reads `length` bytes of a file starting at byte `offset`.
+
+    Args:
+        path (str): The file to read.
+        offset (int): Byte offset to start from.
+        length (int): Maximum number of bytes to read.
+
+    Returns:
+        Tuple[str, int, Optional[int]]: The decoded text (invalid UTF-8 replaced), the file size,
+        and the offset of the next unread byte, or None at the end of the file.
+    """
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    end = offset + len(data)
+    return data.decode("utf-8", errors="replace"), total, (end if end < total else None)
+
+
+def preview_file(path: str, display_path: str, preview_bytes: int) -> str:
+    """
+    Returns the head and tail of a file with their byte offsets, and how to page through the rest.
+
+    Args:
+        path (str): The file to preview.
+        display_path (str): The path shown to the agent, relative to the FileManager workspace.
+        preview_bytes (int): Bytes shown from each end of the file.
+
+    Returns:
+        str: The preview text.
+    """
+    total = os.path.getsize(path)
+    head, _, _ = read_byte_range(path, 0, preview_bytes)
+    tail_start = min(total, max(preview_bytes, total - preview_bytes))
+    tail, _, _ = read_byte_range(path, tail_start, total - tail_start)
+    return (
+        f"[{display_path}: {total} bytes, showing bytes 0-{min(preview_bytes, total)} and {tail_start}-{total}. "
+        f"Read other ranges with the FileManager tool: action='read', path='{display_path}', offset=<byte>, length=<bytes>.]\n"
+        f"--- bytes 0-{min(preview_bytes, total)} ---\n{head}\n"
+        f"--- bytes {tail_start}-{total} ---\n{tail}"
+    )
+
+
+class OutputSpool:
+    """
+    Creates spool files under `<workspace_dir>/<subdir>` for tool outputs, so that outputs larger
+    than `threshold_bytes` stay on disk and only a `preview_bytes` head and tail reach the agent.
+    Spool paths are reported relative to the workspace, where the FileManager tool can read them.
+
+    The spool directory is bounded: before each new file, files older than `max_age` seconds are
+    deleted, then the oldest ones until the directory fits in `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        workspace_dir: str,
+        subdir: str = ".spool",
+        threshold_bytes: int = 16384,
+        preview_bytes: int = 2048,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age: float = 7 * 24 * 3600,
+    ):
+        self.workspace_dir = os.path.abspath(workspace_dir)
+        self.subdir = subdir
+        self.threshold_bytes = threshold_bytes
+        self.preview_bytes = preview_bytes
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def prune(self) -> None:
+        """Deletes expired spool files, then the oldest ones until the spool fits in `max_bytes`."""
+        spool_dir = os.path.join(self.workspace_dir, self.subdir)
+        if not os.path.isdir(spool_dir):
+            return
+        now = time.time()
+        files = []
+        with os.scandir(spool_dir) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    if now - stat.st_mtime > self.max_age:
+                        os.remove(entry.path)
+                    else:
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+                except OSError:
+                    continue
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def new_file(self, prefix: str, suffix: str = ".log") -> Tuple[str, str]:
+        """
+        Returns the absolute and workspace-relative paths of a new, unique spool file, after pruning
+        old spool files.
+
+        Args:
+            prefix (str): Start of the file name, e.g. the tool or stream name.
+            suffix (str): File extension.
+
+        Returns:
+            Tuple[str, str]: (absolute path, path relative to the workspace).
+        """
+        self.prune()
+        spool_dir = os.path.join(self.workspace_dir, self.subdir)
+        os.makedirs(spool_dir, exist_ok=True)
+        name = f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_spool_counter)}{suffix}"
+        return os.path.join(spool_dir, name), os.path.join(self.subdir, name)
+
+    def is_large(self, path: str) -> bool:
+        """Whether a file exceeds the spooling threshold."""
+        return os.path.getsize(path) > self.threshold_bytes
+
+    def preview(self, path: str, display_path: str) -> str:
+        """Returns the head/tail preview of a spooled file."""
+        return preview_file(path, display_path, self.preview_bytes)
@@ -0,0 +1,177 @@
+"""
+Token-bucket rate limiting shared by every outbound fetch (DuckDuckGo searches, scraped domains).
+Each key (e.g. "duckduckgo" or "domain:nvd.nist.gov") gets its own bucket, and the time callers
+spend waiting for tokens is recorded per key, and per caller with `track_waits`.
+"""
+
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+from pydantic import BaseModel, Field
+
+
+class RateLimitStats(BaseModel):
+    """Waiting-time metrics for one rate-limited key."""
+    acquired: int = Field(0, description="Number of tokens handed out.")
+    waited: int = Field(0, description="Number of acquisitions that had to wait.")
+    total_wait: float = Field(0.0, description="Total seconds spent waiting for tokens.")
+    max_wait: float = Field(0.0, description="Longest single wait in seconds.")
+
+
+class WaitTally:
+    """Seconds waited for tokens by one caller (e.g. one web search flow), across its tasks and threads."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.seconds += seconds
+
+
+# Tally of the running caller; asyncio tasks and asyncio.to_thread calls inherit it
+_current_tally: ContextVar[Optional[WaitTally]] = ContextVar("rate_limit_wait_tally", default=None)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds at most `burst` tokens and refills at `rate` tokens per second.
+
+    Tokens are reserved up front (the balance may go negative), so concurrent callers queue up
+    fairly and each one learns immediately how long it has to wait.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0:
+            raise ValueError(f"Rate limit must be positive, got {rate} tokens per second")
+        if burst < 1:
+            raise ValueError(f"Burst must be at least 1, got {burst}")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        Takes one token and returns how many seconds the caller must wait before using it.
+        Not thread-safe on its own; the scheduler serializes calls.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        """Gives back a reserved token its caller will not use."""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class RateLimitScheduler:
+    """Hands out tokens from one bucket per key, for both threaded and asyncio callers."""
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, RateLimitStats] = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, key: str, rate: float, burst: int) -> float:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate, burst)
+                self._stats[key] = RateLimitStats()
+            delay = bucket.reserve()
+            stats = self._stats[key]
+            stats.acquired += 1
+            if delay > 0:
+                stats.waited += 1
+                stats.total_wait += delay
+                stats.max_wait = max(stats.max_wait, delay)
+            return delay
+
+    def _refund(self, key: str):
+        with self._lock:
+            self._buckets[key].refund()
+            self._stats[key].acquired -= 1
+
+    @staticmethod
+    def _tally(delay: float):
+        tally = _current_tally.get()
+        if tally is not None and delay > 0:
+            tally.add(delay)
+
+    @contextmanager
+    def track_waits(self) -> Iterator[WaitTally]:
+        """
+        Tallies the time spent waiting for tokens by the code run inside the block, including the
+        asyncio tasks and worker threads it starts with a copy of its context.
+
+        Yields:
+            WaitTally: The tally, whose `seconds` grow as the block's callers wait.
+        """
+        tally = WaitTally()
+        token = _current_tally.set(tally)
+        try:
+            yield tally
+        finally:
+            _current_tally.reset(token)
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """
+        Blocks until a token for `key` is available.
+
+        Args:
+            key (str): The rate-limited resource.
+            rate (float): Tokens per second, used when the bucket is first created.
+            burst (int): Bucket capacity, used when the bucket is first created.
+
+        Returns:
+            float: The number of seconds waited.
+        """
+        delay = self._reserve(key, rate, burst)
+        if delay > 0:
+            time.sleep(delay)
+        self._tally(delay)
+        return delay
+
+    async def aacquire(self, key: str, rate: float, burst: int) -> float:
+        """
+        Awaits a token for `key` without blocking the event loop.
+        If the caller is cancelled while waiting, its token goes back to the bucket.
+
+        Args:
+            key (str): The rate-limited resource.
+            rate (float): Tokens per second, used when the bucket is first created.
+            burst (int): Bucket capacity, used when the bucket is first created.
+
+        Returns:
+            float: The number of seconds waited.
+        """
+        delay = self._reserve(key, rate, burst)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self._refund(key)
+                raise
+        self._tally(delay)
+        return delay
+
+    def metrics(self) -> Dict[str, RateLimitStats]:
+        """Returns a snapshot of the waiting-time metrics, per key."""
+        with self._lock:
+            return {key: stats.model_copy() for key, stats in self._stats.items()}
+
+    def total_wait(self) -> float:
+        """Returns the total seconds spent waiting across all keys."""
+        with self._lock:
+            return sum(stats.total_wait for stats in self._stats.values())
+
+
+# Process-wide scheduler, so every tool instance shares the same budgets
+rate_limit_scheduler = RateLimitScheduler()
@@ -0,0 +1,87 @@
+"""
+In-session store of full tool outputs, so the agent's prompt only carries a bounded view of each one.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class ToolResultStore:
+    """
+    Keeps the full text of large tool results under short handles ("result-1", "result-2", ...).
+
+    `present` returns what the agent should see: short results verbatim, long ones as a
+    `preview_chars` head followed by the handle and total size, so the rest can be fetched with the
+    ToolResultReader tool. The oldest results are dropped once more than `max_results` are stored.
+    """
+
+    def __init__(self, preview_chars: int = 4000, max_results: int = 200):
+        self.preview_chars = preview_chars
+        self.max_results = max_results
+        self._results: "OrderedDict[str, str]" = OrderedDict()
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def put(self, text: str) -> str:
+        """
+        Stores a result and returns its handle.
+
+        Args:
+            text (str): The full result text.
+
+        Returns:
+            str: The handle under which the result can be read back.
+        """
+        with self._lock:
+            self._counter += 1
+            handle = f"result-{self._counter}"
+            self._results[handle] = text
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+            return handle
+
+    def get(self, handle: str) -> Optional[str]:
+        """Returns the full text stored under `handle`, or None if unknown or dropped."""
+        with self._lock:
+            return self._results.get(handle)
+
+    def read(self, handle: str, offset: int = 0, length: Optional[int] = None) -> Optional[Tuple[str, int, Optional[int]]]:
+        """
+        Returns a slice of a stored result.
+
+        Args:
+            handle (str): The result handle.
+            offset (int): Character offset to start from.
+            length (Optional[int]): Number of characters to return; defaults to `preview_chars`.
+
+        Returns:
+            Optional[Tuple[str, int, Optional[int]]]: The slice, the result's total length and the
+            offset of the next slice (None at the end), or None if the handle is unknown.
+        """
+        text = self.get(handle)
+        if text is None:
+            return None
+        content = text[offset:offset + (length or self.preview_chars)]
+        end = offset + len(content)
+        return content, len(text), end if end < len(text) else None
+
+    def present(self, tool_name: str, text: str) -> str:
+        """
+        Returns the view of a tool result to send to the agent, storing it if it is too long.
+
+        Args:
+            tool_name (str): The tool that produced the result.
+            text (str): The full result text.
+
+        Returns:
+            str: The full text if it fits in `preview_chars`, otherwise its head and a handle.
+        """
+        if len(text) <= self.preview_chars:
+            return text
+        handle = self.put(text)
+        return (
+            f"{text[:self.preview_chars]}\n"
+            f"[Output of '{tool_name}' truncated: showing {self.preview_chars} of {len(text)} characters. "
+            f"Use the ToolResultReader tool with handle='{handle}' and offset={self.preview_chars} to read more.]"
+        )
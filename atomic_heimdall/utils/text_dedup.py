@@ -0,0 +1,76 @@
+"""
+Near-duplicate detection for scraped text using SimHash fingerprints over word shingles.
+"""
+
+import re
+import hashlib
+from collections import Counter
+from typing import List
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str, shingle_size: int = 4) -> int:
+    """
+    Computes a 64-bit SimHash fingerprint of a text.
+
+    The text is lowercased and split into words, and every run of `shingle_size` consecutive words
+    is a feature. Texts sharing most of their shingles get fingerprints a few bits apart.
+
+    Args:
+        text (str): The text to fingerprint.
+        shingle_size (int): Number of consecutive words per feature.
+
+    Returns:
+        int: The 64-bit fingerprint (0 for a text without words).
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= shingle_size:
+        shingles = Counter([" ".join(words)] if words else [])
+    else:
+        shingles = Counter(" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+
+    weights = [0] * 64
+    for shingle, count in shingles.items():
+        feature = _feature_hash(shingle)
+        for bit in range(64):
+            weights[bit] += count if feature >> bit & 1 else -count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Returns the number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+def near_duplicate_indices(texts: List[str], max_distance: int = 3) -> List[int]:
+    """
+    Returns the indices of the texts to keep after dropping near-duplicates.
+
+    Texts are compared in order, so the first of a group of near-duplicates is kept.
+
+    Args:
+        texts (List[str]): The texts to deduplicate.
+        max_distance (int): Largest Hamming distance at which two fingerprints count as duplicates.
+
+    Returns:
+        List[int]: Indices of the kept texts, in their original order.
+    """
+    kept: List[int] = []
+    fingerprints: List[int] = []
+    for i, text in enumerate(texts):
+        fingerprint = simhash(text)
+        if any(hamming_distance(fingerprint, other) <= max_distance for other in fingerprints):
+            continue
+        kept.append(i)
+        fingerprints.append(fingerprint)
+    return kept
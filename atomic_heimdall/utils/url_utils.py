@@ -0,0 +1,57 @@
+"""
+URL canonicalization shared by the search, scraping and caching stages, so that the same page
+reached through different links is recognized as one.
+"""
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track where a click came from and never change the page
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid", "twclid", "ttclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "oly_anon_id", "oly_enc_id",
+    "ref_src", "ref_url", "spm", "vero_id", "wickedid",
+}
+TRACKING_PARAM_PREFIXES = ("utm_", "pk_", "hsa_")
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Returns the canonical form of a URL.
+
+    The scheme is upgraded from http to https, the host (not the user info) is lowercased and
+    default ports dropped, tracking parameters and fragments are removed, remaining query parameters
+    are sorted, and a trailing slash is stripped from any path other than the root.
+
+    Args:
+        url (str): The URL to canonicalize.
+
+    Returns:
+        str: The canonical URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+
+    # Only the host is case-insensitive: user info is kept as is, and IPv6 hosts keep their brackets
+    userinfo, _, _ = parts.netloc.rpartition("@")
+    host = (parts.hostname or "").lower().rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    netloc = f"{userinfo}@{host}" if userinfo else host
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    query_params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking_param(k)]
+    query = urlencode(sorted(query_params))
+
+    return urlunsplit((scheme, netloc, path, query, ""))